@@ -1,22 +1,217 @@
 """
 Automation API Endpoints - Automated Blog Posting
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from loguru import logger
-from datetime import datetime
+from datetime import datetime, timedelta
+import asyncio
+import json
+import math
 
-from app.core.database import get_db
-from app.services.automation_executor import create_automator
-from app.schemas.automation import PostingRequest, PostingResponse
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.services.automation_executor import PostingResult
+from app.services.device_manager import AsyncDeviceManager
+from app.services.idempotency import (
+    IdempotencyConflict,
+    IdempotencyStore,
+    get_idempotency_store,
+    request_fingerprint,
+)
+from app.services.job_manager import (
+    AutomationJob,
+    JobStatus,
+    get_job_manager,
+    posting_content_hash,
+)
+from app.services.posting_history import THROUGHPUT_GROUPS, AsyncPostingHistoryManager
+from app.services.progress import get_progress_hub
+from app.services.rate_limiter import RateLimited, get_rate_limiter
+from app.schemas.automation import (
+    PostingRequest,
+    PostingResponse,
+    AutomationStatus,
+    BulkPostingRequest,
+    BulkPostingResponse,
+    FailedStepStats,
+    HourlyPostingStats,
+    PostingAnalyticsFilter,
+    PostingHistoryFilter,
+    PostingHistoryResponse,
+    PostingRecordResponse,
+    PostingSummaryResponse,
+    ThroughputStats,
+)
 
 router = APIRouter()
 
 
+async def _validate_request(request: PostingRequest, db: AsyncSession):
+    """Reject requests for unknown profiles before they are queued"""
+    manager = AsyncDeviceManager(db)
+    if not await manager.get_profile(request.profile_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Profile not found: {request.profile_id}",
+        )
+
+
+async def _submit_bulk(
+    requests: List[PostingRequest],
+    db: AsyncSession,
+    errors: List[dict],
+    indices: Optional[List[int]] = None,
+) -> dict:
+    """
+    Validate a whole batch in one pass, then deduplicate and enqueue it atomically
+
+    Nothing is queued if any item is invalid (422 with every item error).
+    `indices` maps requests to their original item positions when some
+    items already failed parsing.
+    """
+    indices = indices or list(range(len(requests)))
+    if len(requests) + len(errors) > settings.BULK_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Bulk submission limited to {settings.BULK_MAX_REQUESTS} postings",
+        )
+
+    manager = AsyncDeviceManager(db)
+    existing = await manager.get_existing_profile_ids([r.profile_id for r in requests])
+    errors = errors + [
+        {"index": index, "error": f"Profile not found: {request.profile_id}"}
+        for index, request in zip(indices, requests)
+        if request.profile_id not in existing
+    ]
+    errors.sort(key=lambda error: error["index"])
+
+    if errors:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"message": "Bulk validation failed, nothing queued", "errors": errors},
+        )
+
+    # Successful postings persisted by earlier runs and other API workers
+    posted = await AsyncPostingHistoryManager(db).find_recent_successes(
+        [posting_content_hash(request) for request in requests],
+        datetime.utcnow() - timedelta(hours=settings.DEDUP_WINDOW_HOURS),
+    )
+    jobs, skipped = get_job_manager().submit_many(requests, posted)
+    return {
+        "received": len(requests),
+        "queued": len(jobs),
+        "skipped": skipped,
+        "jobs": [job.to_status() for job in jobs],
+    }
+
+
+async def _submit_idempotent(
+    request: PostingRequest,
+    db: AsyncSession,
+    idempotency_key: Optional[str],
+    response: Response,
+    hold: bool = True,
+):
+    """
+    Submit a job, honouring an optional Idempotency-Key
+
+    `hold` is passed to JobManager.submit (False raises RateLimited
+    instead of queueing a job that would wait for rate-limit tokens).
+
+    Returns:
+        Tuple of (job, None) for a new or in-flight job, or
+        (None, entry) when a finished result should be replayed
+    """
+    manager = get_job_manager()
+    if not idempotency_key:
+        await _validate_request(request, db)
+        return manager.submit(request, hold=hold), None
+
+    store = get_idempotency_store()
+    fingerprint = request_fingerprint(request)
+    replay = _lookup_idempotent(store, idempotency_key, fingerprint, response)
+    if replay:
+        return replay
+
+    await _validate_request(request, db)
+
+    # Re-check after awaiting the database: a concurrent request with the
+    # same key may have recorded its job meanwhile. Lookup-then-record
+    # below runs without awaiting, so only one of them starts a job.
+    replay = _lookup_idempotent(store, idempotency_key, fingerprint, response)
+    if replay:
+        return replay
+
+    job = manager.submit(request, hold=hold)
+    store.record(idempotency_key, fingerprint, job)
+    return job, None
+
+
+def _lookup_idempotent(
+    store: IdempotencyStore, idempotency_key: str, fingerprint: str, response: Response
+):
+    """Existing (job, None) / (None, entry) for a key, or None if the key is new"""
+    try:
+        entry = store.lookup(idempotency_key, fingerprint)
+    except IdempotencyConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e),
+        )
+
+    if not entry:
+        return None
+    response.headers["Idempotent-Replayed"] = "true"
+    logger.info(f"Idempotency-Key {idempotency_key} matched job {entry.job_id}")
+    if entry.finished:
+        return None, entry
+    return entry.job, None
+
+
+def _posting_response(job_id: str, result: PostingResult) -> PostingResponse:
+    return PostingResponse(
+        job_id=job_id,
+        success=result.success,
+        blog_url=result.blog_url,
+        error_message=result.error_message,
+        steps_completed=result.steps_completed,
+        total_steps=result.total_steps,
+        execution_time=result.execution_time,
+        failed_step=result.failed_step,
+        timestamp=datetime.utcnow().isoformat(),
+    )
+
+
+def _get_job_or_404(job_id: str) -> AutomationJob:
+    job = get_job_manager().get(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job not found: {job_id}",
+        )
+    return job
+
+
 @router.post("/execute", response_model=PostingResponse)
 async def execute_automated_posting(
     request: PostingRequest,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
 ):
     """
     Execute automated blog posting sequence
@@ -25,6 +220,16 @@ async def execute_automated_posting(
     1. + button → 2. Blog write → 3. Title → 4. Content
     5. Text size → 6. Publish → 7-9. Share & URL
 
+    The job runs on the device's queue; progress is streamed on
+    /automation/ws/jobs while this request waits for the result.
+
+    With an Idempotency-Key header, a retried request attaches to the
+    running job or replays its successful result instead of posting again.
+
+    If the device, profile or account is rate limited, the request is
+    rejected with 429 and a Retry-After header instead of being held;
+    /automation/jobs queues such postings until they may run.
+
     Returns blog URL if successful
     """
     try:
@@ -32,31 +237,14 @@ async def execute_automated_posting(
             f"🤖 Starting automated posting: {request.title[:30]}... on {request.device_id}"
         )
 
-        # Create automator
-        automator = create_automator(
-            device_id=request.device_id,
-            profile_id=request.profile_id,
-            db=db,
-        )
-
-        # Execute posting with retry
-        result = await automator.execute_posting_with_retry(
-            title=request.title,
-            content=request.content,
-            images=request.images,
+        # Queue job (or reuse the one for this Idempotency-Key) and wait for completion
+        job, replay = await _submit_idempotent(
+            request, db, idempotency_key, response, hold=False
         )
+        if replay:
+            return _posting_response(replay.job_id, replay.result)
 
-        # Convert to response
-        response = PostingResponse(
-            success=result.success,
-            blog_url=result.blog_url,
-            error_message=result.error_message,
-            steps_completed=result.steps_completed,
-            total_steps=result.total_steps,
-            execution_time=result.execution_time,
-            failed_step=result.failed_step,
-            timestamp=datetime.utcnow().isoformat(),
-        )
+        result = await get_job_manager().wait(job)
 
         if result.success:
             logger.info(f"✅ Posting successful: {result.blog_url}")
@@ -65,8 +253,17 @@ async def execute_automated_posting(
                 f"❌ Posting failed at step: {result.failed_step} - {result.error_message}"
             )
 
-        return response
+        return _posting_response(job.job_id, result)
 
+    except RateLimited as e:
+        logger.warning(f"Posting on {request.device_id} rejected: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.error(f"Invalid request: {e}")
         raise HTTPException(
@@ -79,3 +276,389 @@ async def execute_automated_posting(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Automation failed: {str(e)}",
         )
+
+
+@router.post(
+    "/jobs",
+    response_model=AutomationStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def submit_posting_job(
+    request: PostingRequest,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    """
+    Queue a posting job without waiting for it
+
+    Track progress with GET /automation/jobs/{job_id} or the
+    /automation/ws/jobs WebSocket. Repeats with the same Idempotency-Key
+    return the existing job instead of queueing another.
+    """
+    try:
+        job, replay = await _submit_idempotent(request, db, idempotency_key, response)
+        if replay:
+            return replay.status
+        return job.to_status()
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to submit job: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to submit job: {str(e)}",
+        )
+
+
+@router.post(
+    "/jobs/bulk",
+    response_model=BulkPostingResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def submit_bulk_posting_jobs(
+    bulk: BulkPostingRequest,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Queue many postings in one call
+
+    All items are validated first; duplicates (same title/content/images as
+    another item or a recent job) are skipped and reported, the rest are
+    queued atomically.
+    """
+    try:
+        return await _submit_bulk(bulk.requests, db, errors=[])
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Bulk submission failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Bulk submission failed: {str(e)}",
+        )
+
+
+@router.post(
+    "/jobs/bulk/ndjson",
+    response_model=BulkPostingResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def submit_bulk_posting_jobs_ndjson(
+    http_request: Request,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Queue many postings from a streamed NDJSON body
+
+    One PostingRequest JSON object per line (Content-Type: application/x-ndjson).
+    The body is parsed incrementally; same validation and dedup as /jobs/bulk,
+    with line-indexed errors.
+    """
+    try:
+        requests: List[PostingRequest] = []
+        indices: List[int] = []
+        errors: List[dict] = []
+        buffer = b""
+        index = 0
+
+        def parse_line(line: bytes):
+            nonlocal index
+            if not line.strip():
+                return
+            try:
+                requests.append(PostingRequest.model_validate_json(line))
+                indices.append(index)
+            except ValidationError as e:
+                errors.append({
+                    "index": index,
+                    "error": e.errors(include_url=False, include_input=False, include_context=False),
+                })
+            index += 1
+            if index > settings.BULK_MAX_REQUESTS:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Bulk submission limited to {settings.BULK_MAX_REQUESTS} postings",
+                )
+
+        async for chunk in http_request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                parse_line(line)
+        parse_line(buffer)
+
+        if not requests and not errors:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Empty NDJSON body",
+            )
+
+        return await _submit_bulk(requests, db, errors=errors, indices=indices)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"NDJSON bulk submission failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Bulk submission failed: {str(e)}",
+        )
+
+
+@router.get("/jobs", response_model=List[AutomationStatus])
+async def list_posting_jobs(
+    status_filter: Optional[JobStatus] = None,
+    device_id: Optional[str] = None,
+):
+    """
+    List known posting jobs
+
+    Query Parameters:
+    - status_filter: queued | running | succeeded | failed | cancelled
+    - device_id: Only jobs for this device
+    """
+    jobs = get_job_manager().list(status=status_filter, device_id=device_id)
+    return [job.to_status() for job in jobs]
+
+
+@router.get("/jobs/{job_id}", response_model=AutomationStatus)
+async def get_posting_job(job_id: str):
+    """Get current status of a posting job"""
+    return _get_job_or_404(job_id).to_status()
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=AutomationStatus)
+async def cancel_posting_job(job_id: str):
+    """
+    Cancel a posting job
+
+    A queued job is cancelled immediately; a running job stops at its next
+    step and frees the device. Poll the job (or follow the WebSocket) for
+    the final "cancelled" status.
+    """
+    job = _get_job_or_404(job_id)
+    if job.finished:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job already {job.status.value}: {job_id}",
+        )
+    return get_job_manager().cancel(job_id).to_status()
+
+
+@router.get("/rate-limits")
+async def get_rate_limits():
+    """
+    Current token-bucket state per device, profile and account
+
+    Jobs whose buckets are empty stay queued until `wait_seconds` elapses.
+    """
+    return {"buckets": get_rate_limiter().snapshot()}
+
+
+# Posting history and analytics
+
+
+@router.get("/history", response_model=PostingHistoryResponse)
+async def list_posting_history(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    filters: PostingHistoryFilter = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    List persisted posting results, newest first
+
+    Query Parameters:
+    - limit: Maximum number of records (default: 100)
+    - cursor: next_cursor of the previous page (keyset pagination)
+    - device_id, profile_id, status, failed_step, since, until: Filters
+    """
+    try:
+        manager = AsyncPostingHistoryManager(db)
+        records, next_cursor = await manager.list_postings(
+            limit=limit, cursor=cursor, filters=filters
+        )
+        return {
+            "records": [record.to_dict() for record in records],
+            "next_cursor": next_cursor,
+        }
+
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to list posting history: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to list posting history: {str(e)}",
+        )
+
+
+@router.get("/history/{record_id}", response_model=PostingRecordResponse)
+async def get_posting_record(record_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get one persisted posting result"""
+    record = await AsyncPostingHistoryManager(db).get_posting(record_id)
+    if not record:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Posting record not found: {record_id}",
+        )
+    return record.to_dict()
+
+
+@router.get("/analytics/summary", response_model=PostingSummaryResponse)
+async def get_posting_summary(
+    filters: PostingAnalyticsFilter = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Posting totals, success rate and postings per hour over a window
+
+    Query Parameters:
+    - device_id, profile_id, model, since, until: Filters (whole hours)
+    """
+    try:
+        return await AsyncPostingHistoryManager(db).get_summary(filters)
+
+    except Exception as e:
+        logger.error(f"Failed to get posting summary: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get posting summary: {str(e)}",
+        )
+
+
+@router.get("/analytics/failed-steps", response_model=List[FailedStepStats])
+async def get_failed_steps(
+    limit: int = Query(20, ge=1, le=100),
+    filters: PostingAnalyticsFilter = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Failures per step, most frequent first
+
+    e.g. which step fails most on a model this week:
+    ?model=SM-G991N&since=2025-11-03T00:00:00
+
+    Query Parameters:
+    - limit: Maximum steps (default: 20)
+    - device_id, profile_id, model, since, until: Filters (whole hours)
+    """
+    try:
+        return await AsyncPostingHistoryManager(db).get_failed_steps(filters, limit=limit)
+
+    except Exception as e:
+        logger.error(f"Failed to get failed steps: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get failed steps: {str(e)}",
+        )
+
+
+@router.get("/analytics/throughput", response_model=List[ThroughputStats])
+async def get_posting_throughput(
+    group_by: str = Query("device", description=" | ".join(THROUGHPUT_GROUPS)),
+    filters: PostingAnalyticsFilter = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Posting stats per device, profile or model, busiest first
+
+    Query Parameters:
+    - group_by: device | profile | model (default: device)
+    - device_id, profile_id, model, since, until: Filters (whole hours)
+    """
+    try:
+        return await AsyncPostingHistoryManager(db).get_throughput(group_by, filters)
+
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to get posting throughput: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get posting throughput: {str(e)}",
+        )
+
+
+@router.get("/analytics/hourly", response_model=List[HourlyPostingStats])
+async def get_hourly_postings(
+    filters: PostingAnalyticsFilter = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Posting stats per hour, oldest first (hours without postings omitted)
+
+    Query Parameters:
+    - device_id, profile_id, model, since, until: Filters (whole hours)
+    """
+    try:
+        return await AsyncPostingHistoryManager(db).get_hourly(filters)
+
+    except Exception as e:
+        logger.error(f"Failed to get hourly postings: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get hourly postings: {str(e)}",
+        )
+
+
+# WebSocket for live job progress
+@router.websocket("/ws/jobs")
+async def job_progress_websocket(websocket: WebSocket, job_id: Optional[str] = None):
+    """
+    WebSocket endpoint streaming step-level progress events
+
+    Sends a "snapshot" message with current job statuses, then one
+    AutomationEvent per step transition. Pass ?job_id=... to follow one job.
+    """
+    await websocket.accept()
+
+    hub = get_progress_hub()
+    subscription = hub.subscribe(job_id=job_id)
+    receiver = asyncio.create_task(websocket.receive_text())
+
+    try:
+        manager = get_job_manager()
+        jobs = [manager.get(job_id)] if job_id else manager.list()
+        await websocket.send_json({
+            "type": "snapshot",
+            "jobs": [job.to_status() for job in jobs if job],
+        })
+
+        while True:
+            getter = asyncio.create_task(subscription.get())
+            done, _ = await asyncio.wait(
+                {receiver, getter}, return_when=asyncio.FIRST_COMPLETED
+            )
+
+            if getter in done:
+                await websocket.send_json(getter.result())
+            else:
+                getter.cancel()
+
+            if receiver in done:
+                # Client messages: {"type": "stop"} ends the stream, others are ignored
+                try:
+                    message = json.loads(receiver.result())
+                except ValueError:
+                    message = None
+                if isinstance(message, dict) and message.get("type") == "stop":
+                    break
+                receiver = asyncio.create_task(websocket.receive_text())
+
+    except WebSocketDisconnect:
+        logger.info("Job progress WebSocket disconnected")
+
+    except Exception as e:
+        logger.error(f"Job progress WebSocket error: {e}")
+
+    finally:
+        receiver.cancel()
+        hub.unsubscribe(subscription)
+        try:
+            await websocket.close()
+        except Exception:
+            pass
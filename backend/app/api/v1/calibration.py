@@ -4,33 +4,31 @@ Interactive Calibration API Endpoints
 User clicks on device screen in admin dashboard to configure UI coordinates
 """
 from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, WebSocketDisconnect
-from sqlalchemy.orm import Session
-from typing import List, Dict
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
 from loguru import logger
 from datetime import datetime
 import asyncio
 import json
-import uuid
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.ui_elements import get_calibration_steps
-from app.services.device_manager import DeviceManager
+from app.services.device_manager import AsyncDeviceManager
 from app.services.adb_controller import ADBController
+from app.services.calibration_sessions import StepConflict, get_session_store
+from app.services.device_executor import run_on_device
 from app.services.debug_logger import get_debug_logger, remove_debug_logger
 from app.schemas.coordinate import (
     CalibrationSession,
     CalibrationResult,
     CalibrationGuide,
-    CoordinateCreate,
-    CoordinateUpdate,
+    CoordinateUpsert,
 )
+from app.schemas.device import DeviceProfileUpdate
 from app.models.coordinate import UIElementType, CalibrationMethod
 
 router = APIRouter()
 
-# In-memory storage for active calibration sessions
-active_sessions: Dict[str, dict] = {}
-
 # Calibration workflow steps (loaded from ui_elements.py)
 CALIBRATION_STEPS = get_calibration_steps()
 
@@ -39,7 +37,7 @@ CALIBRATION_STEPS = get_calibration_steps()
 async def start_calibration_session(
     profile_id: str,
     calibrated_by: str = "admin",
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Start new interactive calibration session
@@ -48,8 +46,8 @@ async def start_calibration_session(
     """
     try:
         # Verify profile exists
-        manager = DeviceManager(db)
-        profile = manager.get_profile(profile_id)
+        manager = AsyncDeviceManager(db)
+        profile = await manager.get_profile(profile_id)
 
         if not profile:
             raise HTTPException(
@@ -58,18 +56,10 @@ async def start_calibration_session(
             )
 
         # Create session
-        session_id = str(uuid.uuid4())
-        session_data = {
-            "session_id": session_id,
-            "profile_id": profile_id,
-            "calibrated_by": calibrated_by,
-            "current_step": 0,
-            "total_steps": len(CALIBRATION_STEPS),
-            "completed_steps": [],
-            "created_at": datetime.utcnow(),
-        }
-
-        active_sessions[session_id] = session_data
+        session = await get_session_store().create(
+            profile_id, calibrated_by, len(CALIBRATION_STEPS)
+        )
+        session_id = session.session_id
 
         # Get first step
         first_step = CALIBRATION_STEPS[0]
@@ -101,20 +91,20 @@ async def start_calibration_session(
 async def get_calibration_session(session_id: str):
     """Get current calibration session status"""
     try:
-        if session_id not in active_sessions:
+        session = await get_session_store().get(session_id)
+        if session is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Session not found: {session_id}",
             )
 
-        session = active_sessions[session_id]
-        current_step_idx = session["current_step"]
+        current_step_idx = session.current_step
 
         if current_step_idx >= len(CALIBRATION_STEPS):
             # Session completed
             return CalibrationSession(
                 session_id=session_id,
-                profile_id=session["profile_id"],
+                profile_id=session.profile_id,
                 current_step=current_step_idx,
                 total_steps=len(CALIBRATION_STEPS),
                 element_type="completed",
@@ -128,7 +118,7 @@ async def get_calibration_session(session_id: str):
 
         return CalibrationSession(
             session_id=session_id,
-            profile_id=session["profile_id"],
+            profile_id=session.profile_id,
             current_step=current_step_idx,
             total_steps=len(CALIBRATION_STEPS),
             element_type=step["element_type"].value,
@@ -151,7 +141,7 @@ async def get_calibration_session(session_id: str):
 async def submit_calibration_coordinate(
     session_id: str,
     result: CalibrationResult,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Submit user-clicked coordinate for current step
@@ -159,67 +149,77 @@ async def submit_calibration_coordinate(
     User clicks on device screen in admin UI, frontend sends coordinates here
     """
     try:
-        if session_id not in active_sessions:
+        store = get_session_store()
+        session = await store.get(session_id)
+        if session is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Session not found: {session_id}",
             )
 
-        session = active_sessions[session_id]
-        current_step_idx = session["current_step"]
-
+        current_step_idx = session.current_step
         if current_step_idx >= len(CALIBRATION_STEPS):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Calibration already completed",
             )
 
+        # Claim the step before saving: of concurrent submits for it (on
+        # any API worker) only one advances the session
+        try:
+            session = await store.advance(session_id, current_step_idx)
+        except StepConflict:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Step {current_step_idx + 1} was already submitted",
+            )
+        if session is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Session not found: {session_id}",
+            )
+
         # Get current step
         step = CALIBRATION_STEPS[current_step_idx]
 
-        # Save coordinate to database
-        manager = DeviceManager(db)
-        coord_data = CoordinateCreate(
-            profile_id=session["profile_id"],
-            element_type=step["element_type"].value,
-            element_name=step["element_name"],
-            element_description=step.get("help_text", ""),
-            x=result.x,
-            y=result.y,
-            confidence=0.95,  # High confidence for user-clicked coordinates
-            validated=False,  # Will be validated through actual testing
-            calibration_method=CalibrationMethod.USER_CLICK.value,
-            calibrated_by=session["calibrated_by"],
-            touch_radius=20,
-        )
-
-        # Check if coordinate for this element already exists
-        existing_coords = manager.get_coordinates(
-            session["profile_id"], element_type=step["element_type"]
-        )
-
-        if existing_coords:
-            # Update existing coordinate
-            coord = manager.update_coordinate(
-                existing_coords[0].id,
-                CoordinateUpdate(
-                    x=result.x,
-                    y=result.y,
-                    confidence=0.95,
-                    validated=False,
-                    calibration_method=CalibrationMethod.USER_CLICK.value,
-                    calibrated_by=session["calibrated_by"],
+        # Save coordinate (and, on the last step, the profile's calibration
+        # status) to the database in one transaction; give the step back if
+        # that fails
+        try:
+            manager = AsyncDeviceManager(db)
+            is_last_step = current_step_idx + 1 >= len(CALIBRATION_STEPS)
+            coords = await manager.upsert_coordinates(
+                session.profile_id,
+                [
+                    CoordinateUpsert(
+                        element_type=step["element_type"].value,
+                        element_name=step["element_name"],
+                        element_description=step.get("help_text", ""),
+                        x=result.x,
+                        y=result.y,
+                        confidence=0.95,  # High confidence for user-clicked coordinates
+                        validated=False,  # Will be validated through actual testing
+                        calibration_method=CalibrationMethod.USER_CLICK.value,
+                        calibrated_by=session.calibrated_by,
+                    )
+                ],
+                profile_update=(
+                    DeviceProfileUpdate(calibrated=True, calibration_confidence=0.95)
+                    if is_last_step
+                    else None
                 ),
+                source="calibration",
             )
-        else:
-            # Create new coordinate
-            coord = manager.create_coordinate(coord_data)
 
-        if not coord:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to save coordinate",
-            )
+            if coords is None:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Failed to save coordinate",
+                )
+
+        except Exception:
+            await store.rewind(session_id, current_step_idx)
+            raise
 
         logger.info(
             f"Saved coordinate for {step['element_name']}: ({result.x}, {result.y})"
@@ -235,33 +235,22 @@ async def submit_calibration_coordinate(
             screenshot_b64=None,  # Will be captured by WebSocket
         )
 
-        # Mark step as completed
-        session["completed_steps"].append(current_step_idx)
-
-        # Move to next step
-        session["current_step"] += 1
-        next_step_idx = session["current_step"]
-
         # Check if calibration is complete
+        next_step_idx = session.current_step
         if next_step_idx >= len(CALIBRATION_STEPS):
-            # Update profile calibration status
-            from app.schemas.device import DeviceProfileUpdate
-
-            manager.update_profile(
-                session["profile_id"],
-                DeviceProfileUpdate(
-                    calibrated=True,
-                    calibration_confidence=0.95,
-                ),
-            )
-
             logger.info(
-                f"Calibration completed for profile: {session['profile_id']}"
+                f"Calibration completed for profile: {session.profile_id}"
+            )
+            debug_logger.finalize_session(
+                success=True,
+                total_steps=len(CALIBRATION_STEPS),
+                completed_steps=len(session.completed_steps),
             )
+            remove_debug_logger(session_id)
 
             return CalibrationSession(
                 session_id=session_id,
-                profile_id=session["profile_id"],
+                profile_id=session.profile_id,
                 current_step=next_step_idx,
                 total_steps=len(CALIBRATION_STEPS),
                 element_type="completed",
@@ -275,7 +264,7 @@ async def submit_calibration_coordinate(
 
         return CalibrationSession(
             session_id=session_id,
-            profile_id=session["profile_id"],
+            profile_id=session.profile_id,
             current_step=next_step_idx,
             total_steps=len(CALIBRATION_STEPS),
             element_type=next_step["element_type"].value,
@@ -298,9 +287,9 @@ async def submit_calibration_coordinate(
 async def cancel_calibration_session(session_id: str):
     """Cancel and remove calibration session"""
     try:
-        if session_id in active_sessions:
-            del active_sessions[session_id]
+        if await get_session_store().delete(session_id):
             logger.info(f"Cancelled calibration session: {session_id}")
+        remove_debug_logger(session_id)
 
         return None
 
@@ -355,7 +344,7 @@ async def calibration_websocket(websocket: WebSocket, device_id: str):
 
     try:
         controller = ADBController(device_id)
-        if not controller.connect():
+        if not await run_on_device(device_id, controller.connect):
             await websocket.send_json({
                 "type": "error",
                 "message": f"Failed to connect to device: {device_id}",
@@ -386,7 +375,9 @@ async def calibration_websocket(websocket: WebSocket, device_id: str):
                     pass
 
                 # Capture and send screenshot
-                screenshot_b64 = controller.screenshot_base64(quality=70)
+                screenshot_b64 = await run_on_device(
+                    device_id, controller.screenshot_base64, quality=70
+                )
 
                 await websocket.send_json({
                     "type": "screenshot",
@@ -1,41 +1,57 @@
 """
 Device Management API Endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Response
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import List, Optional
 from loguru import logger
+import asyncio
+import tempfile
 
-from app.core.database import get_db
-from app.services.device_manager import DeviceManager
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.services.device_manager import AsyncDeviceManager
 from app.services.adb_controller import ADBController
+from app.services.device_executor import run_on_device
+from app.services.device_readiness import get_readiness_manager
+from app.services.device_workers import get_worker_supervisor
+from app.services.profile_bundle import export_bundle, import_bundle
 from app.schemas.device import (
     DeviceInfo,
     DeviceProfileResponse,
     DeviceListResponse,
+    DeviceProfileFilter,
     DeviceProfileUpdate,
     DeviceConnectionStatus,
+    RegisteredDeviceResponse,
+    RegisteredDeviceListResponse,
 )
 from app.schemas.coordinate import (
     CoordinateResponse,
     CoordinateCreate,
     CoordinateUpdate,
     CoordinateListResponse,
+    CoordinateFilter,
+    CoordinateSetUpsert,
+    CoordinateVersionDetail,
+    CoordinateVersionListResponse,
 )
 
 router = APIRouter()
 
 
 @router.get("/scan", response_model=List[DeviceInfo])
-async def scan_devices(db: Session = Depends(get_db)):
+async def scan_devices(db: AsyncSession = Depends(get_async_db)):
     """
     Scan for connected ADB devices
 
     Returns list of all connected devices with their information
     """
     try:
-        manager = DeviceManager(db)
-        devices = manager.scan_devices()
+        manager = AsyncDeviceManager(db)
+        devices = await manager.scan_devices()
 
         if not devices:
             raise HTTPException(
@@ -54,7 +70,7 @@ async def scan_devices(db: Session = Depends(get_db)):
 
 
 @router.post("/connect/{device_id}", response_model=DeviceProfileResponse)
-async def connect_device(device_id: str, db: Session = Depends(get_db)):
+async def connect_device(device_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Connect to specific device and create/update profile
 
@@ -63,25 +79,22 @@ async def connect_device(device_id: str, db: Session = Depends(get_db)):
     try:
         # Create ADB controller for this device
         controller = ADBController(device_id)
-        if not controller.connect():
+        if not await run_on_device(device_id, controller.connect):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Failed to connect to device: {device_id}",
             )
 
         # Get device info
-        device_info = controller.get_device_info()
+        device_info = await run_on_device(device_id, controller.get_device_info)
 
         # Get or create profile
-        manager = DeviceManager(db)
-        profile = manager.get_or_create_profile(device_info)
+        manager = AsyncDeviceManager(db)
+        profile = await manager.get_or_create_profile(device_info)
 
-        # Get coordinate count
-        coords = manager.get_coordinates(profile.profile_id)
-        response_data = profile.to_dict()
-        response_data["coordinate_count"] = len(coords)
-
-        return response_data
+        # Add coordinate stats
+        stats = await manager.get_coordinate_stats([profile.profile_id])
+        return {**profile.to_dict(), **stats[profile.profile_id]}
 
     except HTTPException:
         raise
@@ -95,31 +108,40 @@ async def connect_device(device_id: str, db: Session = Depends(get_db)):
 
 @router.get("/profiles", response_model=DeviceListResponse)
 async def list_profiles(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    filters: DeviceProfileFilter = Depends(),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
-    List all device profiles with pagination
+    List device profiles with pagination and filters
 
     Query Parameters:
-    - skip: Number of records to skip (default: 0)
     - limit: Maximum number of records (default: 100)
+    - cursor: next_cursor of the previous page (keyset pagination)
+    - skip: Number of records to skip (default: 0; prefer cursor)
+    - include_total: Count all matching profiles (default: true)
+    - model, calibrated, min_confidence, used_since, used_before: Filters
     """
     try:
-        manager = DeviceManager(db)
-        profiles, total = manager.list_profiles(skip=skip, limit=limit)
+        manager = AsyncDeviceManager(db)
+        rows, total, next_cursor = await manager.list_profiles_with_stats(
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            filters=filters,
+            include_total=include_total,
+        )
 
-        # Convert to response format
-        profiles_data = []
-        for profile in profiles:
-            data = profile.to_dict()
-            coords = manager.get_coordinates(profile.profile_id)
-            data["coordinate_count"] = len(coords)
-            profiles_data.append(data)
+        # Convert to response format (stats are fetched for the page only)
+        profiles_data = [{**profile.to_dict(), **stats} for profile, stats in rows]
 
-        return {"total": total, "devices": profiles_data}
+        return {"total": total, "devices": profiles_data, "next_cursor": next_cursor}
 
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to list profiles: {e}")
         raise HTTPException(
@@ -128,25 +150,80 @@ async def list_profiles(
         )
 
 
+@router.get("/profiles/export")
+async def export_profiles(
+    profile_id: Optional[List[str]] = Query(None),
+    compress: bool = False,
+    include_history: bool = True,
+):
+    """
+    Export profiles with their coordinates as a bundle (streamed)
+
+    Query Parameters:
+    - profile_id: Profiles to export, repeatable (default: all)
+    - compress: zstd-compress the bundle (default: false)
+    - include_history: Include the coordinate history (default: true)
+    """
+    suffix = ".msgpack.zst" if compress else ".msgpack"
+    filename = f"careon-profiles-{datetime.utcnow():%Y%m%d-%H%M%S}{suffix}"
+    return StreamingResponse(
+        export_bundle(profile_id, compress=compress, include_history=include_history),
+        media_type="application/zstd" if compress else "application/x-msgpack",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/profiles/import")
+async def import_profiles(request: Request, merge: bool = True):
+    """
+    Import a profile bundle from the request body (plain or zstd)
+
+    New profiles are created with their coordinates and history. Existing
+    profiles are merged (merge=true, default) or left untouched
+    (merge=false). The import is all-or-nothing.
+
+    The body is received into a temporary file (in memory up to
+    PROFILE_BUNDLE_SPOOL_MEMORY) before the import transaction starts, so a
+    slow upload never holds the database write lock.
+    """
+    try:
+        with tempfile.SpooledTemporaryFile(
+            max_size=settings.PROFILE_BUNDLE_SPOOL_MEMORY
+        ) as spool:
+            async for chunk in request.stream():
+                if chunk:
+                    await asyncio.to_thread(spool.write, chunk)
+            spool.seek(0)
+            return await asyncio.to_thread(import_bundle, spool, merge)
+
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid profile bundle: {str(e)}",
+        )
+    except Exception as e:
+        logger.error(f"Profile import failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to import profiles: {str(e)}",
+        )
+
+
 @router.get("/profiles/{profile_id}", response_model=DeviceProfileResponse)
-async def get_profile(profile_id: str, db: Session = Depends(get_db)):
+async def get_profile(profile_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get specific device profile by ID"""
     try:
-        manager = DeviceManager(db)
-        profile = manager.get_profile(profile_id)
+        manager = AsyncDeviceManager(db)
+        row = await manager.get_profile_with_stats(profile_id)
 
-        if not profile:
+        if not row:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Profile not found: {profile_id}",
             )
 
-        # Add coordinate count
-        coords = manager.get_coordinates(profile_id)
-        response_data = profile.to_dict()
-        response_data["coordinate_count"] = len(coords)
-
-        return response_data
+        profile, stats = row
+        return {**profile.to_dict(), **stats}
 
     except HTTPException:
         raise
@@ -162,12 +239,12 @@ async def get_profile(profile_id: str, db: Session = Depends(get_db)):
 async def update_profile(
     profile_id: str,
     update_data: DeviceProfileUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Update device profile"""
     try:
-        manager = DeviceManager(db)
-        profile = manager.update_profile(profile_id, update_data)
+        manager = AsyncDeviceManager(db)
+        profile = await manager.update_profile(profile_id, update_data)
 
         if not profile:
             raise HTTPException(
@@ -175,12 +252,9 @@ async def update_profile(
                 detail=f"Profile not found: {profile_id}",
             )
 
-        # Add coordinate count
-        coords = manager.get_coordinates(profile_id)
-        response_data = profile.to_dict()
-        response_data["coordinate_count"] = len(coords)
-
-        return response_data
+        # Add coordinate stats
+        stats = await manager.get_coordinate_stats([profile_id])
+        return {**profile.to_dict(), **stats[profile_id]}
 
     except HTTPException:
         raise
@@ -193,11 +267,11 @@ async def update_profile(
 
 
 @router.delete("/profiles/{profile_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_profile(profile_id: str, db: Session = Depends(get_db)):
+async def delete_profile(profile_id: str, db: AsyncSession = Depends(get_async_db)):
     """Delete device profile and all associated coordinates"""
     try:
-        manager = DeviceManager(db)
-        success = manager.delete_profile(profile_id)
+        manager = AsyncDeviceManager(db)
+        success = await manager.delete_profile(profile_id)
 
         if not success:
             raise HTTPException(
@@ -217,29 +291,104 @@ async def delete_profile(profile_id: str, db: Session = Depends(get_db)):
         )
 
 
+# Device Registry Endpoints
+
+@router.get("/registered", response_model=RegisteredDeviceListResponse)
+async def list_registered_devices(
+    profile_id: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    List devices that have connected at least once
+
+    Query Parameters:
+    - profile_id: Only devices using this profile
+    """
+    try:
+        manager = AsyncDeviceManager(db)
+        devices = await manager.list_devices(profile_id=profile_id)
+        return {"total": len(devices), "devices": [device.to_dict() for device in devices]}
+
+    except Exception as e:
+        logger.error(f"Failed to list devices: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to list devices: {str(e)}",
+        )
+
+
+@router.get("/registered/{serial}", response_model=RegisteredDeviceResponse)
+async def get_registered_device(serial: str, db: AsyncSession = Depends(get_async_db)):
+    """Get a device's profile and health by ADB serial"""
+    try:
+        manager = AsyncDeviceManager(db)
+        device = await manager.get_device(serial)
+
+        if not device:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Device not registered: {serial}",
+            )
+
+        return device.to_dict()
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to get device: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get device: {str(e)}",
+        )
+
+
 # Coordinate Management Endpoints
 
 @router.get("/profiles/{profile_id}/coordinates", response_model=CoordinateListResponse)
-async def get_coordinates(profile_id: str, db: Session = Depends(get_db)):
-    """Get all coordinate configurations for a profile"""
+async def get_coordinates(
+    profile_id: str,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    filters: CoordinateFilter = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Get coordinate configurations for a profile
+
+    Query Parameters:
+    - limit: Maximum number of records (default: all)
+    - cursor: next_cursor of the previous page (keyset pagination)
+    - include_total: Count all matching coordinates (default: true)
+    - element_type, validated, calibrated, min_confidence, used_since,
+      used_before: Filters
+    """
     try:
-        manager = DeviceManager(db)
+        manager = AsyncDeviceManager(db)
 
         # Check if profile exists
-        profile = manager.get_profile(profile_id)
+        profile = await manager.get_profile(profile_id)
         if not profile:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Profile not found: {profile_id}",
             )
 
-        coords = manager.get_coordinates(profile_id)
+        coords, total, next_cursor = await manager.list_coordinates(
+            profile_id,
+            limit=limit,
+            cursor=cursor,
+            filters=filters,
+            include_total=include_total,
+        )
         coords_data = [coord.to_dict() for coord in coords]
 
-        return {"total": len(coords_data), "coordinates": coords_data}
+        return {"total": total, "coordinates": coords_data, "next_cursor": next_cursor}
 
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to get coordinates: {e}")
         raise HTTPException(
@@ -248,15 +397,166 @@ async def get_coordinates(profile_id: str, db: Session = Depends(get_db)):
         )
 
 
+@router.put("/profiles/{profile_id}/coordinates", response_model=CoordinateListResponse)
+async def upsert_coordinates(
+    profile_id: str,
+    coordinate_set: CoordinateSetUpsert,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Write a profile's coordinate set in one transaction
+
+    Creates missing elements and updates existing ones (only the fields
+    sent). With "prune": true, elements not in the set are deleted.
+    """
+    try:
+        manager = AsyncDeviceManager(db)
+
+        profile = await manager.get_profile(profile_id)
+        if not profile:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Profile not found: {profile_id}",
+            )
+
+        coords = await manager.upsert_coordinates(
+            profile_id, coordinate_set.coordinates, prune=coordinate_set.prune
+        )
+        if coords is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Failed to write coordinates",
+            )
+
+        coords_data = [coord.to_dict() for coord in coords]
+        return {"total": len(coords_data), "coordinates": coords_data}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to upsert coordinates: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to upsert coordinates: {str(e)}",
+        )
+
+
+@router.get(
+    "/profiles/{profile_id}/coordinates/history",
+    response_model=CoordinateVersionListResponse,
+)
+async def list_coordinate_versions(
+    profile_id: str,
+    limit: int = Query(50, ge=1),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Coordinate history of a profile, newest version first
+
+    Every change to the coordinate set (calibration, edits, rollbacks)
+    appends a version.
+    """
+    try:
+        manager = AsyncDeviceManager(db)
+
+        profile = await manager.get_profile(profile_id)
+        if not profile:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Profile not found: {profile_id}",
+            )
+
+        versions = await manager.get_coordinate_versions(profile_id, limit=limit)
+        return {
+            "profile_id": profile_id,
+            "versions": [version.to_dict() for version in versions],
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to list coordinate versions: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to list coordinate versions: {str(e)}",
+        )
+
+
+@router.get(
+    "/profiles/{profile_id}/coordinates/history/{version}",
+    response_model=CoordinateVersionDetail,
+)
+async def get_coordinate_version(
+    profile_id: str, version: int, db: AsyncSession = Depends(get_async_db)
+):
+    """Coordinate set of one version of a profile"""
+    try:
+        manager = AsyncDeviceManager(db)
+        coordinates = await manager.get_coordinate_version(profile_id, version)
+
+        if coordinates is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Coordinate version not found: {profile_id} v{version}",
+            )
+
+        return {"profile_id": profile_id, "version": version, "coordinates": coordinates}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to get coordinate version: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get coordinate version: {str(e)}",
+        )
+
+
+@router.post(
+    "/profiles/{profile_id}/coordinates/history/{version}/activate",
+    response_model=CoordinateListResponse,
+)
+async def activate_coordinate_version(
+    profile_id: str, version: int, db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Roll the profile's live coordinates back to a prior version
+
+    The restored set is appended as a new version, so the rollback itself
+    can be undone. Running jobs keep the coordinates they started with.
+    """
+    try:
+        manager = AsyncDeviceManager(db)
+        coords = await manager.activate_coordinate_version(profile_id, version)
+
+        if coords is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Coordinate version not found: {profile_id} v{version}",
+            )
+
+        coords_data = [coord.to_dict() for coord in coords]
+        return {"total": len(coords_data), "coordinates": coords_data}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to activate coordinate version: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to activate coordinate version: {str(e)}",
+        )
+
+
 @router.post("/coordinates", response_model=CoordinateResponse, status_code=status.HTTP_201_CREATED)
 async def create_coordinate(
     coord_data: CoordinateCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Create new coordinate configuration"""
     try:
-        manager = DeviceManager(db)
-        coord = manager.create_coordinate(coord_data)
+        manager = AsyncDeviceManager(db)
+        coord = await manager.create_coordinate(coord_data)
 
         if not coord:
             raise HTTPException(
@@ -280,12 +580,12 @@ async def create_coordinate(
 async def update_coordinate(
     coord_id: int,
     update_data: CoordinateUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Update coordinate configuration"""
     try:
-        manager = DeviceManager(db)
-        coord = manager.update_coordinate(coord_id, update_data)
+        manager = AsyncDeviceManager(db)
+        coord = await manager.update_coordinate(coord_id, update_data)
 
         if not coord:
             raise HTTPException(
@@ -306,11 +606,11 @@ async def update_coordinate(
 
 
 @router.delete("/coordinates/{coord_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_coordinate(coord_id: int, db: Session = Depends(get_db)):
+async def delete_coordinate(coord_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete coordinate configuration"""
     try:
-        manager = DeviceManager(db)
-        success = manager.delete_coordinate(coord_id)
+        manager = AsyncDeviceManager(db)
+        success = await manager.delete_coordinate(coord_id)
 
         if not success:
             raise HTTPException(
@@ -339,13 +639,13 @@ async def get_screenshot(device_id: str):
     """
     try:
         controller = ADBController(device_id)
-        if not controller.connect():
+        if not await run_on_device(device_id, controller.connect):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Failed to connect to device: {device_id}",
             )
 
-        screenshot_b64 = controller.screenshot_base64(quality=80)
+        screenshot_b64 = await run_on_device(device_id, controller.screenshot_base64, quality=80)
 
         return {
             "device_id": device_id,
@@ -361,3 +661,56 @@ async def get_screenshot(device_id: str):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to capture screenshot: {str(e)}",
         )
+
+
+@router.get("/readiness")
+async def list_device_readiness():
+    """
+    Readiness of known devices
+
+    A "ready" device is staged on the blog app main screen and the next
+    posting can start immediately.
+    """
+    return {"devices": get_readiness_manager().snapshot()}
+
+
+@router.get("/workers")
+async def list_device_workers():
+    """
+    Device worker processes (DEVICE_WORKER_MODE=process)
+
+    Shows which devices each worker owns, its pid, call count and restarts.
+    """
+    return {
+        "mode": settings.DEVICE_WORKER_MODE,
+        "workers": get_worker_supervisor().snapshot(),
+    }
+
+
+@router.post("/{device_id}/stage")
+async def stage_device(device_id: str):
+    """
+    Bring a device to the blog app main screen now
+
+    Tries BACK presses first and cold-starts the app only if needed.
+    """
+    try:
+        manager = get_readiness_manager()
+        ready = await run_on_device(device_id, manager.stage_device, device_id)
+        record = manager.get(device_id).to_dict()
+
+        if not ready:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Failed to stage device {device_id}: {record['last_error']}",
+            )
+        return record
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Staging failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to stage device: {str(e)}",
+        )
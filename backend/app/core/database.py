@@ -1,23 +1,229 @@
 """
 Database connection and session management
+
+The engine comes from create_db_engine(), which applies the tuning
+profile for SQLite files:
+- WAL journal: readers never block the writer and vice versa
+- synchronous=NORMAL: fsync at checkpoints instead of every commit
+  (durable against application crashes; WAL keeps the file consistent)
+- mmap_size: reads served from the page cache without read() copies
+- busy timeout: concurrent writers queue instead of failing with
+  "database is locked"
+- a sized connection pool, and SQL echo only when DATABASE_ECHO is set
+
+and the server profile for PostgreSQL (postgresql:// URLs, psycopg2 for
+the sync engine and asyncpg for the async one):
+- a sized pool shared by the worker's threads, with pre-ping so a
+  connection dropped by the server or a proxy is replaced instead of
+  failing the next query
+- pool_recycle below typical server/proxy idle timeouts
+- pool_timeout so a starved pool fails the request instead of hanging
+
+Several API workers and device processes can share one PostgreSQL
+database; a SQLite file serializes all of their writes.
+
+Models use PortableJSON and portable_enum() so the same schema maps to
+JSONB and plain VARCHAR enums on PostgreSQL and to JSON text on SQLite.
+
+Two session paths share that profile:
+- get_async_db / AsyncSessionLocal (aiosqlite): FastAPI endpoints, so
+  queries are awaited instead of blocking the event loop
+- get_db / SessionLocal: scripts, benchmarks and device threads
 """
-from sqlalchemy import create_engine
+from sqlalchemy import JSON, Enum, create_engine, event, inspect
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import Engine, URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from typing import AsyncGenerator, Generator, Optional
 
 from app.core.config import settings
 
+
+def _is_sqlite_file(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def _is_server(url) -> bool:
+    return url.get_backend_name() != "sqlite"
+
+
+def create_db_engine(
+    database_url: str = settings.DATABASE_URL,
+    echo: bool = settings.DATABASE_ECHO,
+    wal: bool = settings.SQLITE_WAL,
+    synchronous: str = settings.SQLITE_SYNCHRONOUS,
+    mmap_size: int = settings.SQLITE_MMAP_SIZE,
+    busy_timeout_ms: int = settings.SQLITE_BUSY_TIMEOUT_MS,
+    pool_size: int = settings.DATABASE_POOL_SIZE,
+    max_overflow: int = settings.DATABASE_MAX_OVERFLOW,
+    pre_ping: bool = settings.DATABASE_POOL_PRE_PING,
+    pool_recycle: int = settings.DATABASE_POOL_RECYCLE,
+    pool_timeout: float = settings.DATABASE_POOL_TIMEOUT,
+) -> Engine:
+    """
+    Create an engine with the connection tuning profile
+
+    Args:
+        database_url: SQLAlchemy database URL
+        echo: Log every SQL statement
+        wal: Use the WAL journal (SQLite)
+        synchronous: PRAGMA synchronous value (SQLite)
+        mmap_size: Bytes of the database file to memory-map (SQLite, 0 = off)
+        busy_timeout_ms: Wait this long for a lock before failing (SQLite)
+        pool_size: Persistent pooled connections
+        max_overflow: Extra connections allowed under load
+        pre_ping: Test pooled connections before use (server databases)
+        pool_recycle: Replace connections older than this many seconds
+            (server databases, -1 = never)
+        pool_timeout: Seconds to wait for a free pooled connection
+            (server databases)
+
+    Returns:
+        Engine
+    """
+    url = make_url(database_url)
+    engine = create_engine(
+        url,
+        **_engine_options(
+            url, echo, busy_timeout_ms, pool_size, max_overflow,
+            pre_ping, pool_recycle, pool_timeout,
+        ),
+    )
+    if _is_sqlite_file(url):
+        _install_sqlite_pragmas(engine, wal, synchronous, mmap_size, busy_timeout_ms)
+    return engine
+
+
+def create_async_db_engine(
+    database_url: str = settings.DATABASE_URL,
+    echo: bool = settings.DATABASE_ECHO,
+    wal: bool = settings.SQLITE_WAL,
+    synchronous: str = settings.SQLITE_SYNCHRONOUS,
+    mmap_size: int = settings.SQLITE_MMAP_SIZE,
+    busy_timeout_ms: int = settings.SQLITE_BUSY_TIMEOUT_MS,
+    pool_size: int = settings.DATABASE_POOL_SIZE,
+    max_overflow: int = settings.DATABASE_MAX_OVERFLOW,
+    pre_ping: bool = settings.DATABASE_POOL_PRE_PING,
+    pool_recycle: int = settings.DATABASE_POOL_RECYCLE,
+    pool_timeout: float = settings.DATABASE_POOL_TIMEOUT,
+) -> AsyncEngine:
+    """
+    Create an asyncio engine with the same tuning profile
+
+    A sync URL is mapped to its async driver (sqlite -> sqlite+aiosqlite,
+    postgresql -> postgresql+asyncpg).
+    Arguments are the same as create_db_engine().
+
+    Returns:
+        AsyncEngine
+    """
+    url = async_database_url(make_url(database_url))
+    options = _engine_options(
+        url, echo, busy_timeout_ms, pool_size, max_overflow,
+        pre_ping, pool_recycle, pool_timeout,
+    )
+    if _is_sqlite_file(url):
+        # aiosqlite defaults to NullPool (a new connection per session)
+        options["poolclass"] = AsyncAdaptedQueuePool
+    engine = create_async_engine(url, **options)
+    if _is_sqlite_file(url):
+        _install_sqlite_pragmas(engine.sync_engine, wal, synchronous, mmap_size, busy_timeout_ms)
+    return engine
+
+
+def async_database_url(url: URL) -> URL:
+    """Map a database URL to its asyncio driver"""
+    if url.get_backend_name() == "sqlite" and url.get_driver_name() != "aiosqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    if url.get_backend_name() == "postgresql" and url.get_driver_name() != "asyncpg":
+        return url.set(drivername="postgresql+asyncpg")
+    return url
+
+
+def _engine_options(
+    url: URL,
+    echo: bool,
+    busy_timeout_ms: int,
+    pool_size: int,
+    max_overflow: int,
+    pre_ping: bool,
+    pool_recycle: int,
+    pool_timeout: float,
+) -> dict:
+    options = {"echo": echo}
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {
+            "check_same_thread": False,
+            "timeout": busy_timeout_ms / 1000,
+        }
+    if _is_sqlite_file(url) or _is_server(url):
+        options["pool_size"] = pool_size
+        options["max_overflow"] = max_overflow
+    if _is_server(url):
+        options["pool_pre_ping"] = pre_ping
+        options["pool_recycle"] = pool_recycle
+        options["pool_timeout"] = pool_timeout
+    return options
+
+
+def _install_sqlite_pragmas(
+    engine: Engine, wal: bool, synchronous: str, mmap_size: int, busy_timeout_ms: int
+):
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            if wal:
+                cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute(f"PRAGMA synchronous={synchronous}")
+            cursor.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+            cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+        finally:
+            cursor.close()
+
+
+def sqlite_pragmas(engine: Engine) -> Optional[dict]:
+    """Effective SQLite settings of an engine (None for other databases)"""
+    if engine.url.get_backend_name() != "sqlite":
+        return None
+    with engine.connect() as conn:
+        return {
+            name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name in ("journal_mode", "synchronous", "mmap_size", "busy_timeout")
+        }
+
+
+# Portable column types: JSONB on PostgreSQL (binary, indexable), JSON
+# text elsewhere
+PortableJSON = JSON().with_variant(JSONB(), "postgresql")
+
+
+def portable_enum(enum_class, **kwargs) -> Enum:
+    """
+    Enum column stored as VARCHAR on every database
+
+    Member names are stored, as SQLAlchemy's Enum does on SQLite, so
+    existing rows read back unchanged. No native PostgreSQL ENUM type is
+    created, so adding a member needs no ALTER TYPE migration.
+    """
+    return Enum(enum_class, native_enum=False, length=50, **kwargs)
+
+
 # Create SQLAlchemy engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False},  # SQLite specific
-    echo=settings.DEBUG,
-)
+engine = create_db_engine()
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and sessions for API endpoints (objects stay usable after commit)
+async_engine = create_async_db_engine()
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
 # Create Base class for models
 Base = declarative_base()
 
@@ -38,8 +244,40 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async database dependency for FastAPI endpoints
+
+    Usage:
+        @app.get("/items")
+        async def read_items(db: AsyncSession = Depends(get_async_db)):
+            ...
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db():
     """Initialize database tables"""
-    from app.models import device, coordinate  # Import all models
+    from app.models import device, coordinate, posting, calibration  # Import all models
 
     Base.metadata.create_all(bind=engine)
+    _create_missing_indexes(engine)
+
+
+def _create_missing_indexes(bind: Engine):
+    """
+    Create indexes added to tables that already exist
+
+    create_all() skips existing tables entirely, so a database created
+    before an index was declared would never get it.
+    """
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=bind)
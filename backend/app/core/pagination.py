@@ -0,0 +1,49 @@
+"""
+Keyset pagination cursors
+
+A page ends with the sort key of its last row; the next page starts with
+a seek past that key (WHERE key > :after ORDER BY key LIMIT n), so every
+page costs the same index range scan no matter how deep it is, and rows
+inserted or deleted meanwhile do not shift the pages like OFFSET does.
+
+Cursors are opaque to clients: the key JSON-encoded and base64url'd.
+"""
+from typing import Any, Optional
+import base64
+import json
+
+
+def encode_cursor(key: Any) -> str:
+    """
+    Encode the sort key of a page's last row
+
+    Args:
+        key: JSON-serializable key (e.g. a primary key)
+
+    Returns:
+        Opaque cursor string
+    """
+    raw = json.dumps(key, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Any:
+    """
+    Decode a cursor from encode_cursor()
+
+    Args:
+        cursor: Cursor string (None = first page)
+
+    Returns:
+        The key, or None for the first page
+
+    Raises:
+        ValueError: The cursor is malformed
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return json.loads(raw)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
@@ -4,7 +4,7 @@ UI Elements Definition - Single Source of Truth
 All UI elements for Naver Blog app automation are defined here.
 Used by both calibration workflow and default coordinate initialization.
 """
-from typing import Callable, List, Dict
+from typing import Callable, Dict, Iterable, List, Tuple
 from app.models.coordinate import UIElementType
 
 
@@ -186,6 +186,26 @@ UI_ELEMENTS: List[UIElementDefinition] = [
         step_order=12,
         required=True,
     ),
+    # Step 13: Gallery First Image
+    UIElementDefinition(
+        element_type=UIElementType.GALLERY_FIRST_IMAGE,
+        name="갤러리 첫 번째 이미지",
+        instructions="이미지 추가 버튼을 누른 후 갤러리에서 첫 번째(가장 최근) 이미지를 클릭하세요.",
+        help_text="갤러리 목록의 왼쪽 상단, 가장 최근에 추가된 사진입니다.",
+        default_position=lambda w, h: (int(w * 0.17), int(h * 0.22)),
+        step_order=13,
+        required=False,  # Optional (image posts only)
+    ),
+    # Step 14: Gallery Select Button
+    UIElementDefinition(
+        element_type=UIElementType.GALLERY_SELECT_BUTTON,
+        name="갤러리 선택 완료 버튼",
+        instructions="이미지를 선택한 후 상단의 '첨부' 또는 '완료' 버튼을 클릭하세요.",
+        help_text="선택한 이미지를 본문에 첨부하는 버튼입니다.",
+        default_position=lambda w, h: (int(w * 0.90), int(h * 0.06)),
+        step_order=14,
+        required=False,  # Optional (image posts only)
+    ),
 ]
 
 
@@ -203,8 +223,33 @@ def get_calibration_steps() -> List[dict]:
     return [elem.to_calibration_step() for elem in get_ui_elements_ordered()]
 
 
+# Default coordinates per resolution, filled by precompute_default_coordinates()
+_DEFAULT_COORDINATES: Dict[Tuple[int, int], Tuple[dict, ...]] = {}
+
+
+def precompute_default_coordinates(resolutions: Iterable[Tuple[int, int]]) -> int:
+    """
+    Compute default coordinates for known resolutions once (startup)
+
+    Args:
+        resolutions: (width, height) pairs
+
+    Returns:
+        Number of resolutions cached
+    """
+    for width, height in resolutions:
+        if (width, height) not in _DEFAULT_COORDINATES:
+            _DEFAULT_COORDINATES[(width, height)] = tuple(
+                elem.get_default_coordinate(width, height) for elem in UI_ELEMENTS
+            )
+    return len(_DEFAULT_COORDINATES)
+
+
 def get_default_coordinates(width: int, height: int) -> List[dict]:
     """Get default coordinates for device profile initialization"""
+    cached = _DEFAULT_COORDINATES.get((width, height))
+    if cached is not None:
+        return [dict(coord) for coord in cached]
     return [elem.get_default_coordinate(width, height) for elem in UI_ELEMENTS]
 
 
@@ -1,12 +1,24 @@
 """
 Database models package
 """
-from app.models.device import DeviceProfile
-from app.models.coordinate import CoordinateConfig, UIElementType, CalibrationMethod
+from app.models.device import Device, DeviceProfile
+from app.models.coordinate import (
+    CoordinateConfig,
+    CoordinateVersion,
+    UIElementType,
+    CalibrationMethod,
+)
+from app.models.posting import PostingRecord, PostingRollup
+from app.models.calibration import CalibrationSessionRecord
 
 __all__ = [
     "DeviceProfile",
+    "Device",
     "CoordinateConfig",
+    "CoordinateVersion",
     "UIElementType",
     "CalibrationMethod",
+    "PostingRecord",
+    "PostingRollup",
+    "CalibrationSessionRecord",
 ]
@@ -0,0 +1,32 @@
+"""
+Calibration Session Database Model
+"""
+from sqlalchemy import Column, DateTime, Integer, String
+from datetime import datetime
+
+from app.core.database import Base
+
+
+class CalibrationSessionRecord(Base):
+    """
+    Step pointer of an interactive calibration session
+
+    Lives in the application database so every API worker sees the same
+    sessions and they survive restarts. Steps are submitted in order, so
+    the completed steps are always 0 .. current_step - 1.
+    """
+
+    __tablename__ = "calibration_sessions"
+
+    # Primary Key
+    session_id = Column(String(36), primary_key=True)
+
+    # Session
+    profile_id = Column(String(64), nullable=False)
+    calibrated_by = Column(String(100), nullable=False)
+    current_step = Column(Integer, nullable=False, default=0)
+    total_steps = Column(Integer, nullable=False)
+
+    # Metadata (updated_at = last create/submit, used for expiry)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
@@ -1,12 +1,22 @@
 """
 UI Coordinate Configuration Database Model
 """
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, ForeignKey, Enum
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
 
-from app.core.database import Base
+from app.core.database import Base, PortableJSON, portable_enum
 
 
 class UIElementType(str, enum.Enum):
@@ -76,6 +86,11 @@ class CoordinateConfig(Base):
     """
 
     __tablename__ = "coordinate_configs"
+    # Job startup, calibration and upserts all look up a profile's
+    # coordinates, usually by element
+    __table_args__ = (
+        Index("ix_coordinate_configs_profile_element", "profile_id", "element_type"),
+    )
 
     # Primary Key
     id = Column(Integer, primary_key=True, index=True)
@@ -84,7 +99,7 @@ class CoordinateConfig(Base):
     profile_id = Column(String(64), ForeignKey("device_profiles.profile_id"))
 
     # UI Element Identification
-    element_type = Column(Enum(UIElementType), nullable=False, index=True)
+    element_type = Column(portable_enum(UIElementType), nullable=False, index=True)
     element_name = Column(String(100), nullable=False)  # Human-readable name
     element_description = Column(String(500), nullable=True)  # 설명
 
@@ -98,7 +113,7 @@ class CoordinateConfig(Base):
 
     # Calibration Info
     calibration_method = Column(
-        Enum(CalibrationMethod), default=CalibrationMethod.DEFAULT
+        portable_enum(CalibrationMethod), default=CalibrationMethod.DEFAULT
     )
     calibrated_by = Column(String(100), nullable=True)  # 캘리브레이션 수행자
     calibrated_at = Column(DateTime, nullable=True)
@@ -168,3 +183,48 @@ class CoordinateConfig(Base):
             ),
             "notes": self.notes,
         }
+
+
+class CoordinateVersion(Base):
+    """
+    One version of a profile's coordinate set (append-only history)
+
+    Every change to a profile's coordinates appends a version. Keyframes
+    store the full set, the versions in between only the elements that
+    changed since the previous version (see services/coordinate_history.py),
+    so any version is rebuilt from at most one keyframe interval of rows.
+    """
+
+    __tablename__ = "coordinate_versions"
+    __table_args__ = (UniqueConstraint("profile_id", "version"),)
+
+    # Primary Key
+    id = Column(Integer, primary_key=True)
+
+    # Foreign Key to DeviceProfile
+    profile_id = Column(
+        String(64), ForeignKey("device_profiles.profile_id"), nullable=False, index=True
+    )
+    version = Column(Integer, nullable=False)  # 1, 2, ... per profile
+
+    # Encoded coordinate set (keyframe) or changes (delta)
+    keyframe = Column(Boolean, nullable=False, default=False)
+    data = Column(PortableJSON, nullable=False)
+    element_count = Column(Integer, nullable=False)  # Elements in the full set
+
+    # What produced the version
+    source = Column(String(20), nullable=False)  # default, upsert, calibration, rollback, ...
+    note = Column(String(200), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for API responses"""
+        return {
+            "version": self.version,
+            "keyframe": self.keyframe,
+            "changed_count": len(self.data),
+            "element_count": self.element_count,
+            "source": self.source,
+            "note": self.note,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
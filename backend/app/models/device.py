@@ -1,7 +1,7 @@
 """
 Device Profile Database Model
 """
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, JSON, Float
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Float, ForeignKey
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import hashlib
@@ -23,7 +23,7 @@ class DeviceProfile(Base):
     profile_id = Column(String(64), primary_key=True, index=True)
 
     # Device Information
-    model = Column(String(100), nullable=False)
+    model = Column(String(100), nullable=False, index=True)
     manufacturer = Column(String(100), nullable=False)
     android_version = Column(String(20), nullable=False)
 
@@ -32,9 +32,6 @@ class DeviceProfile(Base):
     height = Column(Integer, nullable=False)
     dpi = Column(Integer, nullable=False)
 
-    # Device IDs (multiple devices can share same profile)
-    device_ids = Column(JSON, default=list)  # List of ADB serial numbers
-
     # Calibration Status
     calibrated = Column(Boolean, default=False)
     calibration_confidence = Column(Float, default=0.0)
@@ -53,6 +50,15 @@ class DeviceProfile(Base):
         back_populates="profile",
         cascade="all, delete-orphan",
     )
+    # Physical devices (multiple devices can share same profile); loaded
+    # with one IN query per result so to_dict() never lazy-loads
+    devices = relationship(
+        "Device",
+        back_populates="profile",
+        cascade="all, delete-orphan",
+        lazy="selectin",
+        order_by="Device.id",
+    )
 
     @staticmethod
     def generate_profile_id(model: str, width: int, height: int) -> str:
@@ -66,10 +72,10 @@ class DeviceProfile(Base):
         hash_suffix = hashlib.md5(base.encode()).hexdigest()[:8]
         return f"{base.replace(' ', '_')}_{hash_suffix}"
 
-    def add_device_id(self, device_id: str):
-        """Add a new device ID to this profile"""
-        if device_id not in self.device_ids:
-            self.device_ids.append(device_id)
+    @property
+    def device_ids(self) -> list[str]:
+        """ADB serial numbers of the devices using this profile"""
+        return [device.serial for device in self.devices]
 
     def to_dict(self) -> dict:
         """Convert to dictionary for API responses"""
@@ -90,3 +96,60 @@ class DeviceProfile(Base):
             ),
             "notes": self.notes,
         }
+
+
+class Device(Base):
+    """
+    Physical device (ADB serial) and the profile it uses
+
+    One row per serial with a unique index, so serial -> profile is an
+    index seek instead of a scan over every profile. Also tracks when the
+    device was seen and how its recent postings went.
+    """
+
+    __tablename__ = "devices"
+
+    # Primary Key
+    id = Column(Integer, primary_key=True)
+
+    # ADB serial number
+    serial = Column(String(100), nullable=False, unique=True, index=True)
+
+    # Foreign Key to DeviceProfile
+    profile_id = Column(
+        String(64), ForeignKey("device_profiles.profile_id"), nullable=False, index=True
+    )
+
+    # Connection
+    first_seen_at = Column(DateTime, default=datetime.utcnow)
+    last_seen_at = Column(DateTime, default=datetime.utcnow)
+
+    # Health
+    posting_count = Column(Integer, default=0)
+    failure_count = Column(Integer, default=0)
+    consecutive_failures = Column(Integer, default=0)
+    last_success_at = Column(DateTime, nullable=True)
+    last_failure_at = Column(DateTime, nullable=True)
+    last_error = Column(String(500), nullable=True)
+
+    # Relationship
+    profile = relationship("DeviceProfile", back_populates="devices")
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for API responses"""
+        return {
+            "serial": self.serial,
+            "profile_id": self.profile_id,
+            "first_seen_at": self.first_seen_at.isoformat() if self.first_seen_at else None,
+            "last_seen_at": self.last_seen_at.isoformat() if self.last_seen_at else None,
+            "posting_count": self.posting_count,
+            "failure_count": self.failure_count,
+            "consecutive_failures": self.consecutive_failures,
+            "last_success_at": (
+                self.last_success_at.isoformat() if self.last_success_at else None
+            ),
+            "last_failure_at": (
+                self.last_failure_at.isoformat() if self.last_failure_at else None
+            ),
+            "last_error": self.last_error,
+        }
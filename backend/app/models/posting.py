@@ -0,0 +1,115 @@
+"""
+Posting History Database Models
+"""
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+)
+from datetime import datetime
+
+from app.core.database import Base
+
+
+class PostingRecord(Base):
+    """
+    One finished posting job (append-only)
+
+    Written once when the job finishes, whatever the outcome. Listings page
+    newest first by id, so every filter column is indexed together with id;
+    content_hash is indexed with finished_at for the duplicate check.
+    """
+
+    __tablename__ = "posting_history"
+    __table_args__ = (
+        Index("ix_posting_history_device", "device_id", "id"),
+        Index("ix_posting_history_profile", "profile_id", "id"),
+        Index("ix_posting_history_status", "status", "id"),
+        Index("ix_posting_history_failed_step", "failed_step", "id"),
+        Index("ix_posting_history_content_hash", "content_hash", "finished_at"),
+    )
+
+    # Primary Key
+    id = Column(Integer, primary_key=True)
+
+    # Job
+    job_id = Column(String(36), nullable=False, unique=True)
+    device_id = Column(String(100), nullable=False)
+    profile_id = Column(String(64), nullable=False)
+    content_hash = Column(String(64), nullable=True)
+
+    # Outcome (JobStatus value: succeeded, failed, cancelled)
+    status = Column(String(20), nullable=False)
+    success = Column(Boolean, nullable=False, default=False)
+    steps_completed = Column(Integer, nullable=False, default=0)
+    total_steps = Column(Integer, nullable=False, default=0)
+    failed_step = Column(String(50), nullable=True)
+    error_message = Column(String(500), nullable=True)
+    blog_url = Column(String(500), nullable=True)
+    attempts = Column(Integer, nullable=False, default=1)
+    execution_time = Column(Float, nullable=False, default=0.0)  # seconds
+
+    # Timing
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for API responses"""
+        return {
+            "id": self.id,
+            "job_id": self.job_id,
+            "device_id": self.device_id,
+            "profile_id": self.profile_id,
+            "content_hash": self.content_hash,
+            "status": self.status,
+            "success": self.success,
+            "steps_completed": self.steps_completed,
+            "total_steps": self.total_steps,
+            "failed_step": self.failed_step,
+            "error_message": self.error_message,
+            "blog_url": self.blog_url,
+            "attempts": self.attempts,
+            "execution_time": self.execution_time,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class PostingRollup(Base):
+    """
+    Hourly posting counters per device, profile and failed step
+
+    Updated in the same transaction as each PostingRecord insert, so
+    analytics aggregate a few rows per device-hour instead of scanning
+    every posting. failed_step is "" for postings without one (successes),
+    keeping the key unique on every database (NULLs never collide).
+    """
+
+    __tablename__ = "posting_rollups_hourly"
+    __table_args__ = (
+        UniqueConstraint("hour", "device_id", "profile_id", "failed_step"),
+        Index("ix_posting_rollups_hourly_device", "device_id", "hour"),
+        Index("ix_posting_rollups_hourly_profile", "profile_id", "hour"),
+    )
+
+    # Primary Key
+    id = Column(Integer, primary_key=True)
+
+    # Key
+    hour = Column(DateTime, nullable=False)  # finished_at truncated to the hour (UTC)
+    device_id = Column(String(100), nullable=False)
+    profile_id = Column(String(64), nullable=False)
+    failed_step = Column(String(50), nullable=False, default="")
+
+    # Counters (failed = postings - succeeded - cancelled)
+    postings = Column(Integer, nullable=False, default=0)
+    succeeded = Column(Integer, nullable=False, default=0)
+    cancelled = Column(Integer, nullable=False, default=0)
+    steps_completed = Column(Integer, nullable=False, default=0)
+    execution_time_total = Column(Float, nullable=False, default=0.0)  # seconds
+    execution_time_max = Column(Float, nullable=False, default=0.0)
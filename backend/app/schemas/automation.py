@@ -2,7 +2,8 @@
 Automation Pydantic Schemas
 """
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Literal, Optional, List
+from datetime import datetime
 
 
 class PostingRequest(BaseModel):
@@ -13,11 +14,15 @@ class PostingRequest(BaseModel):
     title: str = Field(..., min_length=1, max_length=200, description="Post title")
     content: str = Field(..., min_length=1, description="Post content")
     images: Optional[List[str]] = Field(None, description="Image file paths")
+    account_id: Optional[str] = Field(
+        None, description="Naver account logged in on the device (rate limiting)"
+    )
 
 
 class PostingResponse(BaseModel):
     """Schema for posting result"""
 
+    job_id: Optional[str] = None
     success: bool
     blog_url: Optional[str] = None
     error_message: Optional[str] = None
@@ -31,7 +36,153 @@ class PostingResponse(BaseModel):
 class AutomationStatus(BaseModel):
     """Schema for automation status"""
 
+    job_id: str
+    status: str  # queued | running | succeeded | failed | cancelled
+    device_id: str
+    profile_id: str
+    title: str
+    content_hash: Optional[str] = None
     running: bool
     current_step: Optional[int] = None
+    current_step_name: Optional[str] = None
     total_steps: int
     progress_percentage: float
+    attempt: int = 0
+    created_at: str
+    held_until: Optional[str] = None  # set while waiting for rate-limit capacity
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    blog_url: Optional[str] = None
+    error_message: Optional[str] = None
+    failed_step: Optional[str] = None
+
+
+class AutomationEvent(BaseModel):
+    """Schema for a streamed job progress event"""
+
+    job_id: str
+    type: str  # job_queued | job_held | job_started | step_started | step_completed | step_failed | attempt_failed | job_aborting | job_finished
+    timestamp: str
+    step: Optional[int] = None
+    step_name: Optional[str] = None
+    total_steps: int
+    progress_percentage: float
+    duration: Optional[float] = None  # Step duration in seconds
+    error: Optional[str] = None
+    blog_url: Optional[str] = None
+    success: Optional[bool] = None
+
+
+class BulkPostingRequest(BaseModel):
+    """Schema for submitting many postings in one call"""
+
+    requests: List[PostingRequest] = Field(..., min_length=1)
+
+
+class BulkSkippedItem(BaseModel):
+    """A bulk item that was not queued"""
+
+    index: int
+    reason: str
+    content_hash: Optional[str] = None
+    duplicate_of: Optional[str] = None  # Job ID of the earlier posting
+
+
+class BulkPostingResponse(BaseModel):
+    """Schema for bulk submission result"""
+
+    received: int
+    queued: int
+    skipped: List[BulkSkippedItem]
+    jobs: List[AutomationStatus]
+
+
+class PostingHistoryFilter(BaseModel):
+    """Server-side filters for posting history listings (query parameters)"""
+
+    device_id: Optional[str] = None
+    profile_id: Optional[str] = None
+    status: Optional[Literal["succeeded", "failed", "cancelled"]] = None
+    failed_step: Optional[str] = None
+    since: Optional[datetime] = Field(None, description="finished_at >= this (UTC)")
+    until: Optional[datetime] = Field(None, description="finished_at < this (UTC)")
+
+
+class PostingRecordResponse(BaseModel):
+    """Schema for a persisted posting result"""
+
+    id: int
+    job_id: str
+    device_id: str
+    profile_id: str
+    content_hash: Optional[str] = None
+    status: str  # succeeded | failed | cancelled
+    success: bool
+    steps_completed: int
+    total_steps: int
+    failed_step: Optional[str] = None
+    error_message: Optional[str] = None
+    blog_url: Optional[str] = None
+    attempts: int
+    execution_time: float
+    started_at: Optional[str] = None
+    finished_at: str
+
+
+class PostingHistoryResponse(BaseModel):
+    """Schema for a page of posting history"""
+
+    records: List[PostingRecordResponse]
+    next_cursor: Optional[str] = None  # Pass as ?cursor= for the next page
+
+
+class PostingAnalyticsFilter(BaseModel):
+    """Filters for posting analytics (query parameters, whole hours)"""
+
+    device_id: Optional[str] = None
+    profile_id: Optional[str] = None
+    model: Optional[str] = Field(None, description="Device model of the profile")
+    since: Optional[datetime] = Field(None, description="From this hour (UTC, rounded down)")
+    until: Optional[datetime] = Field(None, description="Until this hour (UTC, rounded up)")
+
+
+class PostingStats(BaseModel):
+    """Aggregated posting counters"""
+
+    postings: int
+    succeeded: int
+    failed: int
+    cancelled: int
+    success_rate: float
+    avg_steps_completed: float
+    avg_execution_time: float  # seconds
+    max_execution_time: float
+
+
+class PostingSummaryResponse(PostingStats):
+    """Schema for posting totals over a window"""
+
+    hours: int
+    postings_per_hour: float
+
+
+class FailedStepStats(BaseModel):
+    """Failures of one step"""
+
+    failed_step: Optional[str] = None  # None = failed outside a step
+    failures: int
+    share: float  # of all failures in the window
+
+
+class ThroughputStats(PostingStats):
+    """Posting stats of one device, profile or model"""
+
+    key: Optional[str] = None
+    active_hours: int
+    postings_per_hour: float
+
+
+class HourlyPostingStats(PostingStats):
+    """Posting stats of one hour"""
+
+    hour: datetime
@@ -1,10 +1,12 @@
 """
 Coordinate Configuration Pydantic Schemas for API validation
 """
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 from typing import Optional
 from datetime import datetime
 
+from app.models.coordinate import CalibrationMethod, UIElementType
+
 
 class CoordinatePoint(BaseModel):
     """Simple coordinate point"""
@@ -78,8 +80,94 @@ class CoordinateResponse(BaseModel):
 class CoordinateListResponse(BaseModel):
     """Schema for list of coordinates"""
 
-    total: int
+    total: Optional[int]  # None when the count was not requested
     coordinates: list[CoordinateResponse]
+    next_cursor: Optional[str] = None  # Pass as ?cursor= for the next page
+
+
+class CoordinateFilter(BaseModel):
+    """Server-side filters for coordinate listings (query parameters)"""
+
+    element_type: Optional[UIElementType] = None
+    validated: Optional[bool] = None
+    calibrated: Optional[bool] = Field(None, description="Not on resolution defaults")
+    min_confidence: Optional[float] = Field(None, ge=0.0, le=1.0)
+    used_since: Optional[datetime] = Field(None, description="last_used_at >= this")
+    used_before: Optional[datetime] = Field(None, description="last_used_at < this")
+
+
+class CoordinateUpsert(BaseModel):
+    """One element of a coordinate set (the profile comes from the URL)"""
+
+    element_type: str = Field(..., description="UI element type")
+    element_name: Optional[str] = Field(None, min_length=1, max_length=100)
+    element_description: Optional[str] = Field(None, max_length=500)
+    x: int = Field(..., ge=0)
+    y: int = Field(..., ge=0)
+    confidence: float = Field(0.5, ge=0.0, le=1.0)
+    validated: bool = Field(False)
+    calibration_method: str = Field("manual_input")
+    calibrated_by: Optional[str] = Field(None, max_length=100)
+    touch_radius: int = Field(20, ge=1, le=200)
+    notes: Optional[str] = Field(None, max_length=500)
+
+    @field_validator("element_type")
+    @classmethod
+    def validate_element_type(cls, v):
+        UIElementType(v)  # raises ValueError for unknown types
+        return v
+
+    @field_validator("calibration_method")
+    @classmethod
+    def validate_calibration_method(cls, v):
+        CalibrationMethod(v)
+        return v
+
+
+class CoordinateSetUpsert(BaseModel):
+    """
+    Schema for writing a profile's coordinate set in one transaction
+
+    Listed elements are created or updated (only the fields sent are
+    changed on existing ones). With prune, elements not listed are deleted.
+    """
+
+    coordinates: list[CoordinateUpsert] = Field(..., min_length=1)
+    prune: bool = Field(False, description="Delete elements not in the set")
+
+    @model_validator(mode="after")
+    def validate_unique_elements(self):
+        element_types = [UIElementType(c.element_type) for c in self.coordinates]
+        if len(set(element_types)) != len(element_types):
+            raise ValueError("Each element_type may appear only once")
+        return self
+
+
+class CoordinateVersionResponse(BaseModel):
+    """Schema for one version of a profile's coordinate history"""
+
+    version: int
+    keyframe: bool  # Full set stored (otherwise only the changes)
+    changed_count: int  # Elements stored in this version
+    element_count: int  # Elements in the coordinate set
+    source: str  # default, baseline, upsert, calibration, rollback, ...
+    note: Optional[str] = None
+    created_at: Optional[str]
+
+
+class CoordinateVersionListResponse(BaseModel):
+    """Schema for a profile's coordinate history"""
+
+    profile_id: str
+    versions: list[CoordinateVersionResponse]
+
+
+class CoordinateVersionDetail(BaseModel):
+    """Schema for the coordinate set of one version"""
+
+    profile_id: str
+    version: int
+    coordinates: list[dict]  # element_type, x, y, confidence, validated, ...
 
 
 class CoordinateBatchCreate(BaseModel):
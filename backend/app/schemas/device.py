@@ -63,16 +63,54 @@ class DeviceProfileResponse(BaseModel):
     last_used_at: Optional[str]
     notes: Optional[str]
     coordinate_count: Optional[int] = 0  # Number of configured coordinates
+    validated_count: Optional[int] = 0  # Coordinates verified on a device
+    calibrated_count: Optional[int] = 0  # Coordinates not on resolution defaults
+    calibration_coverage: Optional[float] = 0.0  # calibrated_count / coordinate_count
+    usage_count: Optional[int] = 0  # Taps across all coordinates
+    coordinates_last_used_at: Optional[str] = None
 
     class Config:
         from_attributes = True
 
 
+class RegisteredDeviceResponse(BaseModel):
+    """Schema for a registered device (serial -> profile) and its health"""
+
+    serial: str
+    profile_id: str
+    first_seen_at: Optional[str]
+    last_seen_at: Optional[str]
+    posting_count: int = 0
+    failure_count: int = 0
+    consecutive_failures: int = 0
+    last_success_at: Optional[str] = None
+    last_failure_at: Optional[str] = None
+    last_error: Optional[str] = None
+
+
+class RegisteredDeviceListResponse(BaseModel):
+    """Schema for list of registered devices"""
+
+    total: int
+    devices: list[RegisteredDeviceResponse]
+
+
+class DeviceProfileFilter(BaseModel):
+    """Server-side filters for profile listings (query parameters)"""
+
+    model: Optional[str] = None
+    calibrated: Optional[bool] = None
+    min_confidence: Optional[float] = Field(None, ge=0.0, le=1.0)
+    used_since: Optional[datetime] = Field(None, description="last_used_at >= this")
+    used_before: Optional[datetime] = Field(None, description="last_used_at < this")
+
+
 class DeviceListResponse(BaseModel):
     """Schema for list of devices"""
 
-    total: int
+    total: Optional[int]  # None when the count was not requested
     devices: list[DeviceProfileResponse]
+    next_cursor: Optional[str] = None  # Pass as ?cursor= for the next page
 
 
 class DeviceConnectionStatus(BaseModel):
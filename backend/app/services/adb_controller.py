@@ -1,18 +1,20 @@
 """
 ADB Controller Service - Production-grade Android device control
 
-Uses adbutils for reliable ADB communication
+Uses adbutils for reliable ADB communication, through a pluggable
+DeviceBackend so the same code can drive simulated devices
 """
-from adbutils import adb, AdbDevice, AdbError
+from adbutils import AdbError
 from typing import Optional, List
 from pathlib import Path
 import time
 import base64
-from io import BytesIO
-from PIL import Image
 from loguru import logger
 
 from app.core.config import settings
+from app.services.cancellation import CancellationToken
+from app.services.device_backend import DeviceBackend, list_device_serials, open_device
+from app.services.step_profiler import StepProfiler
 
 
 class ADBController:
@@ -42,7 +44,41 @@ class ADBController:
         """
         self.device_id = device_id
         self.timeout = timeout
-        self._device: Optional[AdbDevice] = None
+        self._device: Optional[DeviceBackend] = None
+        self.profiler: Optional[StepProfiler] = None  # Set by benchmarks/executor
+        self.cancel_token: Optional[CancellationToken] = None  # Set by executor
+
+    def _io(self, func, *args, **kwargs):
+        """
+        Call the device backend
+
+        Checks the cancellation token first and clamps the command timeout
+        to the remaining step/job budget; accounts I/O time when profiling.
+        """
+        if self.cancel_token is not None:
+            self.cancel_token.check()
+            if "timeout" in kwargs:
+                kwargs["timeout"] = self.cancel_token.clamp_timeout(kwargs["timeout"])
+
+        if self.profiler is None:
+            return func(*args, **kwargs)
+
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.profiler.add_io(
+                time.perf_counter() - wall_start, time.thread_time() - cpu_start
+            )
+
+    def sleep(self, seconds: float):
+        """Deliberate wait (interrupted by cancellation, accounted when profiling)"""
+        sleeper = self.cancel_token.wait if self.cancel_token is not None else time.sleep
+        if self.profiler is None:
+            sleeper(seconds)
+        else:
+            self.profiler.sleep(seconds, sleeper)
 
     def connect(self) -> bool:
         """
@@ -52,18 +88,11 @@ class ADBController:
             True if connection successful
         """
         try:
-            if self.device_id:
-                self._device = adb.device(serial=self.device_id)
-            else:
-                devices = adb.device_list()
-                if not devices:
-                    logger.error("No ADB devices found")
-                    return False
-                self._device = devices[0]
-                self.device_id = self._device.serial
+            self._device = open_device(self.device_id)
+            self.device_id = self._device.serial
 
             # Test connection
-            self._device.shell("echo 'connected'")
+            self._io(self._device.shell, "echo 'connected'", timeout=self.timeout)
             logger.info(f"Connected to device: {self.device_id}")
             return True
 
@@ -72,7 +101,7 @@ class ADBController:
             return False
 
     @property
-    def device(self) -> AdbDevice:
+    def device(self) -> DeviceBackend:
         """Get connected device (auto-connect if needed)"""
         if self._device is None:
             if not self.connect():
@@ -132,7 +161,7 @@ class ADBController:
             Command output as string
         """
         try:
-            output = self.device.shell(command)
+            output = self._io(self.device.shell, command, timeout=self.timeout)
             return output
 
         except AdbError as e:
@@ -155,24 +184,30 @@ class ADBController:
             Screenshot as bytes (PNG format)
         """
         try:
-            # Capture screenshot using adbutils (returns PIL Image directly)
-            image = self.device.screenshot()
+            # Capture and encode via backend (in the device worker when isolated)
+            png = self._io(self.device.screenshot_png)
 
             # Save if path provided
             if save_path:
                 save_path.parent.mkdir(parents=True, exist_ok=True)
-                image.save(save_path, "PNG", quality=quality)
+                save_path.write_bytes(png)
                 logger.debug(f"Screenshot saved to {save_path}")
 
-            # Return as bytes
-            output = BytesIO()
-            image.save(output, "PNG", quality=quality)
-            return output.getvalue()
+            return png
 
         except Exception as e:
             logger.error(f"Screenshot failed: {e}")
             raise
 
+    def screen_hash(self) -> int:
+        """
+        Capture the screen as a 64-bit average hash (see DeviceBackend)
+
+        Returns:
+            Screen hash
+        """
+        return self._io(self.device.screen_hash)
+
     def screenshot_base64(self, quality: int = 80) -> str:
         """
         Capture screenshot and return as base64 string
@@ -197,7 +232,7 @@ class ADBController:
         """
         try:
             self.shell(f"input tap {x} {y}")
-            time.sleep(delay_ms / 1000.0)
+            self.sleep(delay_ms / 1000.0)
             logger.debug(f"Tapped at ({x}, {y})")
 
         except Exception as e:
@@ -311,6 +346,53 @@ class ADBController:
         """Trigger paste action (keycode 279)"""
         self.key_event(279)  # KEYCODE_PASTE
 
+    def push_file(self, local_path: Path, remote_path: str):
+        """
+        Push a host file to the device
+
+        Args:
+            local_path: File on the host
+            remote_path: Destination path on the device
+        """
+        try:
+            self._io(self.device.push, str(local_path), remote_path)
+            logger.debug(f"Pushed {local_path} -> {remote_path}")
+
+        except Exception as e:
+            logger.error(f"Push failed: {local_path} -> {remote_path}: {e}")
+            raise
+
+    def list_dir(self, remote_dir: str) -> List[str]:
+        """
+        List file names in a device directory
+
+        Args:
+            remote_dir: Directory path on the device
+
+        Returns:
+            File names (empty if the directory does not exist)
+        """
+        output = self.shell(f"ls {remote_dir} 2>/dev/null")
+        return [name for name in output.split() if name]
+
+    def media_scan(self, remote_paths: List[str]):
+        """
+        Register files with the Android media store so gallery pickers see them
+
+        Args:
+            remote_paths: Device file paths to scan (one shell round trip)
+        """
+        if not remote_paths:
+            return
+
+        command = "; ".join(
+            "am broadcast -a android.intent.action.MEDIA_SCANNER_SCAN_FILE "
+            f"-d file://{path}"
+            for path in remote_paths
+        )
+        self.shell(command)
+        logger.debug(f"Media scan triggered for {len(remote_paths)} files")
+
     def launch_app(self, package_name: str, activity: Optional[str] = None):
         """
         Launch Android application
@@ -377,11 +459,10 @@ def list_connected_devices() -> List[dict]:
         List of device information dictionaries
     """
     try:
-        devices = adb.device_list()
         result = []
 
-        for device in devices:
-            controller = ADBController(device.serial)
+        for serial in list_device_serials():
+            controller = ADBController(serial)
             if controller.connect():
                 info = controller.get_device_info()
                 result.append(info)
@@ -3,14 +3,28 @@ Automation Executor - Blog Posting Automation Engine
 
 Manus-style AI Agent: Observe → Plan → Execute → Verify
 """
-from typing import Optional, List, Dict
-from dataclasses import dataclass
+from typing import Callable, Optional, List, Dict
+from dataclasses import dataclass, field
 from datetime import datetime
 from loguru import logger
+import asyncio
 import time
 
+from app.core.config import settings
 from app.services.adb_controller import ADBController
+from app.services.cancellation import (
+    CancellationToken,
+    DeadlineExceeded,
+    OperationCancelled,
+    StepTimeout,
+)
+from app.services.coordinate_cache import CoordinatePoint
+from app.services.device_executor import DeviceExecutorPool, get_device_executors
 from app.services.device_manager import DeviceManager
+from app.services.device_readiness import DeviceReadinessManager, get_readiness_manager
+from app.services.image_pipeline import ImageUploadStage
+from app.services.step_profiler import StepProfiler
+from app.services.usage_stats import get_usage_recorder
 from app.core.ui_elements import get_ui_elements_ordered, get_element_by_type
 from app.models.coordinate import UIElementType
 from sqlalchemy.orm import Session
@@ -27,6 +41,18 @@ class PostingResult:
     total_steps: int = 12
     execution_time: float = 0.0
     failed_step: Optional[str] = None
+    step_timings: List[dict] = field(default_factory=list)  # Filled when profiling
+    cancelled: bool = False  # Stopped by a cancel request
+
+
+# Time budget per step in seconds (STEP_TIMEOUT_DEFAULT for the others)
+STEP_TIMEOUT_BUDGETS: Dict[str, float] = {
+    "connect": 15.0,
+    "app_ready": 45.0,
+    "content_input": 60.0,
+    "image_attach": 180.0,
+    "publish": 45.0,
+}
 
 
 class BlogPostingAutomator:
@@ -45,6 +71,10 @@ class BlogPostingAutomator:
         profile_id: str,
         db: Session,
         max_retries: int = 3,
+        profiler: Optional[StepProfiler] = None,
+        on_event: Optional[Callable[[dict], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        readiness: Optional[DeviceReadinessManager] = None,
     ):
         """
         Initialize automation executor
@@ -54,44 +84,153 @@ class BlogPostingAutomator:
             profile_id: Device profile ID
             db: Database session
             max_retries: Maximum retry attempts per step
+            profiler: Optional step profiler (benchmarks)
+            on_event: Optional callback receiving step progress events
+            cancel_token: Optional token to cancel the run / enforce budgets
+            readiness: Device readiness manager (default: global one when
+                READINESS_ENABLED)
         """
         self.device_id = device_id
         self.profile_id = profile_id
         self.db = db
         self.max_retries = max_retries
+        self.profiler = profiler
+        self.on_event = on_event
+        self.cancel_token = cancel_token or CancellationToken()
+        self.readiness = readiness or (
+            get_readiness_manager() if settings.READINESS_ENABLED else None
+        )
 
         # Initialize controllers
         self.adb = ADBController(device_id)
+        self.adb.profiler = profiler
+        self.adb.cancel_token = self.cancel_token
         self.manager = DeviceManager(db)
+        self.usage = get_usage_recorder()
+        self.executors: DeviceExecutorPool = get_device_executors()
 
-        # Load profile and coordinates
-        self.profile = self.manager.get_profile(profile_id)
+        # Profile size and coordinates (cached; one version lookup in steady state)
+        self.profile = self.manager.get_cached_coordinates(profile_id)
         if not self.profile:
             raise ValueError(f"Profile not found: {profile_id}")
 
-        self.coordinates = self._load_coordinates()
+        self.coordinates = self.profile.coordinates
 
         # Statistics
         self.steps_executed = 0
         self.start_time = None
+        self._current_step: Optional[tuple[str, int, float]] = None
+
+        # Background image upload of the current attempt
+        self._image_stage: Optional[ImageUploadStage] = None
+        self._image_upload: Optional[asyncio.Future] = None
+
+    async def _on_device(self, func, *args, **kwargs):
+        """
+        Run blocking device work on this device's dedicated thread
+
+        The event loop stays free while the phone works. A call still
+        running DEVICE_CALL_GRACE_SECONDS past the step/job budget is
+        abandoned and the device gets a fresh thread; the token is fenced
+        so the abandoned call stops at its next device operation instead
+        of running alongside a retry.
+        """
+        remaining = self.cancel_token.remaining()
+        abandon_after = (
+            remaining + settings.DEVICE_CALL_GRACE_SECONDS if remaining is not None else None
+        )
+        try:
+            return await self.executors.run(
+                self.device_id,
+                self.cancel_token.bind(func),
+                *args,
+                abandon_after=abandon_after,
+                **kwargs,
+            )
+        except StepTimeout:
+            self.cancel_token.fence()
+            raise
 
-    def _load_coordinates(self) -> Dict[UIElementType, dict]:
-        """Load all coordinates for this profile"""
-        coords = self.manager.get_coordinates(self.profile_id)
-        coord_map = {}
+    async def _wait_within_budget(self, future: asyncio.Future):
+        """
+        Wait for background work within the current budgets
 
-        for coord in coords:
-            coord_map[UIElementType(coord.element_type)] = {
-                "id": coord.id,
-                "x": coord.x,
-                "y": coord.y,
-                "confidence": coord.confidence,
-            }
+        The work runs off the device thread, so it is polled: a cancel
+        request, the step budget or the job deadline stops the wait even
+        if an `adb push` hangs. The future's own outcome is not raised.
 
-        logger.info(f"Loaded {len(coord_map)} coordinates for {self.profile_id}")
-        return coord_map
+        Raises:
+            OperationCancelled: (or subclass) if the run must stop
+        """
+        while not future.done():
+            self.cancel_token.check()
+            remaining = self.cancel_token.remaining()
+            timeout = (
+                settings.WATCHDOG_INTERVAL
+                if remaining is None
+                else min(remaining, settings.WATCHDOG_INTERVAL)
+            )
+            await asyncio.wait({future}, timeout=timeout)
+        self.cancel_token.check()
 
-    def _get_coordinate(self, element_type: UIElementType) -> dict:
+    def _stop_image_upload(self):
+        """
+        Stop the upload of a finished attempt at its next device operation
+
+        A push that is still running is left to finish; the next attempt
+        waits for it (within its budget) before starting its own upload,
+        so two uploads never share the device.
+        """
+        if self._image_upload is None:
+            return
+        if self._image_upload.done():
+            self._image_stage = self._image_upload = None
+        else:
+            self._image_stage.stop()
+
+    def _emit(self, event_type: str, **data):
+        """Send a progress event to the subscriber callback (never raises)"""
+        if self.on_event is None:
+            return
+        try:
+            self.on_event({"type": event_type, **data})
+        except Exception as e:
+            logger.warning(f"Progress callback failed: {e}")
+
+    async def _begin_step(self, name: str, number: int):
+        """
+        Mark the start of a step (profiling, progress events, time budget)
+
+        Raises if the run was cancelled, so a cancel request stops the run
+        at the next step boundary at the latest.
+        """
+        self._end_step()
+        if self.profiler is not None:
+            # Profiled on the device thread, where the step's work runs
+            await self._on_device(self.profiler.begin, name)
+        self._current_step = (name, number, time.perf_counter())
+        self.cancel_token.begin_step(
+            name, STEP_TIMEOUT_BUDGETS.get(name, settings.STEP_TIMEOUT_DEFAULT)
+        )
+        self._emit("step_started", step=number, step_name=name)
+        self.cancel_token.check()
+
+    def _end_step(self, success: bool = True, error: Optional[str] = None):
+        """Close the current step and report its duration"""
+        if self._current_step is None:
+            return
+        name, number, started = self._current_step
+        self._current_step = None
+        self.cancel_token.end_step()
+        self._emit(
+            "step_completed" if success else "step_failed",
+            step=number,
+            step_name=name,
+            duration=time.perf_counter() - started,
+            error=error,
+        )
+
+    def _get_coordinate(self, element_type: UIElementType) -> CoordinatePoint:
         """Get coordinate for UI element"""
         if element_type not in self.coordinates:
             raise ValueError(f"Coordinate not found for {element_type}")
@@ -112,17 +251,23 @@ class BlogPostingAutomator:
         Returns:
             True if tap successful
         """
+        coord = None
         try:
             coord = self._get_coordinate(element_type)
             element_def = get_element_by_type(element_type)
 
-            logger.info(f"Tapping {element_def.name} at ({coord['x']}, {coord['y']})")
+            logger.info(f"Tapping {element_def.name} at ({coord.x}, {coord.y})")
 
-            self.adb.tap(coord["x"], coord["y"], delay_ms=delay_ms)
+            self.adb.tap(coord.x, coord.y, delay_ms=delay_ms)
+            self.usage.record(coord.id, success=True)
             return True
 
+        except OperationCancelled:
+            raise
         except Exception as e:
             logger.error(f"Failed to tap {element_type}: {e}")
+            if coord is not None:
+                self.usage.record(coord.id, success=False)
             return False
 
     def _input_text_smart(self, text: str, field_type: UIElementType) -> bool:
@@ -143,17 +288,53 @@ class BlogPostingAutomator:
 
             # Set clipboard and paste
             self.adb.set_clipboard(text)
-            time.sleep(0.3)
+            self.adb.sleep(0.3)
             self.adb.paste()
-            time.sleep(0.5)
+            self.adb.sleep(0.5)
 
             logger.info(f"Input text: {text[:50]}...")
             return True
 
+        except OperationCancelled:
+            raise
         except Exception as e:
             logger.error(f"Failed to input text: {e}")
             return False
 
+    def _attach_images(self, remote_paths: List[str]) -> bool:
+        """
+        Attach uploaded images through the editor's gallery picker
+
+        Each image is touched and re-scanned right before it is attached so
+        that it is the most recent item, i.e. the first cell in the gallery.
+
+        Args:
+            remote_paths: Device paths returned by the image stage
+
+        Returns:
+            True if all images were attached
+        """
+        try:
+            for remote_path in remote_paths:
+                self.adb.shell(f"touch {remote_path}")
+                self.adb.media_scan([remote_path])
+
+                if not self._tap_element(UIElementType.IMAGE_BUTTON, delay_ms=1500):
+                    return False
+                if not self._tap_element(UIElementType.GALLERY_FIRST_IMAGE, delay_ms=800):
+                    return False
+                if not self._tap_element(UIElementType.GALLERY_SELECT_BUTTON, delay_ms=1500):
+                    return False
+
+            logger.info(f"Attached {len(remote_paths)} images")
+            return True
+
+        except OperationCancelled:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to attach images: {e}")
+            return False
+
     async def execute_posting(
         self,
         title: str,
@@ -167,7 +348,7 @@ class BlogPostingAutomator:
         1. Tap + button (main screen)
         2. Tap "Blog Write" menu
         3. Input title
-        4. Input content
+        4. Input content (and attach images, uploaded in the background)
         5. Adjust text size (smallest)
         6. Publish
         7. Confirm
@@ -177,83 +358,161 @@ class BlogPostingAutomator:
         Args:
             title: Blog post title
             content: Blog post content
-            images: Optional list of image paths
+            images: Optional list of image paths on the host
 
         Returns:
             PostingResult with success status and blog URL
         """
         self.start_time = time.time()
         result = PostingResult(success=False, total_steps=9)  # 9 core steps
+        if self.profiler is not None:
+            self.profiler.reset()
 
         try:
             # Ensure ADB connection
-            if not self.adb.connect():
+            await self._begin_step("connect", 0)
+            if not await self._on_device(self.adb.connect):
                 result.error_message = "Failed to connect to device"
                 return result
 
+            # Start from the app main screen (usually staged after the previous post)
+            if self.readiness is not None:
+                await self._begin_step("app_ready", 0)
+                if not await self._on_device(self.readiness.ensure_ready, self.adb):
+                    result.failed_step = "app_ready"
+                    result.error_message = "Blog app could not be brought to its main screen"
+                    return result
+                self.readiness.mark_busy(self.device_id)
+
             logger.info(f"🚀 Starting automated posting for {self.profile_id}")
 
+            # Prepare and upload images in the background while text steps run
+            image_upload = None
+            if images:
+                if self._image_upload is not None:
+                    # The previous attempt's upload is finishing a push
+                    await self._begin_step("image_upload", 0)
+                    await self._wait_within_budget(self._image_upload)
+                stage = ImageUploadStage(
+                    self.adb,
+                    images,
+                    max_width=self.profile.width,
+                    max_height=self.profile.height,
+                    cancel_token=self.cancel_token,
+                )
+                image_upload = asyncio.get_running_loop().run_in_executor(
+                    None, stage.run
+                )
+                # Mark errors as retrieved if an earlier step aborts the run
+                image_upload.add_done_callback(
+                    lambda f: f.cancelled() or f.exception()
+                )
+                self._image_stage, self._image_upload = stage, image_upload
+
             # Step 1: Tap + button (main screen)
             logger.info("Step 1/9: Tap + button")
-            if not self._tap_element(UIElementType.MAIN_PLUS_BUTTON, delay_ms=1000):
+            await self._begin_step("main_plus_button", 1)
+            if not await self._on_device(
+                self._tap_element, UIElementType.MAIN_PLUS_BUTTON, delay_ms=1000
+            ):
                 result.failed_step = "main_plus_button"
                 return result
             result.steps_completed += 1
 
             # Step 2: Tap "Blog Write" menu
             logger.info("Step 2/9: Tap blog write menu")
-            if not self._tap_element(UIElementType.WRITE_MENU_BLOG, delay_ms=1500):
+            await self._begin_step("write_menu_blog", 2)
+            if not await self._on_device(
+                self._tap_element, UIElementType.WRITE_MENU_BLOG, delay_ms=1500
+            ):
                 result.failed_step = "write_menu_blog"
                 return result
             result.steps_completed += 1
 
             # Step 3: Input title
             logger.info(f"Step 3/9: Input title: {title[:30]}...")
-            if not self._input_text_smart(title, UIElementType.TITLE_FIELD):
+            await self._begin_step("title_input", 3)
+            if not await self._on_device(self._input_text_smart, title, UIElementType.TITLE_FIELD):
                 result.failed_step = "title_input"
                 return result
             result.steps_completed += 1
 
             # Step 4: Input content
             logger.info(f"Step 4/9: Input content ({len(content)} chars)")
-            if not self._input_text_smart(content, UIElementType.CONTENT_FIELD):
+            await self._begin_step("content_input", 4)
+            if not await self._on_device(
+                self._input_text_smart, content, UIElementType.CONTENT_FIELD
+            ):
                 result.failed_step = "content_input"
                 return result
+
+            # Attach images once the background upload has finished
+            if image_upload is not None:
+                await self._begin_step("image_attach", 4)
+                await self._wait_within_budget(image_upload)
+                try:
+                    remote_paths = image_upload.result()
+                except OperationCancelled:
+                    raise
+                except Exception as e:
+                    logger.error(f"Image upload failed: {e}")
+                    result.failed_step = "image_upload"
+                    result.error_message = f"Image upload failed: {e}"
+                    return result
+
+                if not await self._on_device(self._attach_images, remote_paths):
+                    result.failed_step = "image_attach"
+                    return result
             result.steps_completed += 1
 
             # Step 5: Adjust text size (optional)
             logger.info("Step 5/9: Adjust text size")
+            await self._begin_step("text_size", 5)
             # Tap text size button
-            if self._tap_element(UIElementType.TEXT_SIZE_BUTTON, delay_ms=800):
+            if await self._on_device(
+                self._tap_element, UIElementType.TEXT_SIZE_BUTTON, delay_ms=800
+            ):
                 # Select smallest size
-                self._tap_element(UIElementType.TEXT_SIZE_SMALLEST, delay_ms=800)
+                await self._on_device(
+                    self._tap_element, UIElementType.TEXT_SIZE_SMALLEST, delay_ms=800
+                )
             result.steps_completed += 1
 
             # Step 6: Publish
             logger.info("Step 6/9: Tap publish button")
-            if not self._tap_element(UIElementType.PUBLISH_BUTTON, delay_ms=2000):
+            await self._begin_step("publish", 6)
+            if not await self._on_device(
+                self._tap_element, UIElementType.PUBLISH_BUTTON, delay_ms=2000
+            ):
                 result.failed_step = "publish"
                 return result
             result.steps_completed += 1
 
             # Step 7: Confirm (if dialog appears)
             logger.info("Step 7/9: Confirm publish")
-            self._tap_element(UIElementType.CONFIRM_BUTTON, delay_ms=2000)
+            await self._begin_step("confirm", 7)
+            await self._on_device(self._tap_element, UIElementType.CONFIRM_BUTTON, delay_ms=2000)
             result.steps_completed += 1
 
             # Step 8: Share
             logger.info("Step 8/9: Tap share button")
-            if not self._tap_element(UIElementType.SHARE_BUTTON, delay_ms=1000):
+            await self._begin_step("share", 8)
+            if not await self._on_device(
+                self._tap_element, UIElementType.SHARE_BUTTON, delay_ms=1000
+            ):
                 # Share button might not always appear - not critical
                 logger.warning("Share button not clicked - continuing")
             result.steps_completed += 1
 
             # Step 9: Copy URL
             logger.info("Step 9/9: Copy URL")
-            if self._tap_element(UIElementType.COPY_URL_BUTTON, delay_ms=1000):
+            await self._begin_step("copy_url", 9)
+            if await self._on_device(
+                self._tap_element, UIElementType.COPY_URL_BUTTON, delay_ms=1000
+            ):
                 # Get URL from clipboard
-                time.sleep(0.5)
-                blog_url = self.adb.get_clipboard()
+                await self._on_device(self.adb.sleep, 0.5)
+                blog_url = await self._on_device(self.adb.get_clipboard)
                 result.blog_url = blog_url.strip() if blog_url else None
                 logger.info(f"✅ Blog URL: {result.blog_url}")
             result.steps_completed += 1
@@ -266,10 +525,27 @@ class BlogPostingAutomator:
                 f"🎉 Posting completed in {result.execution_time:.2f}s - URL: {result.blog_url}"
             )
 
+        except OperationCancelled as e:
+            failed_step = self._current_step[0] if self._current_step else None
+            logger.warning(f"⏹ Posting stopped at {failed_step}: {e}")
+            result.failed_step = result.failed_step or failed_step
+            result.error_message = str(e)
+            result.cancelled = not isinstance(e, (StepTimeout, DeadlineExceeded))
+
         except Exception as e:
             logger.error(f"❌ Posting failed: {e}")
             result.error_message = str(e)
-            result.execution_time = time.time() - self.start_time if self.start_time else 0
+
+        finally:
+            self._stop_image_upload()
+            result.execution_time = time.time() - self.start_time
+            self._end_step(
+                success=result.success,
+                error=result.error_message or result.failed_step,
+            )
+            if self.profiler is not None:
+                await self._on_device(self.profiler.finish)
+                result.step_timings = self.profiler.to_list()
 
         return result
 
@@ -302,16 +578,34 @@ class BlogPostingAutomator:
             if result.success:
                 return result
 
+            # Cancelled or out of job budget: retrying cannot help
+            if self.cancel_token.cancelled:
+                return result
+
             logger.warning(
                 f"Attempt {attempt} failed at step {result.failed_step}. "
                 f"Completed: {result.steps_completed}/{result.total_steps}"
             )
+            if attempt < self.max_retries:
+                self._emit(
+                    "attempt_failed",
+                    attempt=attempt,
+                    max_retries=self.max_retries,
+                    failed_step=result.failed_step,
+                    error=result.error_message,
+                )
 
             last_result = result
 
-            # Wait before retry
+            # Wait before retry (without blocking the event loop)
             if attempt < self.max_retries:
-                time.sleep(3)
+                await asyncio.sleep(3)
+                try:
+                    self.cancel_token.check()
+                except OperationCancelled as e:
+                    result.error_message = str(e)
+                    result.cancelled = not isinstance(e, DeadlineExceeded)
+                    return result
 
         # All retries failed
         logger.error(f"❌ All {self.max_retries} attempts failed")
@@ -326,6 +620,8 @@ def create_automator(
     device_id: str,
     profile_id: str,
     db: Session,
+    on_event: Optional[Callable[[dict], None]] = None,
+    cancel_token: Optional[CancellationToken] = None,
 ) -> BlogPostingAutomator:
     """
     Factory function to create automation executor
@@ -334,8 +630,12 @@ def create_automator(
         device_id: ADB device serial
         profile_id: Device profile ID
         db: Database session
+        on_event: Optional progress event callback
+        cancel_token: Optional cancellation token
 
     Returns:
         BlogPostingAutomator instance
     """
-    return BlogPostingAutomator(device_id, profile_id, db)
+    return BlogPostingAutomator(
+        device_id, profile_id, db, on_event=on_event, cancel_token=cancel_token
+    )
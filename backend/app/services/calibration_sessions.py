@@ -0,0 +1,414 @@
+"""
+Calibration Session Store - Shared, expiring calibration session state
+
+A calibration session is the step pointer of one interactive calibration
+run. CALIBRATION_SESSION_STORE selects where sessions live:
+- database: calibration_sessions table in the application database,
+  shared by every API worker and kept across restarts
+- memory: LRU-bounded dict in the API process (single worker only)
+
+A submit claims its step before saving the coordinate: advance() moves
+the pointer from the submitted step to the next one atomically (in the
+database a conditional UPDATE), so of two concurrent submits for one step
+on any workers exactly one wins and the other gets StepConflict. If saving
+the claimed coordinate fails, rewind() gives the step back.
+
+Sessions idle (no create or submit) for CALIBRATION_SESSION_TTL_MINUTES
+are treated as gone and deleted by a periodic reaper task, which also
+drops their debug loggers.
+"""
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from typing import List, Optional
+import asyncio
+import uuid
+
+from loguru import logger
+from sqlalchemy import delete, select, update
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.calibration import CalibrationSessionRecord
+from app.services.debug_logger import get_active_debug_session_ids, remove_debug_logger
+
+
+@dataclass
+class CalibrationSessionState:
+    """Snapshot of a calibration session"""
+
+    session_id: str
+    profile_id: str
+    calibrated_by: str
+    current_step: int
+    total_steps: int
+    created_at: datetime
+    updated_at: datetime
+
+    @property
+    def completed(self) -> bool:
+        return self.current_step >= self.total_steps
+
+    @property
+    def completed_steps(self) -> List[int]:
+        # Steps are submitted in order
+        return list(range(min(self.current_step, self.total_steps)))
+
+
+class StepConflict(Exception):
+    """The session is no longer at the submitted step"""
+
+
+class CalibrationSessionStore(ABC):
+    """
+    Calibration session storage with idle expiry and a reaper task
+    """
+
+    def __init__(
+        self,
+        ttl_minutes: float = settings.CALIBRATION_SESSION_TTL_MINUTES,
+        reap_interval: float = settings.CALIBRATION_SESSION_REAP_INTERVAL,
+    ):
+        """
+        Initialize store
+
+        Args:
+            ttl_minutes: Idle time after which a session expires
+            reap_interval: Seconds between reaper runs
+        """
+        self.ttl = timedelta(minutes=ttl_minutes)
+        self.reap_interval = reap_interval
+        self._task: Optional[asyncio.Task] = None
+
+    def _cutoff(self) -> datetime:
+        """Sessions last updated before this have expired"""
+        return datetime.utcnow() - self.ttl
+
+    @abstractmethod
+    async def create(
+        self, profile_id: str, calibrated_by: str, total_steps: int
+    ) -> CalibrationSessionState:
+        """Create a session at step 0"""
+
+    @abstractmethod
+    async def get(self, session_id: str) -> Optional[CalibrationSessionState]:
+        """Get a live session (None if unknown or expired)"""
+
+    @abstractmethod
+    async def advance(self, session_id: str, step: int) -> Optional[CalibrationSessionState]:
+        """
+        Atomically move a session from `step` to the next step
+
+        Returns:
+            Updated session, or None if unknown or expired
+
+        Raises:
+            StepConflict: The session is not at `step`
+        """
+
+    @abstractmethod
+    async def rewind(self, session_id: str, step: int) -> bool:
+        """Undo advance(session_id, step) unless the session moved on since"""
+
+    @abstractmethod
+    async def delete(self, session_id: str) -> bool:
+        """Delete a session, returns whether it existed"""
+
+    @abstractmethod
+    async def reap(self) -> List[str]:
+        """Delete expired sessions, returns their IDs"""
+
+    async def _reap_loop(self):
+        """Periodically delete expired sessions and orphaned debug loggers"""
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            try:
+                reaped = await self.reap()
+                # Debug loggers are per worker; another worker may have
+                # reaped or cancelled the session
+                for session_id in get_active_debug_session_ids():
+                    if session_id in reaped or await self.get(session_id) is None:
+                        remove_debug_logger(session_id)
+                if reaped:
+                    logger.info(f"Reaped {len(reaped)} expired calibration sessions")
+            except Exception as e:
+                logger.error(f"Failed to reap calibration sessions: {e}")
+
+    def start(self):
+        """Start the reaper task (call from a running event loop)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._reap_loop())
+            logger.info(
+                f"Calibration session reaper started (every {self.reap_interval}s, "
+                f"TTL {self.ttl.total_seconds() / 60:g} min)"
+            )
+
+    async def stop(self):
+        """Stop the reaper task"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class MemoryCalibrationSessionStore(CalibrationSessionStore):
+    """
+    In-process store: dict in least recently submitted order
+
+    Used from the event loop only; advance() checks and moves the pointer
+    without awaiting, so it is atomic. Beyond max_sessions the least
+    recently created/submitted sessions are evicted.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = settings.CALIBRATION_SESSION_MAX,
+        ttl_minutes: float = settings.CALIBRATION_SESSION_TTL_MINUTES,
+        reap_interval: float = settings.CALIBRATION_SESSION_REAP_INTERVAL,
+    ):
+        """
+        Initialize store
+
+        Args:
+            max_sessions: Maximum retained sessions (LRU evicted)
+            ttl_minutes: Idle time after which a session expires
+            reap_interval: Seconds between reaper runs
+        """
+        super().__init__(ttl_minutes, reap_interval)
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, CalibrationSessionState]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _live(self, session_id: str) -> Optional[CalibrationSessionState]:
+        session = self._sessions.get(session_id)
+        if session is not None and session.updated_at < self._cutoff():
+            del self._sessions[session_id]
+            return None
+        return session
+
+    async def create(
+        self, profile_id: str, calibrated_by: str, total_steps: int
+    ) -> CalibrationSessionState:
+        now = datetime.utcnow()
+        session = CalibrationSessionState(
+            session_id=str(uuid.uuid4()),
+            profile_id=profile_id,
+            calibrated_by=calibrated_by,
+            current_step=0,
+            total_steps=total_steps,
+            created_at=now,
+            updated_at=now,
+        )
+        self._sessions[session.session_id] = session
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        return replace(session)
+
+    async def get(self, session_id: str) -> Optional[CalibrationSessionState]:
+        session = self._live(session_id)
+        return replace(session) if session is not None else None
+
+    async def advance(self, session_id: str, step: int) -> Optional[CalibrationSessionState]:
+        session = self._live(session_id)
+        if session is None:
+            return None
+        if session.current_step != step:
+            raise StepConflict(f"Session {session_id} is at step {session.current_step}")
+        session.current_step = step + 1
+        session.updated_at = datetime.utcnow()
+        self._sessions.move_to_end(session_id)
+        return replace(session)
+
+    async def rewind(self, session_id: str, step: int) -> bool:
+        session = self._live(session_id)
+        if session is None or session.current_step != step + 1:
+            return False
+        session.current_step = step
+        return True
+
+    async def delete(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    async def reap(self) -> List[str]:
+        # Oldest activity first, so stop at the first live session
+        cutoff = self._cutoff()
+        reaped = []
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.updated_at >= cutoff:
+                break
+            del self._sessions[session.session_id]
+            reaped.append(session.session_id)
+        return reaped
+
+
+class DatabaseCalibrationSessionStore(CalibrationSessionStore):
+    """
+    Store in the calibration_sessions table, shared by all API workers
+
+    Every operation is one short transaction on its own async session;
+    advance() and rewind() are conditional UPDATEs on the step pointer.
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        ttl_minutes: float = settings.CALIBRATION_SESSION_TTL_MINUTES,
+        reap_interval: float = settings.CALIBRATION_SESSION_REAP_INTERVAL,
+    ):
+        """
+        Initialize store
+
+        Args:
+            session_factory: Async session factory of the database
+            ttl_minutes: Idle time after which a session expires
+            reap_interval: Seconds between reaper runs
+        """
+        super().__init__(ttl_minutes, reap_interval)
+        self.session_factory = session_factory
+
+    @staticmethod
+    def _state(row) -> CalibrationSessionState:
+        return CalibrationSessionState(
+            session_id=row.session_id,
+            profile_id=row.profile_id,
+            calibrated_by=row.calibrated_by,
+            current_step=row.current_step,
+            total_steps=row.total_steps,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+        )
+
+    async def _select_live(self, db, session_id: str):
+        table = CalibrationSessionRecord.__table__
+        result = await db.execute(
+            select(table).where(
+                table.c.session_id == session_id, table.c.updated_at >= self._cutoff()
+            )
+        )
+        return result.first()
+
+    async def create(
+        self, profile_id: str, calibrated_by: str, total_steps: int
+    ) -> CalibrationSessionState:
+        now = datetime.utcnow()
+        session = CalibrationSessionState(
+            session_id=str(uuid.uuid4()),
+            profile_id=profile_id,
+            calibrated_by=calibrated_by,
+            current_step=0,
+            total_steps=total_steps,
+            created_at=now,
+            updated_at=now,
+        )
+        async with self.session_factory() as db:
+            await db.execute(
+                CalibrationSessionRecord.__table__.insert().values(
+                    session_id=session.session_id,
+                    profile_id=profile_id,
+                    calibrated_by=calibrated_by,
+                    current_step=0,
+                    total_steps=total_steps,
+                    created_at=now,
+                    updated_at=now,
+                )
+            )
+            await db.commit()
+        return session
+
+    async def get(self, session_id: str) -> Optional[CalibrationSessionState]:
+        async with self.session_factory() as db:
+            row = await self._select_live(db, session_id)
+        return self._state(row) if row is not None else None
+
+    async def advance(self, session_id: str, step: int) -> Optional[CalibrationSessionState]:
+        table = CalibrationSessionRecord.__table__
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(table)
+                .where(
+                    table.c.session_id == session_id,
+                    table.c.current_step == step,
+                    table.c.updated_at >= self._cutoff(),
+                )
+                .values(current_step=step + 1, updated_at=datetime.utcnow())
+            )
+            row = await self._select_live(db, session_id)
+            await db.commit()
+
+        if row is None:
+            return None
+        if result.rowcount == 0:
+            raise StepConflict(f"Session {session_id} is at step {row.current_step}")
+        return self._state(row)
+
+    async def rewind(self, session_id: str, step: int) -> bool:
+        table = CalibrationSessionRecord.__table__
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(table)
+                .where(table.c.session_id == session_id, table.c.current_step == step + 1)
+                .values(current_step=step)
+            )
+            await db.commit()
+        return result.rowcount > 0
+
+    async def delete(self, session_id: str) -> bool:
+        table = CalibrationSessionRecord.__table__
+        async with self.session_factory() as db:
+            result = await db.execute(delete(table).where(table.c.session_id == session_id))
+            await db.commit()
+        return result.rowcount > 0
+
+    async def reap(self) -> List[str]:
+        table = CalibrationSessionRecord.__table__
+        cutoff = self._cutoff()
+        async with self.session_factory() as db:
+            reaped = list(
+                (
+                    await db.execute(
+                        select(table.c.session_id).where(table.c.updated_at < cutoff)
+                    )
+                ).scalars()
+            )
+            if reaped:
+                # Re-check the age: a session may have been submitted meanwhile
+                await db.execute(
+                    delete(table).where(
+                        table.c.session_id.in_(reaped), table.c.updated_at < cutoff
+                    )
+                )
+                await db.commit()
+        return reaped
+
+
+def create_session_store(backend: str = settings.CALIBRATION_SESSION_STORE) -> CalibrationSessionStore:
+    """
+    Create the calibration session store for a backend name
+
+    Args:
+        backend: "database" or "memory"
+
+    Returns:
+        CalibrationSessionStore
+    """
+    if backend == "database":
+        return DatabaseCalibrationSessionStore()
+    if backend == "memory":
+        return MemoryCalibrationSessionStore()
+    raise ValueError(f"Unknown calibration session store: {backend}")
+
+
+# Global calibration session store
+_session_store = create_session_store()
+
+
+def get_session_store() -> CalibrationSessionStore:
+    """Get the global calibration session store"""
+    return _session_store
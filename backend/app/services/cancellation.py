@@ -0,0 +1,293 @@
+"""
+Cancellation - Cooperative cancellation tokens, time budgets and watchdog
+
+A CancellationToken is threaded through BlogPostingAutomator and
+ADBController. Every device call and deliberate wait checks it, so a
+cancelled run stops at the next ADB round trip (at most one step later).
+
+Tokens also carry time budgets:
+- a job deadline covering all attempts (DeadlineExceeded, not retried)
+- a per-step budget (StepTimeout, the attempt fails and may be retried)
+
+Blocking waits and ADB timeouts are clamped to the remaining budget. The
+watchdog thread catches what cooperation cannot: when a budget is
+exceeded it wakes any waits and runs the token's abort callbacks, so the
+owner can release the device even if a call is stuck.
+
+A stuck call that is abandoned keeps its thread until the blocking I/O
+returns, while the run may already retry on a fresh thread with the same
+token. Device calls are therefore bound to the token's generation; fence()
+starts a new one, and a call bound to an older generation fails its next
+check() instead of tapping alongside the retry.
+"""
+from typing import Callable, List, Optional, Set, TypeVar
+import functools
+import threading
+import time
+
+from loguru import logger
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+class OperationCancelled(Exception):
+    """The run was cancelled (by a user or the job deadline)"""
+
+
+class DeadlineExceeded(OperationCancelled):
+    """The job ran past its overall deadline"""
+
+
+class StepTimeout(OperationCancelled):
+    """A single step ran past its time budget"""
+
+
+class CallAbandoned(OperationCancelled):
+    """A device call outlived its budget and was fenced off"""
+
+
+class CancellationToken:
+    """
+    Thread-safe cancellation flag with a job deadline and step budgets
+
+    The device thread calls check()/wait(); any thread may call cancel().
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[str], None]] = []
+        self.reason: Optional[str] = None
+        self.deadline: Optional[float] = None  # monotonic
+        self.step_name: Optional[str] = None
+        self.step_budget: Optional[float] = None
+        self.step_deadline: Optional[float] = None
+        self._deadline_exceeded = False
+        self._step_expired = False
+        self.generation = 0
+        self._bound = threading.local()  # generation of the thread's current call
+
+    # Control (any thread)
+
+    @property
+    def cancelled(self) -> bool:
+        """True once cancel() was called or the job deadline passed"""
+        return self.reason is not None
+
+    def cancel(self, reason: str = "Cancelled"):
+        """
+        Request cancellation
+
+        Args:
+            reason: Human-readable reason (reported as the job error)
+        """
+        with self._lock:
+            if self.reason is not None:
+                return
+            self.reason = reason
+            callbacks = list(self._callbacks)
+        self._event.set()
+        logger.info(f"Cancellation requested: {reason}")
+        self._run_callbacks(callbacks, reason)
+
+    def add_callback(self, callback: Callable[[str], None]):
+        """Register a callback run (with the reason) on cancel or budget expiry"""
+        with self._lock:
+            self._callbacks.append(callback)
+
+    def start(self, deadline_seconds: Optional[float] = None):
+        """
+        Start the job clock
+
+        Args:
+            deadline_seconds: Overall budget for the job (None = no deadline)
+        """
+        self.deadline = time.monotonic() + deadline_seconds if deadline_seconds else None
+        get_watchdog().watch(self)
+
+    def finish(self):
+        """Stop the job clock once the run is over"""
+        get_watchdog().unwatch(self)
+        self.deadline = None
+        self.end_step()
+
+    def begin_step(self, name: str, budget: Optional[float]):
+        """Start a step budget (replaces the previous step's)"""
+        with self._lock:
+            self.step_name = name
+            self.step_budget = budget
+            self.step_deadline = time.monotonic() + budget if budget else None
+            self._step_expired = False
+            if self.reason is None:
+                self._event.clear()
+
+    def end_step(self):
+        """Clear the step budget"""
+        self.begin_step(None, None)
+
+    def bind(self, func: Callable[..., T]) -> Callable[..., T]:
+        """
+        Bind a device call to the current generation
+
+        Args:
+            func: Blocking callable to run on a device thread
+
+        Returns:
+            Wrapper whose check()/wait() calls fail once fence() was called
+        """
+        generation = self.generation
+
+        @functools.wraps(func)
+        def bound(*args, **kwargs):
+            self._bound.generation = generation
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._bound.generation = None
+
+        return bound
+
+    def fence(self):
+        """Stop calls bound so far (an abandoned call still holds its thread)"""
+        with self._lock:
+            self.generation += 1
+
+    # Cooperation (device thread)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the nearest deadline (None = unbounded)"""
+        deadlines = [d for d in (self.deadline, self.step_deadline) if d is not None]
+        if not deadlines:
+            return None
+        return max(0.0, min(deadlines) - time.monotonic())
+
+    def check(self):
+        """
+        Raise if the run must stop
+
+        Raises:
+            OperationCancelled: cancel() was called
+            DeadlineExceeded: The job deadline passed
+            StepTimeout: The current step's budget passed
+            CallAbandoned: The calling device call was fenced off
+        """
+        bound = getattr(self._bound, "generation", None)
+        if bound is not None and bound != self.generation:
+            raise CallAbandoned("Device call was abandoned")
+        now = time.monotonic()
+        if self.reason is None and self.deadline is not None and now >= self.deadline:
+            self._exceed_deadline()
+        if self.reason is not None:
+            if self._deadline_exceeded:
+                raise DeadlineExceeded(self.reason)
+            raise OperationCancelled(self.reason)
+        if self._step_expired or (self.step_deadline is not None and now >= self.step_deadline):
+            raise StepTimeout(
+                f"Step {self.step_name} exceeded its {self.step_budget:g}s budget"
+            )
+
+    def wait(self, seconds: float):
+        """
+        Sleep that wakes up on cancellation or budget expiry
+
+        Raises:
+            OperationCancelled: (or subclass) if the run must stop
+        """
+        self.check()
+        remaining = self.remaining()
+        timeout = seconds if remaining is None else min(seconds, remaining)
+        self._event.wait(timeout)
+        self.check()
+
+    def clamp_timeout(self, timeout: float) -> float:
+        """Limit an I/O timeout to the remaining budget (at least 1s)"""
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        return max(1.0, min(timeout, remaining))
+
+    # Watchdog
+
+    def _expire(self) -> bool:
+        """Called by the watchdog; returns True if a budget just expired"""
+        now = time.monotonic()
+        if self.reason is None and self.deadline is not None and now >= self.deadline:
+            self._exceed_deadline()
+            return True
+
+        with self._lock:
+            if self._step_expired or self.step_deadline is None or now < self.step_deadline:
+                return False
+            self._step_expired = True
+            reason = f"Step {self.step_name} exceeded its {self.step_budget:g}s budget"
+            callbacks = list(self._callbacks)
+        self._event.set()
+        self._run_callbacks(callbacks, reason)
+        return True
+
+    def _exceed_deadline(self):
+        self._deadline_exceeded = True
+        self.cancel("Job deadline exceeded")
+
+    @staticmethod
+    def _run_callbacks(callbacks: List[Callable[[str], None]], reason: str):
+        for callback in callbacks:
+            try:
+                callback(reason)
+            except Exception as e:
+                logger.warning(f"Cancellation callback failed: {e}")
+
+
+class Watchdog:
+    """
+    Background thread enforcing the budgets of running tokens
+    """
+
+    def __init__(self, interval: float = settings.WATCHDOG_INTERVAL):
+        """
+        Initialize watchdog
+
+        Args:
+            interval: Seconds between budget checks
+        """
+        self.interval = interval
+        self._tokens: Set[CancellationToken] = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, token: CancellationToken):
+        """Start enforcing a token's budgets"""
+        with self._lock:
+            self._tokens.add(token)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="cancellation-watchdog", daemon=True
+                )
+                self._thread.start()
+
+    def unwatch(self, token: CancellationToken):
+        """Stop enforcing a token's budgets"""
+        with self._lock:
+            self._tokens.discard(token)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                tokens = [token for token in self._tokens if not token.cancelled]
+            for token in tokens:
+                if token._expire():
+                    logger.warning(
+                        f"Watchdog: budget exceeded ({token.reason or token.step_name})"
+                    )
+
+
+# Global watchdog
+_watchdog = Watchdog()
+
+
+def get_watchdog() -> Watchdog:
+    """Get the global watchdog"""
+    return _watchdog
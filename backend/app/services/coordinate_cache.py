@@ -0,0 +1,158 @@
+"""
+Coordinate Cache - Read-through, per-profile cache of tap coordinates
+
+Coordinates only change during calibration, but every posting needs the
+full map for its profile. DeviceManager serves job startup from this
+cache and invalidates a profile whenever one of its coordinates is
+created, updated or deleted (calibration submits go through the same
+methods), so steady-state job startup only runs a version lookup
+instead of loading the coordinates.
+
+Entries are immutable: a job keeps the snapshot it started with even if
+calibration changes the profile mid-run. Each profile has a version
+counter, bumped on every invalidation; a load that raced with an
+invalidation is not stored.
+
+Invalidation only reaches the cache of the process that made the write.
+With several API workers, every lookup therefore also passes the
+profile's latest coordinate_versions.version (one index seek; every
+coordinate write, rollback and import appends a version), and an entry
+loaded at another version is reloaded, so a write on one worker is seen
+by the next job on any worker.
+"""
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Callable, Dict, Mapping, NamedTuple, Optional, Tuple
+import threading
+
+from app.models.coordinate import UIElementType
+
+
+class CoordinatePoint(NamedTuple):
+    """Compact tap target of one UI element"""
+
+    id: int
+    x: int
+    y: int
+    radius: int
+    confidence: float
+
+
+@dataclass(frozen=True)
+class ProfileCoordinates:
+    """Immutable snapshot of a profile's screen size and coordinates"""
+
+    profile_id: str
+    version: int
+    width: int
+    height: int
+    coordinates: Mapping[UIElementType, CoordinatePoint]
+
+
+class CoordinateCache:
+    """
+    Thread-safe map of profile_id -> ProfileCoordinates
+    """
+
+    def __init__(self):
+        # profile_id -> (snapshot, shared coordinate version it was loaded at)
+        self._entries: Dict[str, Tuple[ProfileCoordinates, Optional[int]]] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, profile_id: str) -> int:
+        """Current version of a profile's coordinates"""
+        with self._lock:
+            return self._versions.get(profile_id, 0)
+
+    def get_or_load(
+        self,
+        profile_id: str,
+        loader: Callable[[str, int], Optional[ProfileCoordinates]],
+        shared_version: Optional[int] = None,
+    ) -> Optional[ProfileCoordinates]:
+        """
+        Get a profile's snapshot, loading it on a miss
+
+        Args:
+            profile_id: Profile ID
+            loader: Called with (profile_id, version) on a miss; returns the
+                snapshot, or None if the profile does not exist
+            shared_version: Latest coordinate version in the shared
+                database; a snapshot loaded at another one is stale
+
+        Returns:
+            ProfileCoordinates or None
+        """
+        with self._lock:
+            cached = self._entries.get(profile_id)
+            if cached is not None and cached[1] == shared_version:
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+            version = self._versions.get(profile_id, 0)
+
+        entry = loader(profile_id, version)
+        if entry is None:
+            return None
+
+        with self._lock:
+            # Only keep the load if nothing was invalidated meanwhile
+            if self._versions.get(profile_id, 0) == version:
+                self._entries[profile_id] = (entry, shared_version)
+        return entry
+
+    def invalidate(self, profile_id: str) -> int:
+        """
+        Drop a profile's snapshot and bump its version
+
+        Returns:
+            New version
+        """
+        with self._lock:
+            self._entries.pop(profile_id, None)
+            version = self._versions.get(profile_id, 0) + 1
+            self._versions[profile_id] = version
+            return version
+
+    def clear(self):
+        """Drop every snapshot (versions are bumped)"""
+        with self._lock:
+            for profile_id in list(self._entries):
+                self._versions[profile_id] = self._versions.get(profile_id, 0) + 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"profiles": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def build_snapshot(profile, coords, version: int) -> ProfileCoordinates:
+    """Build an immutable snapshot from ORM rows"""
+    return ProfileCoordinates(
+        profile_id=profile.profile_id,
+        version=version,
+        width=profile.width,
+        height=profile.height,
+        coordinates=MappingProxyType({
+            UIElementType(coord.element_type): CoordinatePoint(
+                id=coord.id,
+                x=coord.x,
+                y=coord.y,
+                radius=coord.touch_radius or 20,
+                confidence=coord.confidence,
+            )
+            for coord in coords
+        }),
+    )
+
+
+# Global coordinate cache
+_coordinate_cache = CoordinateCache()
+
+
+def get_coordinate_cache() -> CoordinateCache:
+    """Get the global coordinate cache"""
+    return _coordinate_cache
@@ -0,0 +1,102 @@
+"""
+Coordinate History - Compact encoding of coordinate set versions
+
+A coordinate set is encoded as {element_type: [x, y, confidence,
+validated, calibration_method, touch_radius]}. Versions between keyframes
+store a delta against the previous version: changed or added elements
+with their new entry, removed elements as None. A calibration step
+changes one element, so its version is a single small entry instead of
+a copy of the whole set.
+
+DeviceManager appends the versions and rebuilds a version by applying the
+deltas since the nearest keyframe at or before it.
+"""
+from typing import Dict, Iterable, List, Optional
+
+from app.models.coordinate import CalibrationMethod, UIElementType
+
+# element_type -> [x, y, confidence, validated, calibration_method, touch_radius]
+CoordinateState = Dict[str, list]
+CoordinateDelta = Dict[str, Optional[list]]
+
+
+def encode_state(rows: Iterable) -> CoordinateState:
+    """
+    Encode coordinate rows (ORM objects or result rows)
+
+    Args:
+        rows: Rows with element_type, x, y, confidence, validated,
+            calibration_method and touch_radius
+
+    Returns:
+        Encoded coordinate set
+    """
+    return {
+        UIElementType(row.element_type).value: [
+            row.x,
+            row.y,
+            row.confidence if row.confidence is not None else 0.5,
+            bool(row.validated),
+            CalibrationMethod(row.calibration_method or CalibrationMethod.DEFAULT).value,
+            row.touch_radius or 20,
+        ]
+        for row in rows
+    }
+
+
+def diff_states(old: CoordinateState, new: CoordinateState) -> CoordinateDelta:
+    """
+    Delta that turns old into new
+
+    Returns:
+        Changed/added elements, removed elements as None (empty = no change)
+    """
+    delta: CoordinateDelta = {
+        element: entry for element, entry in new.items() if old.get(element) != entry
+    }
+    for element in old.keys() - new.keys():
+        delta[element] = None
+    return delta
+
+
+def apply_delta(state: CoordinateState, delta: CoordinateDelta) -> CoordinateState:
+    """Apply a delta to a coordinate set in place"""
+    for element, entry in delta.items():
+        if entry is None:
+            state.pop(element, None)
+        else:
+            state[element] = entry
+    return state
+
+
+def rebuild_state(versions: List[tuple[bool, dict]]) -> CoordinateState:
+    """
+    Rebuild a coordinate set from a keyframe and the deltas after it
+
+    Args:
+        versions: (keyframe, data) in version order, starting with a keyframe
+
+    Returns:
+        Coordinate set of the last version
+    """
+    state: CoordinateState = {}
+    for keyframe, data in versions:
+        if keyframe:
+            state = dict(data)
+        else:
+            apply_delta(state, data)
+    return state
+
+
+def decode_entry(element_type: str, entry: list) -> dict:
+    """Encoded element -> coordinate fields"""
+    x, y, confidence, validated, calibration_method, touch_radius = entry
+    return {
+        "element_type": element_type,
+        "x": x,
+        "y": y,
+        "confidence": confidence,
+        "validated": validated,
+        "calibration_method": calibration_method,
+        "touch_radius": touch_radius,
+    }
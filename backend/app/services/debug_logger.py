@@ -11,7 +11,7 @@ from pathlib import Path
 from datetime import datetime
 import json
 import base64
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from loguru import logger
 
 from app.core.config import settings
@@ -218,6 +218,11 @@ def get_debug_logger(session_id: str) -> DebugLogger:
     return _active_debug_sessions[session_id]
 
 
+def get_active_debug_session_ids() -> List[str]:
+    """Session IDs with a debug logger in this process"""
+    return list(_active_debug_sessions)
+
+
 def remove_debug_logger(session_id: str):
     """Remove debug logger from active sessions"""
     if session_id in _active_debug_sessions:
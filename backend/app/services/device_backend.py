@@ -0,0 +1,148 @@
+"""
+Device Backend Interface - Transport layer behind ADBController
+
+ADBController talks to devices only through this interface, so the real
+adbutils transport can be swapped for the in-process simulator
+(DEVICE_BACKEND=simulated) to load-test the API without phones, and either
+can be hosted in a supervised worker process (DEVICE_WORKER_MODE=process).
+"""
+from abc import ABC, abstractmethod
+from io import BytesIO
+from typing import List, Optional
+
+from adbutils import adb, AdbDevice, AdbError
+from PIL import Image
+
+from app.core.config import settings
+
+
+class DeviceBackend(ABC):
+    """
+    Minimal device transport used by ADBController
+
+    Implementations raise adbutils.AdbError for transport failures so the
+    controller's error handling is identical for every backend.
+    """
+
+    serial: str
+
+    @abstractmethod
+    def shell(self, command: str, timeout: Optional[float] = None) -> str:
+        """Run a shell command and return its output"""
+
+    @abstractmethod
+    def screenshot(self) -> Image.Image:
+        """Capture the current screen"""
+
+    @abstractmethod
+    def push(self, local_path: str, remote_path: str):
+        """Copy a host file to the device"""
+
+    # Frame work (CPU-bound; runs wherever the backend lives)
+
+    def screenshot_png(self) -> bytes:
+        """Capture the current screen encoded as PNG"""
+        output = BytesIO()
+        self.screenshot().save(output, "PNG")
+        return output.getvalue()
+
+    def screen_hash(self) -> int:
+        """Capture the current screen as a 64-bit average hash"""
+        return screen_hash(self.screenshot())
+
+
+def screen_hash(image: Image.Image) -> int:
+    """
+    64-bit average hash of a screenshot
+
+    Robust to compression noise and small changes (clock, badges), so a
+    screen matches itself while other screens do not.
+    """
+    pixels = list(image.convert("L").resize((8, 8), Image.BILINEAR).getdata())
+    mean = sum(pixels) / len(pixels)
+    value = 0
+    for pixel in pixels:
+        value = (value << 1) | (pixel >= mean)
+    return value
+
+
+def hash_distance(a: int, b: int) -> int:
+    """Number of differing bits between two screen hashes"""
+    return bin(a ^ b).count("1")
+
+
+class AdbDeviceBackend(DeviceBackend):
+    """Real device reached through the ADB server (adbutils)"""
+
+    def __init__(self, device: AdbDevice):
+        self._device = device
+        self.serial = device.serial
+
+    def shell(self, command: str, timeout: Optional[float] = None) -> str:
+        return self._device.shell(command, timeout=timeout)
+
+    def screenshot(self) -> Image.Image:
+        return self._device.screenshot()
+
+    def push(self, local_path: str, remote_path: str):
+        self._device.sync.push(local_path, remote_path)
+
+
+def _use_simulator() -> bool:
+    return settings.DEVICE_BACKEND == "simulated"
+
+
+def list_device_serials() -> List[str]:
+    """
+    List serials of all devices visible to the configured backend
+
+    Returns:
+        Device serial numbers
+    """
+    if _use_simulator():
+        from app.services.simulated_device import list_simulated_serials
+
+        return list_simulated_serials()
+
+    return [device.serial for device in adb.device_list()]
+
+
+def open_device(serial: Optional[str] = None) -> DeviceBackend:
+    """
+    Open a device on the configured backend
+
+    In process mode the device is owned by a supervised worker process and
+    a proxy backend is returned.
+
+    Args:
+        serial: Device serial (None = first available device)
+
+    Returns:
+        DeviceBackend instance
+
+    Raises:
+        AdbError: If no device is available
+    """
+    if serial is None:
+        serials = list_device_serials()
+        if not serials:
+            raise AdbError("No devices found")
+        serial = serials[0]
+
+    if settings.DEVICE_WORKER_MODE == "process":
+        from app.services.device_workers import get_worker_supervisor, in_worker_process
+
+        if not in_worker_process():
+            return get_worker_supervisor().open(serial)
+
+    return open_local_device(serial)
+
+
+def open_local_device(serial: str) -> DeviceBackend:
+    """Open a device in this process (worker processes, thread mode)"""
+    if _use_simulator():
+        from app.services.simulated_device import get_simulated_device
+
+        return get_simulated_device(serial)
+
+    return AdbDeviceBackend(adb.device(serial=serial))
@@ -0,0 +1,124 @@
+"""
+Device Executor - One dedicated thread per device, bridged to asyncio
+
+ADB calls and deliberate waits block, so they never run on the event loop.
+Each device gets a single-thread executor: calls for one phone run in
+order (no interleaved taps from two coroutines), different phones run in
+parallel, and the API/WebSockets stay responsive no matter how many
+postings are active.
+
+A call that outlives its budget (hung `adb shell`, stuck backend) is
+abandoned: the device gets a fresh thread so later work is not stuck
+behind it.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, TypeVar
+import asyncio
+import functools
+import threading
+
+from loguru import logger
+
+from app.services.cancellation import StepTimeout
+
+T = TypeVar("T")
+
+
+class DeviceExecutorPool:
+    """
+    Registry of per-device single-thread executors
+    """
+
+    def __init__(self):
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._lock = threading.Lock()
+
+    def executor(self, device_id: str) -> ThreadPoolExecutor:
+        """Get (or create) the executor of a device"""
+        with self._lock:
+            executor = self._executors.get(device_id)
+            if executor is None:
+                executor = self._executors[device_id] = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix=f"device-{device_id}"
+                )
+            return executor
+
+    async def run(
+        self,
+        device_id: str,
+        func: Callable[..., T],
+        *args,
+        abandon_after: Optional[float] = None,
+        **kwargs,
+    ) -> T:
+        """
+        Run a blocking call on the device's thread and await its result
+
+        Args:
+            device_id: Device serial
+            func: Blocking callable
+            *args: Positional arguments for func
+            abandon_after: Seconds after which a still-running call is
+                abandoned (None = wait indefinitely)
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Return value of func
+
+        Raises:
+            StepTimeout: The call was abandoned
+        """
+        loop = asyncio.get_running_loop()
+        executor = self.executor(device_id)
+        future = loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+        if abandon_after is None:
+            return await future
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=abandon_after)
+        except asyncio.TimeoutError:
+            # Mark the eventual outcome as retrieved, then free the device
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self.abandon(device_id, executor)
+            raise StepTimeout(
+                f"Device call {getattr(func, '__name__', func)} on {device_id} "
+                f"did not return within {abandon_after:.1f}s"
+            )
+
+    def abandon(self, device_id: str, executor: Optional[ThreadPoolExecutor] = None):
+        """
+        Give the device a fresh thread, leaving a stuck one behind
+
+        Args:
+            device_id: Device serial
+            executor: Only replace if this is still the current executor
+        """
+        with self._lock:
+            current = self._executors.get(device_id)
+            if current is None or (executor is not None and current is not executor):
+                return
+            del self._executors[device_id]
+        current.shutdown(wait=False, cancel_futures=True)
+        logger.warning(f"Abandoned stuck executor thread of device {device_id}")
+
+    def shutdown(self):
+        """Stop all device threads (application shutdown)"""
+        with self._lock:
+            executors = list(self._executors.values())
+            self._executors.clear()
+        for executor in executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Global per-device executors
+_device_executors = DeviceExecutorPool()
+
+
+def get_device_executors() -> DeviceExecutorPool:
+    """Get the global per-device executor pool"""
+    return _device_executors
+
+
+async def run_on_device(device_id: str, func: Callable[..., T], *args, **kwargs) -> T:
+    """Run a blocking device call on the device's dedicated thread"""
+    return await _device_executors.run(device_id, func, *args, **kwargs)
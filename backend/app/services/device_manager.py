@@ -3,17 +3,46 @@ Device Manager Service - Production-grade device profile management
 
 Handles device discovery, profile creation, and coordinate management
 """
+from sqlalchemy import bindparam, case, delete, func, insert, inspect, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from loguru import logger
-
-from app.models.device import DeviceProfile
-from app.models.coordinate import CoordinateConfig, UIElementType, CalibrationMethod
+from types import SimpleNamespace
+import asyncio
+import json
+
+from app.models.device import Device, DeviceProfile
+from app.models.coordinate import (
+    CoordinateConfig,
+    CoordinateVersion,
+    UIElementType,
+    CalibrationMethod,
+)
+from app.core.config import settings
 from app.core.ui_elements import get_default_coordinates
-from app.schemas.device import DeviceProfileCreate, DeviceProfileUpdate
-from app.schemas.coordinate import CoordinateCreate, CoordinateUpdate
+from app.core.pagination import decode_cursor, encode_cursor
+from app.schemas.device import DeviceProfileCreate, DeviceProfileFilter, DeviceProfileUpdate
+from app.schemas.coordinate import (
+    CoordinateCreate,
+    CoordinateFilter,
+    CoordinateUpdate,
+    CoordinateUpsert,
+)
 from app.services.adb_controller import ADBController, list_connected_devices
+from app.services.coordinate_cache import (
+    ProfileCoordinates,
+    build_snapshot,
+    get_coordinate_cache,
+)
+from app.services.coordinate_history import (
+    CoordinateState,
+    decode_entry,
+    diff_states,
+    encode_state,
+    rebuild_state,
+)
 
 
 class DeviceManager:
@@ -22,8 +51,9 @@ class DeviceManager:
 
     Responsibilities:
     - Device discovery and profile creation
+    - Device registry (serial -> profile, connection and health tracking)
     - Profile CRUD operations
-    - Coordinate configuration management
+    - Coordinate configuration management (with a read-through cache)
     - Calibration tracking
     """
 
@@ -35,6 +65,7 @@ class DeviceManager:
             db: SQLAlchemy database session
         """
         self.db = db
+        self.cache = get_coordinate_cache()
 
     def scan_devices(self) -> List[dict]:
         """
@@ -63,6 +94,9 @@ class DeviceManager:
             DeviceProfile instance
         """
         try:
+            serial = device_info["device_id"]
+            now = datetime.utcnow()
+
             # Generate profile ID
             profile_id = DeviceProfile.generate_profile_id(
                 model=device_info["model"],
@@ -71,25 +105,11 @@ class DeviceManager:
             )
 
             # Check if profile exists
-            profile = (
-                self.db.query(DeviceProfile)
-                .filter(DeviceProfile.profile_id == profile_id)
-                .first()
-            )
+            profile = self.get_profile(profile_id)
+            created = profile is None
 
-            if profile:
-                # Profile exists - add device ID if new
-                if device_info["device_id"] not in profile.device_ids:
-                    device_ids = profile.device_ids.copy()
-                    device_ids.append(device_info["device_id"])
-                    profile.device_ids = device_ids
-                    profile.last_used_at = datetime.utcnow()
-                    self.db.commit()
-                    logger.info(
-                        f"Added device {device_info['device_id']} to existing profile {profile_id}"
-                    )
-            else:
-                # Create new profile
+            if created:
+                # Create new profile and its default coordinates atomically
                 profile = DeviceProfile(
                     profile_id=profile_id,
                     model=device_info["model"],
@@ -98,18 +118,41 @@ class DeviceManager:
                     width=device_info["width"],
                     height=device_info["height"],
                     dpi=device_info["dpi"],
-                    device_ids=[device_info["device_id"]],
                     calibrated=False,
                     calibration_confidence=0.0,
                 )
                 self.db.add(profile)
-                self.db.commit()
-                self.db.refresh(profile)
+                self.db.flush()
+
+                default_coords = self._default_coordinate_rows(profile)
+                self.db.connection().execute(insert(CoordinateConfig.__table__), default_coords)
+                state = encode_state(SimpleNamespace(**row) for row in default_coords)
+                self._insert_coordinate_version(profile_id, 1, True, state, len(state), "default")
+
+            # Register the serial (unique index seek) and mark it seen
+            device = self.get_device(serial)
+            if device is None:
+                profile.devices.append(
+                    Device(serial=serial, first_seen_at=now, last_seen_at=now)
+                )
+                profile.last_used_at = now
+                logger.info(f"Added device {serial} to profile {profile_id}")
+            else:
+                if device.profile_id != profile_id:
+                    logger.info(
+                        f"Device {serial} moved from profile {device.profile_id} to {profile_id}"
+                    )
+                    profile.devices.append(device)
+                device.last_seen_at = now
 
-                # Initialize default coordinates
-                self._initialize_default_coordinates(profile)
+            self.db.commit()
 
-                logger.info(f"Created new profile: {profile_id}")
+            if created:
+                self.cache.invalidate(profile_id)
+                logger.info(
+                    f"Created new profile: {profile_id} "
+                    f"with {len(default_coords)} default coordinates"
+                )
 
             return profile
 
@@ -118,41 +161,45 @@ class DeviceManager:
             self.db.rollback()
             raise
 
-    def _initialize_default_coordinates(self, profile: DeviceProfile):
+    def _default_coordinate_rows(self, profile: DeviceProfile) -> List[dict]:
         """
-        Initialize default coordinates based on resolution
+        Default coordinate rows for a new profile (bulk insert parameters)
 
-        Uses ui_elements.py as single source of truth
+        Uses ui_elements.py as single source of truth; known resolutions
+        are precomputed at startup.
 
         Args:
             profile: DeviceProfile instance
-        """
-        try:
-            # Get default coordinates from centralized definition
-            default_coords = get_default_coordinates(profile.width, profile.height)
-
-            for coord_data in default_coords:
-                coord = CoordinateConfig(
-                    profile_id=profile.profile_id,
-                    element_type=coord_data["element_type"],
-                    element_name=coord_data["element_name"],
-                    element_description=coord_data.get("description", ""),
-                    x=coord_data["x"],
-                    y=coord_data["y"],
-                    confidence=0.5,  # Low confidence for defaults
-                    validated=False,
-                    calibration_method=CalibrationMethod.DEFAULT,
-                )
-                self.db.add(coord)
 
-            self.db.commit()
-            logger.info(
-                f"Initialized {len(default_coords)} default coordinates for {profile.profile_id}"
-            )
-
-        except Exception as e:
-            logger.error(f"Failed to initialize default coordinates: {e}")
-            self.db.rollback()
+        Returns:
+            List of coordinate_configs column dicts
+        """
+        now = datetime.utcnow()
+        return [
+            {
+                "profile_id": profile.profile_id,
+                "element_type": coord_data["element_type"],
+                "element_name": coord_data["element_name"],
+                "element_description": coord_data.get("description", ""),
+                "x": coord_data["x"],
+                "y": coord_data["y"],
+                "confidence": 0.5,  # Low confidence for defaults
+                "validated": False,
+                "calibration_method": CalibrationMethod.DEFAULT,
+                "touch_radius": 20,
+                "created_at": now,
+                "updated_at": now,
+                "usage_count": 0,
+                "success_count": 0,
+                "fail_count": 0,
+            }
+            for coord_data in get_default_coordinates(profile.width, profile.height)
+        ]
+
+    def get_known_resolutions(self) -> List[tuple[int, int]]:
+        """Distinct (width, height) of existing profiles"""
+        rows = self.db.query(DeviceProfile.width, DeviceProfile.height).distinct().all()
+        return [(row.width, row.height) for row in rows]
 
     def get_profile(self, profile_id: str) -> Optional[DeviceProfile]:
         """
@@ -170,22 +217,389 @@ class DeviceManager:
             .first()
         )
 
+    def get_existing_profile_ids(self, profile_ids: List[str]) -> set[str]:
+        """
+        Check which profile IDs exist with a single IN query
+
+        Args:
+            profile_ids: Profile IDs to check
+
+        Returns:
+            Set of profile IDs that exist
+        """
+        unique_ids = set(profile_ids)
+        if not unique_ids:
+            return set()
+
+        rows = (
+            self.db.query(DeviceProfile.profile_id)
+            .filter(DeviceProfile.profile_id.in_(unique_ids))
+            .all()
+        )
+        return {row.profile_id for row in rows}
+
+    # Devices (serial -> profile via the unique serial index)
+
+    def get_device(self, serial: str) -> Optional[Device]:
+        """
+        Get a registered device by ADB serial
+
+        Args:
+            serial: ADB serial number
+
+        Returns:
+            Device or None
+        """
+        return self.db.query(Device).filter(Device.serial == serial).first()
+
+    def get_profile_id_for_serial(self, serial: str) -> Optional[str]:
+        """
+        Resolve the profile of a device without loading the profile
+
+        Args:
+            serial: ADB serial number
+
+        Returns:
+            Profile ID or None if the device was never connected
+        """
+        return self.db.query(Device.profile_id).filter(Device.serial == serial).scalar()
+
+    def get_profile_ids_for_serials(self, serials: List[str]) -> Dict[str, str]:
+        """
+        Resolve the profiles of many devices with a single IN query
+
+        Args:
+            serials: ADB serial numbers
+
+        Returns:
+            Dict of serial -> profile_id (unknown serials omitted)
+        """
+        unique_serials = set(serials)
+        if not unique_serials:
+            return {}
+
+        rows = (
+            self.db.query(Device.serial, Device.profile_id)
+            .filter(Device.serial.in_(unique_serials))
+            .all()
+        )
+        return {row.serial: row.profile_id for row in rows}
+
+    def list_devices(self, profile_id: Optional[str] = None) -> List[Device]:
+        """
+        List registered devices
+
+        Args:
+            profile_id: Optional filter by profile
+
+        Returns:
+            List of Device instances
+        """
+        query = self.db.query(Device)
+        if profile_id:
+            query = query.filter(Device.profile_id == profile_id)
+        return query.order_by(Device.id).all()
+
+    def record_device_result(
+        self, serial: str, success: bool, error: Optional[str] = None
+    ) -> bool:
+        """
+        Update a device's health counters after a posting (one UPDATE)
+
+        Args:
+            serial: ADB serial number
+            success: Whether the posting succeeded
+            error: Error message or failed step of a failed posting
+
+        Returns:
+            True if a registered device was updated
+        """
+        table = Device.__table__
+        now = datetime.utcnow()
+        if success:
+            values = {
+                "consecutive_failures": 0,
+                "last_success_at": now,
+            }
+        else:
+            values = {
+                "failure_count": func.coalesce(table.c.failure_count, 0) + 1,
+                "consecutive_failures": func.coalesce(table.c.consecutive_failures, 0) + 1,
+                "last_failure_at": now,
+                "last_error": (error or "")[:500] or None,
+            }
+        try:
+            result = self.db.execute(
+                update(table)
+                .where(table.c.serial == serial)
+                .values(
+                    {
+                        **values,
+                        "posting_count": func.coalesce(table.c.posting_count, 0) + 1,
+                        "last_seen_at": now,
+                    }
+                )
+            )
+            self.db.commit()
+            return result.rowcount > 0
+
+        except Exception as e:
+            logger.error(f"Failed to record device result: {e}")
+            self.db.rollback()
+            return False
+
+    def import_legacy_device_ids(self) -> int:
+        """
+        Move serials from the old device_profiles.device_ids JSON column
+        into the devices table
+
+        Databases created before the devices table keep that column; it is
+        read once, cleared, and ignored afterwards.
+
+        Returns:
+            Number of devices imported
+        """
+        columns = inspect(self.db.get_bind()).get_columns(DeviceProfile.__tablename__)
+        if "device_ids" not in {column["name"] for column in columns}:
+            return 0
+
+        try:
+            known = {row.serial for row in self.db.query(Device.serial)}
+            now = datetime.utcnow()
+            rows = []
+            for profile_id, device_ids in self.db.execute(
+                text(
+                    "SELECT profile_id, device_ids FROM device_profiles "
+                    "WHERE device_ids IS NOT NULL"
+                )
+            ):
+                if isinstance(device_ids, str):
+                    device_ids = json.loads(device_ids)
+                for serial in device_ids or []:
+                    if serial not in known:
+                        known.add(serial)
+                        rows.append(
+                            {
+                                "serial": serial,
+                                "profile_id": profile_id,
+                                "first_seen_at": now,
+                                "last_seen_at": now,
+                                "posting_count": 0,
+                                "failure_count": 0,
+                                "consecutive_failures": 0,
+                            }
+                        )
+
+            if rows:
+                self.db.connection().execute(insert(Device.__table__), rows)
+            self.db.execute(text("UPDATE device_profiles SET device_ids = NULL"))
+            self.db.commit()
+            return len(rows)
+
+        except Exception as e:
+            logger.error(f"Failed to import legacy device IDs: {e}")
+            self.db.rollback()
+            return 0
+
+    # Listing (keyset pagination, filters in SQL)
+
+    def _filter_profiles(self, query, filters: Optional[DeviceProfileFilter]):
+        """Apply profile filters to a query"""
+        if filters is None:
+            return query
+        if filters.model is not None:
+            query = query.filter(DeviceProfile.model == filters.model)
+        if filters.calibrated is not None:
+            query = query.filter(DeviceProfile.calibrated.is_(filters.calibrated))
+        if filters.min_confidence is not None:
+            query = query.filter(DeviceProfile.calibration_confidence >= filters.min_confidence)
+        if filters.used_since is not None:
+            query = query.filter(DeviceProfile.last_used_at >= filters.used_since)
+        if filters.used_before is not None:
+            query = query.filter(DeviceProfile.last_used_at < filters.used_before)
+        return query
+
+    def _page(self, query, key, limit: Optional[int], skip: int, cursor: Optional[str]):
+        """
+        Run one keyset page of a query ordered by a unique key
+
+        Returns:
+            Tuple of (rows, next cursor or None on the last page)
+        """
+        after = decode_cursor(cursor)
+        if after is not None:
+            if not isinstance(after, key.type.python_type) or isinstance(after, bool):
+                raise ValueError(f"Invalid cursor: {cursor}")
+            query = query.filter(key > after)
+        query = query.order_by(key)
+        if skip:
+            query = query.offset(skip)
+        if limit is None:
+            return query.all(), None
+
+        # One extra row tells whether there is a next page
+        rows = query.limit(limit + 1).all()
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, encode_cursor(getattr(last, key.key))
+
     def list_profiles(
-        self, skip: int = 0, limit: int = 100
-    ) -> tuple[List[DeviceProfile], int]:
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        filters: Optional[DeviceProfileFilter] = None,
+        include_total: bool = True,
+    ) -> tuple[List[DeviceProfile], Optional[int], Optional[str]]:
+        """
+        List device profiles ordered by profile_id
+
+        Args:
+            skip: Number of records to skip (prefer cursor for deep pages)
+            limit: Maximum records to return
+            cursor: next_cursor of the previous page (None = first page)
+            filters: Optional profile filters
+            include_total: Also count all matching profiles (extra query)
+
+        Returns:
+            Tuple of (profiles list, total count or None, next cursor or None)
+
+        Raises:
+            ValueError: Invalid cursor
+        """
+        query = self._filter_profiles(self.db.query(DeviceProfile), filters)
+        total = query.count() if include_total else None
+        profiles, next_cursor = self._page(query, DeviceProfile.profile_id, limit, skip, cursor)
+        return profiles, total, next_cursor
+
+    # Coordinate Statistics (one grouped aggregate, no per-profile queries)
+
+    def _coordinate_stats_query(self):
+        """Per-profile coordinate aggregates, grouped by profile_id"""
+        return self.db.query(
+            CoordinateConfig.profile_id.label("profile_id"),
+            func.count(CoordinateConfig.id).label("coordinate_count"),
+            func.sum(case((CoordinateConfig.validated.is_(True), 1), else_=0)).label(
+                "validated_count"
+            ),
+            func.sum(
+                case(
+                    (CoordinateConfig.calibration_method != CalibrationMethod.DEFAULT, 1),
+                    else_=0,
+                )
+            ).label("calibrated_count"),
+            func.sum(CoordinateConfig.usage_count).label("usage_count"),
+            func.max(CoordinateConfig.last_used_at).label("last_used_at"),
+        ).group_by(CoordinateConfig.profile_id)
+
+    @staticmethod
+    def _stats_columns(stats) -> list:
+        """Aggregate columns of a stats subquery (NULL when a profile has none)"""
+        return [
+            stats.c.coordinate_count,
+            stats.c.validated_count,
+            stats.c.calibrated_count,
+            stats.c.usage_count,
+            stats.c.last_used_at,
+        ]
+
+    @staticmethod
+    def _stats_from_row(row) -> dict:
+        """Convert an aggregate row (None/NULLs = no coordinates) to response fields"""
+        count = (row.coordinate_count if row is not None else None) or 0
+        calibrated = (row.calibrated_count if row is not None else None) or 0
+        last_used_at = row.last_used_at if row is not None else None
+        return {
+            "coordinate_count": count,
+            "validated_count": (row.validated_count if row is not None else None) or 0,
+            "calibrated_count": calibrated,
+            "calibration_coverage": round(calibrated / count, 4) if count else 0.0,
+            "usage_count": (row.usage_count if row is not None else None) or 0,
+            "coordinates_last_used_at": last_used_at.isoformat() if last_used_at else None,
+        }
+
+    def get_coordinate_stats(self, profile_ids: List[str]) -> Dict[str, dict]:
+        """
+        Coordinate count, calibration coverage and last use for profiles
+
+        Args:
+            profile_ids: Profile IDs
+
+        Returns:
+            Dict of profile_id -> stats (profiles without coordinates included)
         """
-        List all device profiles with pagination
+        unique_ids = set(profile_ids)
+        if not unique_ids:
+            return {}
+
+        rows = (
+            self._coordinate_stats_query()
+            .filter(CoordinateConfig.profile_id.in_(unique_ids))
+            .all()
+        )
+        stats = {row.profile_id: self._stats_from_row(row) for row in rows}
+        for profile_id in unique_ids - stats.keys():
+            stats[profile_id] = self._stats_from_row(None)
+        return stats
+
+    def list_profiles_with_stats(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        filters: Optional[DeviceProfileFilter] = None,
+        include_total: bool = True,
+    ) -> tuple[List[tuple[DeviceProfile, dict]], Optional[int], Optional[str]]:
+        """
+        List profiles with their coordinate stats
+
+        The page is selected first (keyset seek), then stats are aggregated
+        for that page's profiles only, so the cost does not grow with the
+        number of profiles or the page depth.
 
         Args:
-            skip: Number of records to skip
+            skip: Number of records to skip (prefer cursor for deep pages)
             limit: Maximum records to return
+            cursor: next_cursor of the previous page (None = first page)
+            filters: Optional profile filters
+            include_total: Also count all matching profiles (extra query)
 
         Returns:
-            Tuple of (profiles list, total count)
+            Tuple of ([(profile, stats), ...], total count or None, next cursor or None)
+
+        Raises:
+            ValueError: Invalid cursor
+        """
+        profiles, total, next_cursor = self.list_profiles(
+            skip=skip, limit=limit, cursor=cursor, filters=filters, include_total=include_total
+        )
+        stats = self.get_coordinate_stats([profile.profile_id for profile in profiles])
+        return [(profile, stats[profile.profile_id]) for profile in profiles], total, next_cursor
+
+    def get_profile_with_stats(self, profile_id: str) -> Optional[tuple[DeviceProfile, dict]]:
         """
-        total = self.db.query(DeviceProfile).count()
-        profiles = self.db.query(DeviceProfile).offset(skip).limit(limit).all()
-        return profiles, total
+        Get a profile and its coordinate stats in one query
+
+        Args:
+            profile_id: Profile ID
+
+        Returns:
+            (profile, stats) or None
+        """
+        stats = self._coordinate_stats_query().filter(
+            CoordinateConfig.profile_id == profile_id
+        ).subquery()
+        row = (
+            self.db.query(DeviceProfile, *self._stats_columns(stats))
+            .outerjoin(stats, stats.c.profile_id == DeviceProfile.profile_id)
+            .filter(DeviceProfile.profile_id == profile_id)
+            .first()
+        )
+        if row is None:
+            return None
+        return row[0], self._stats_from_row(row)
 
     def update_profile(
         self, profile_id: str, update_data: DeviceProfileUpdate
@@ -240,8 +654,14 @@ class DeviceManager:
             if not profile:
                 return False
 
+            self.db.execute(
+                delete(CoordinateVersion.__table__).where(
+                    CoordinateVersion.profile_id == profile_id
+                )
+            )
             self.db.delete(profile)
             self.db.commit()
+            self.cache.invalidate(profile_id)
 
             logger.info(f"Deleted profile: {profile_id}")
             return True
@@ -275,6 +695,90 @@ class DeviceManager:
 
         return query.all()
 
+    def list_coordinates(
+        self,
+        profile_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        filters: Optional[CoordinateFilter] = None,
+        include_total: bool = True,
+    ) -> tuple[List[CoordinateConfig], Optional[int], Optional[str]]:
+        """
+        List a profile's coordinates ordered by id, filtered in SQL
+
+        Args:
+            profile_id: Profile ID
+            limit: Maximum records to return (None = all)
+            cursor: next_cursor of the previous page (None = first page)
+            filters: Optional coordinate filters
+            include_total: Also count all matching coordinates
+
+        Returns:
+            Tuple of (coordinates, total count or None, next cursor or None)
+
+        Raises:
+            ValueError: Invalid cursor
+        """
+        query = self.db.query(CoordinateConfig).filter(
+            CoordinateConfig.profile_id == profile_id
+        )
+        if filters is not None:
+            if filters.element_type is not None:
+                query = query.filter(
+                    CoordinateConfig.element_type == UIElementType(filters.element_type)
+                )
+            if filters.validated is not None:
+                query = query.filter(CoordinateConfig.validated.is_(filters.validated))
+            if filters.calibrated is not None:
+                calibrated = CoordinateConfig.calibration_method != CalibrationMethod.DEFAULT
+                query = query.filter(calibrated if filters.calibrated else ~calibrated)
+            if filters.min_confidence is not None:
+                query = query.filter(CoordinateConfig.confidence >= filters.min_confidence)
+            if filters.used_since is not None:
+                query = query.filter(CoordinateConfig.last_used_at >= filters.used_since)
+            if filters.used_before is not None:
+                query = query.filter(CoordinateConfig.last_used_at < filters.used_before)
+
+        # A complete first page counts itself
+        total = None
+        if include_total and (limit is not None or cursor):
+            total = query.count()
+        coords, next_cursor = self._page(query, CoordinateConfig.id, limit, 0, cursor)
+        if include_total and total is None:
+            total = len(coords)
+        return coords, total, next_cursor
+
+    def get_cached_coordinates(self, profile_id: str) -> Optional[ProfileCoordinates]:
+        """
+        Immutable coordinate map of a profile, from the cache when possible
+
+        The cached map is checked against the profile's latest coordinate
+        version, so writes made by other API workers are picked up.
+
+        Args:
+            profile_id: Profile ID
+
+        Returns:
+            ProfileCoordinates or None if the profile does not exist
+        """
+
+        def load(profile_id: str, version: int) -> Optional[ProfileCoordinates]:
+            profile = self.get_profile(profile_id)
+            if not profile:
+                return None
+            snapshot = build_snapshot(profile, self.get_coordinates(profile_id), version)
+            logger.info(
+                f"Loaded {len(snapshot.coordinates)} coordinates for {profile_id} (v{version})"
+            )
+            return snapshot
+
+        shared_version = self.db.execute(
+            select(func.max(CoordinateVersion.version)).where(
+                CoordinateVersion.profile_id == profile_id
+            )
+        ).scalar()
+        return self.cache.get_or_load(profile_id, load, shared_version)
+
     def get_coordinate(self, coord_id: int) -> Optional[CoordinateConfig]:
         """Get single coordinate by ID"""
         return (
@@ -296,6 +800,7 @@ class DeviceManager:
             Created CoordinateConfig or None
         """
         try:
+            self._ensure_coordinate_history(coord_data.profile_id)
             coord = CoordinateConfig(
                 profile_id=coord_data.profile_id,
                 element_type=UIElementType(coord_data.element_type),
@@ -312,8 +817,10 @@ class DeviceManager:
                 notes=coord_data.notes,
             )
             self.db.add(coord)
+            self._record_coordinate_version(coord.profile_id, "create")
             self.db.commit()
             self.db.refresh(coord)
+            self.cache.invalidate(coord.profile_id)
 
             logger.info(f"Created coordinate: {coord.element_name} at ({coord.x}, {coord.y})")
             return coord
@@ -340,6 +847,7 @@ class DeviceManager:
             coord = self.get_coordinate(coord_id)
             if not coord:
                 return None
+            self._ensure_coordinate_history(coord.profile_id)
 
             # Update fields
             if update_data.x is not None:
@@ -362,8 +870,10 @@ class DeviceManager:
                 coord.notes = update_data.notes
 
             coord.updated_at = datetime.utcnow()
+            self._record_coordinate_version(coord.profile_id, "update")
             self.db.commit()
             self.db.refresh(coord)
+            self.cache.invalidate(coord.profile_id)
 
             logger.info(f"Updated coordinate: {coord_id}")
             return coord
@@ -373,6 +883,125 @@ class DeviceManager:
             self.db.rollback()
             return None
 
+    def upsert_coordinates(
+        self,
+        profile_id: str,
+        items: List[CoordinateUpsert],
+        prune: bool = False,
+        profile_update: Optional[DeviceProfileUpdate] = None,
+        source: str = "upsert",
+        note: Optional[str] = None,
+    ) -> Optional[List[CoordinateConfig]]:
+        """
+        Write a coordinate set for a profile in one transaction
+
+        Existing elements are updated (only the fields set on the item),
+        new ones inserted, each with one executemany statement per shape.
+
+        Args:
+            profile_id: Profile ID (must exist)
+            items: Coordinates, at most one per element type
+            prune: Delete the profile's elements that are not in items
+            profile_update: Profile fields to update in the same transaction
+            source: What produced the change (recorded in the history)
+            note: Optional note for the history
+
+        Returns:
+            All coordinates of the profile after the write, or None on failure
+        """
+        table = CoordinateConfig.__table__
+        now = datetime.utcnow()
+        try:
+            self._ensure_coordinate_history(profile_id)
+
+            existing: Dict[UIElementType, int] = {}
+            for row in self.db.execute(
+                select(table.c.id, table.c.element_type)
+                .where(table.c.profile_id == profile_id)
+                .order_by(table.c.id)
+            ):
+                existing.setdefault(row.element_type, row.id)
+
+            inserts = []
+            updates: Dict[tuple, List[dict]] = {}  # field set -> parameter rows
+            for item in items:
+                element_type = UIElementType(item.element_type)
+                fields = item.model_dump(exclude_unset=True, exclude={"element_type"})
+                if fields.get("element_name") is None:
+                    fields.pop("element_name", None)
+                if "calibration_method" in fields:
+                    fields["calibration_method"] = CalibrationMethod(fields["calibration_method"])
+
+                if element_type in existing:
+                    params = {f"b_{name}": value for name, value in fields.items()}
+                    params["b_id"] = existing[element_type]
+                    updates.setdefault(tuple(sorted(fields)), []).append(params)
+                else:
+                    values = item.model_dump(exclude={"element_type"})
+                    values.update(
+                        profile_id=profile_id,
+                        element_type=element_type,
+                        element_name=item.element_name or element_type.value,
+                        calibration_method=CalibrationMethod(item.calibration_method),
+                        calibrated_at=now,
+                        created_at=now,
+                        updated_at=now,
+                        usage_count=0,
+                        success_count=0,
+                        fail_count=0,
+                    )
+                    inserts.append(values)
+
+            for names, params in updates.items():
+                stmt = (
+                    update(table)
+                    .where(table.c.id == bindparam("b_id"))
+                    .values(
+                        {
+                            **{name: bindparam(f"b_{name}") for name in names},
+                            "calibrated_at": now,
+                            "updated_at": now,
+                        }
+                    )
+                )
+                self.db.connection().execute(stmt, params)
+
+            if inserts:
+                self.db.connection().execute(insert(table), inserts)
+
+            if prune:
+                keep = [UIElementType(item.element_type) for item in items]
+                self.db.execute(
+                    delete(table).where(
+                        table.c.profile_id == profile_id,
+                        table.c.element_type.not_in(keep),
+                    )
+                )
+
+            if profile_update is not None:
+                values = profile_update.model_dump(exclude_none=True)
+                self.db.execute(
+                    update(DeviceProfile.__table__)
+                    .where(DeviceProfile.profile_id == profile_id)
+                    .values(**values, updated_at=now)
+                )
+
+            self._record_coordinate_version(profile_id, source, note=note)
+            self.db.commit()
+            self.cache.invalidate(profile_id)
+            self.db.expire_all()
+
+            logger.info(
+                f"Upserted coordinates for {profile_id}: "
+                f"{sum(len(p) for p in updates.values())} updated, {len(inserts)} created"
+            )
+            return self.get_coordinates(profile_id)
+
+        except Exception as e:
+            logger.error(f"Failed to upsert coordinates: {e}")
+            self.db.rollback()
+            return None
+
     def delete_coordinate(self, coord_id: int) -> bool:
         """
         Delete coordinate configuration
@@ -388,8 +1017,12 @@ class DeviceManager:
             if not coord:
                 return False
 
+            profile_id = coord.profile_id
+            self._ensure_coordinate_history(profile_id)
             self.db.delete(coord)
+            self._record_coordinate_version(profile_id, "delete")
             self.db.commit()
+            self.cache.invalidate(profile_id)
 
             logger.info(f"Deleted coordinate: {coord_id}")
             return True
@@ -398,3 +1031,402 @@ class DeviceManager:
             logger.error(f"Failed to delete coordinate: {e}")
             self.db.rollback()
             return False
+
+
+    # Coordinate History (append-only versions, see coordinate_history.py)
+
+    def _insert_coordinate_version(
+        self,
+        profile_id: str,
+        version: int,
+        keyframe: bool,
+        data: dict,
+        element_count: int,
+        source: str,
+        note: Optional[str] = None,
+    ):
+        self.db.execute(
+            insert(CoordinateVersion.__table__).values(
+                profile_id=profile_id,
+                version=version,
+                keyframe=keyframe,
+                data=data,
+                element_count=element_count,
+                source=source,
+                note=note,
+                created_at=datetime.utcnow(),
+            )
+        )
+
+    def _live_coordinate_state(self, profile_id: str) -> CoordinateState:
+        """Encoded coordinate set currently in coordinate_configs"""
+        table = CoordinateConfig.__table__
+        return encode_state(
+            self.db.execute(
+                select(
+                    table.c.element_type,
+                    table.c.x,
+                    table.c.y,
+                    table.c.confidence,
+                    table.c.validated,
+                    table.c.calibration_method,
+                    table.c.touch_radius,
+                ).where(table.c.profile_id == profile_id)
+            )
+        )
+
+    def _load_coordinate_version(
+        self, profile_id: str, version: Optional[int] = None
+    ) -> Optional[tuple[int, CoordinateState]]:
+        """
+        Rebuild a version of a profile's coordinate set
+
+        Reads the nearest keyframe at or before the version and the deltas
+        after it (at most COORDINATE_HISTORY_KEYFRAME_INTERVAL rows).
+
+        Args:
+            profile_id: Profile ID
+            version: Version to rebuild (None = latest)
+
+        Returns:
+            (version, coordinate set) or None if the version does not exist
+        """
+        keyframe = select(func.max(CoordinateVersion.version)).where(
+            CoordinateVersion.profile_id == profile_id,
+            CoordinateVersion.keyframe.is_(True),
+        )
+        query = self.db.query(
+            CoordinateVersion.version, CoordinateVersion.keyframe, CoordinateVersion.data
+        ).filter(CoordinateVersion.profile_id == profile_id)
+        if version is not None:
+            keyframe = keyframe.where(CoordinateVersion.version <= version)
+            query = query.filter(CoordinateVersion.version <= version)
+
+        rows = (
+            query.filter(CoordinateVersion.version >= keyframe.scalar_subquery())
+            .order_by(CoordinateVersion.version)
+            .all()
+        )
+        if not rows or (version is not None and rows[-1].version != version):
+            return None
+        return rows[-1].version, rebuild_state([(row.keyframe, row.data) for row in rows])
+
+    def _record_coordinate_version(
+        self, profile_id: str, source: str, note: Optional[str] = None
+    ) -> int:
+        """
+        Append the profile's live coordinate set to its history
+
+        Runs in the caller's transaction, after its changes; nothing is
+        appended if the set did not change.
+
+        Returns:
+            Version of the live set
+        """
+        self.db.flush()
+        state = self._live_coordinate_state(profile_id)
+        head = self._load_coordinate_version(profile_id)
+        if head is None:
+            version, keyframe, data = 1, True, state
+        else:
+            version, previous = head
+            data = diff_states(previous, state)
+            if not data:
+                return version
+            version += 1
+            interval = max(1, settings.COORDINATE_HISTORY_KEYFRAME_INTERVAL)
+            keyframe = (version - 1) % interval == 0
+            if keyframe:
+                data = state
+
+        self._insert_coordinate_version(
+            profile_id, version, keyframe, data, len(state), source, note
+        )
+        return version
+
+    def _ensure_coordinate_history(self, profile_id: str):
+        """
+        Record the current set as the first version of a profile without
+        history (created before versioning), so it can be restored
+        """
+        exists = (
+            self.db.query(CoordinateVersion.id)
+            .filter(CoordinateVersion.profile_id == profile_id)
+            .first()
+        )
+        if exists is None:
+            self._record_coordinate_version(profile_id, "baseline")
+
+    def get_coordinate_versions(
+        self, profile_id: str, limit: int = 50
+    ) -> List[CoordinateVersion]:
+        """
+        List a profile's coordinate versions, newest first
+
+        Args:
+            profile_id: Profile ID
+            limit: Maximum versions to return
+
+        Returns:
+            List of CoordinateVersion instances
+        """
+        return (
+            self.db.query(CoordinateVersion)
+            .filter(CoordinateVersion.profile_id == profile_id)
+            .order_by(CoordinateVersion.version.desc())
+            .limit(limit)
+            .all()
+        )
+
+    def get_coordinate_version(self, profile_id: str, version: int) -> Optional[List[dict]]:
+        """
+        Coordinate set of a version
+
+        Args:
+            profile_id: Profile ID
+            version: Version number
+
+        Returns:
+            List of coordinate field dicts, or None if the version does not exist
+        """
+        loaded = self._load_coordinate_version(profile_id, version)
+        if loaded is None:
+            return None
+        return [decode_entry(element, entry) for element, entry in sorted(loaded[1].items())]
+
+    def activate_coordinate_version(
+        self, profile_id: str, version: int
+    ) -> Optional[List[CoordinateConfig]]:
+        """
+        Make a prior version the live coordinate set (rollback)
+
+        The version is rebuilt from history and written with one
+        upsert_coordinates(prune=True) transaction, which appends it as a
+        new version and invalidates the coordinate cache. Usage statistics
+        of elements present in both sets are kept.
+
+        Args:
+            profile_id: Profile ID
+            version: Version to activate
+
+        Returns:
+            All coordinates of the profile after the rollback, or None if
+            the version does not exist or the write failed
+        """
+        coordinates = self.get_coordinate_version(profile_id, version)
+        if coordinates is None:
+            return None
+
+        items = [CoordinateUpsert(**fields) for fields in coordinates]
+        coords = self.upsert_coordinates(
+            profile_id, items, prune=True, source="rollback", note=f"Restored version {version}"
+        )
+        if coords is not None:
+            logger.info(f"Activated coordinate version {version} for {profile_id}")
+        return coords
+
+
+class AsyncDeviceManager:
+    """
+    Async variant of DeviceManager for FastAPI endpoints
+
+    Runs the DeviceManager operations on an AsyncSession via run_sync: the
+    ORM logic is shared, while the database round trips are awaited
+    (aiosqlite) instead of blocking the event loop. Device discovery talks
+    to ADB and runs in a worker thread.
+    """
+
+    def __init__(self, db: AsyncSession):
+        """
+        Initialize async device manager
+
+        Args:
+            db: SQLAlchemy async database session
+        """
+        self.db = db
+
+    async def _run(self, method: str, *args, **kwargs):
+        def call(session: Session):
+            return getattr(DeviceManager(session), method)(*args, **kwargs)
+
+        return await self.db.run_sync(call)
+
+    async def scan_devices(self) -> List[dict]:
+        """See DeviceManager.scan_devices"""
+        return await asyncio.to_thread(DeviceManager(None).scan_devices)
+
+    async def get_or_create_profile(self, device_info: dict) -> DeviceProfile:
+        """See DeviceManager.get_or_create_profile"""
+        return await self._run("get_or_create_profile", device_info)
+
+    async def get_profile(self, profile_id: str) -> Optional[DeviceProfile]:
+        """See DeviceManager.get_profile"""
+        return await self._run("get_profile", profile_id)
+
+    async def get_existing_profile_ids(self, profile_ids: List[str]) -> set[str]:
+        """See DeviceManager.get_existing_profile_ids"""
+        return await self._run("get_existing_profile_ids", profile_ids)
+
+    async def get_device(self, serial: str) -> Optional[Device]:
+        """See DeviceManager.get_device"""
+        return await self._run("get_device", serial)
+
+    async def get_profile_id_for_serial(self, serial: str) -> Optional[str]:
+        """See DeviceManager.get_profile_id_for_serial"""
+        return await self._run("get_profile_id_for_serial", serial)
+
+    async def get_profile_ids_for_serials(self, serials: List[str]) -> Dict[str, str]:
+        """See DeviceManager.get_profile_ids_for_serials"""
+        return await self._run("get_profile_ids_for_serials", serials)
+
+    async def list_devices(self, profile_id: Optional[str] = None) -> List[Device]:
+        """See DeviceManager.list_devices"""
+        return await self._run("list_devices", profile_id=profile_id)
+
+    async def record_device_result(
+        self, serial: str, success: bool, error: Optional[str] = None
+    ) -> bool:
+        """See DeviceManager.record_device_result"""
+        return await self._run("record_device_result", serial, success, error=error)
+
+    async def list_profiles(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        filters: Optional[DeviceProfileFilter] = None,
+        include_total: bool = True,
+    ) -> tuple[List[DeviceProfile], Optional[int], Optional[str]]:
+        """See DeviceManager.list_profiles"""
+        return await self._run(
+            "list_profiles",
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            filters=filters,
+            include_total=include_total,
+        )
+
+    async def get_coordinate_stats(self, profile_ids: List[str]) -> Dict[str, dict]:
+        """See DeviceManager.get_coordinate_stats"""
+        return await self._run("get_coordinate_stats", profile_ids)
+
+    async def list_profiles_with_stats(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        filters: Optional[DeviceProfileFilter] = None,
+        include_total: bool = True,
+    ) -> tuple[List[tuple[DeviceProfile, dict]], Optional[int], Optional[str]]:
+        """See DeviceManager.list_profiles_with_stats"""
+        return await self._run(
+            "list_profiles_with_stats",
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            filters=filters,
+            include_total=include_total,
+        )
+
+    async def get_profile_with_stats(
+        self, profile_id: str
+    ) -> Optional[tuple[DeviceProfile, dict]]:
+        """See DeviceManager.get_profile_with_stats"""
+        return await self._run("get_profile_with_stats", profile_id)
+
+    async def update_profile(
+        self, profile_id: str, update_data: DeviceProfileUpdate
+    ) -> Optional[DeviceProfile]:
+        """See DeviceManager.update_profile"""
+        return await self._run("update_profile", profile_id, update_data)
+
+    async def delete_profile(self, profile_id: str) -> bool:
+        """See DeviceManager.delete_profile"""
+        return await self._run("delete_profile", profile_id)
+
+    async def get_coordinates(
+        self, profile_id: str, element_type: Optional[UIElementType] = None
+    ) -> List[CoordinateConfig]:
+        """See DeviceManager.get_coordinates"""
+        return await self._run("get_coordinates", profile_id, element_type=element_type)
+
+    async def list_coordinates(
+        self,
+        profile_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        filters: Optional[CoordinateFilter] = None,
+        include_total: bool = True,
+    ) -> tuple[List[CoordinateConfig], Optional[int], Optional[str]]:
+        """See DeviceManager.list_coordinates"""
+        return await self._run(
+            "list_coordinates",
+            profile_id,
+            limit=limit,
+            cursor=cursor,
+            filters=filters,
+            include_total=include_total,
+        )
+
+    async def get_cached_coordinates(self, profile_id: str) -> Optional[ProfileCoordinates]:
+        """See DeviceManager.get_cached_coordinates"""
+        return await self._run("get_cached_coordinates", profile_id)
+
+    async def get_coordinate(self, coord_id: int) -> Optional[CoordinateConfig]:
+        """See DeviceManager.get_coordinate"""
+        return await self._run("get_coordinate", coord_id)
+
+    async def create_coordinate(
+        self, coord_data: CoordinateCreate
+    ) -> Optional[CoordinateConfig]:
+        """See DeviceManager.create_coordinate"""
+        return await self._run("create_coordinate", coord_data)
+
+    async def update_coordinate(
+        self, coord_id: int, update_data: CoordinateUpdate
+    ) -> Optional[CoordinateConfig]:
+        """See DeviceManager.update_coordinate"""
+        return await self._run("update_coordinate", coord_id, update_data)
+
+    async def upsert_coordinates(
+        self,
+        profile_id: str,
+        items: List[CoordinateUpsert],
+        prune: bool = False,
+        profile_update: Optional[DeviceProfileUpdate] = None,
+        source: str = "upsert",
+        note: Optional[str] = None,
+    ) -> Optional[List[CoordinateConfig]]:
+        """See DeviceManager.upsert_coordinates"""
+        return await self._run(
+            "upsert_coordinates",
+            profile_id,
+            items,
+            prune=prune,
+            profile_update=profile_update,
+            source=source,
+            note=note,
+        )
+
+    async def delete_coordinate(self, coord_id: int) -> bool:
+        """See DeviceManager.delete_coordinate"""
+        return await self._run("delete_coordinate", coord_id)
+
+    async def get_coordinate_versions(
+        self, profile_id: str, limit: int = 50
+    ) -> List[CoordinateVersion]:
+        """See DeviceManager.get_coordinate_versions"""
+        return await self._run("get_coordinate_versions", profile_id, limit=limit)
+
+    async def get_coordinate_version(
+        self, profile_id: str, version: int
+    ) -> Optional[List[dict]]:
+        """See DeviceManager.get_coordinate_version"""
+        return await self._run("get_coordinate_version", profile_id, version)
+
+    async def activate_coordinate_version(
+        self, profile_id: str, version: int
+    ) -> Optional[List[CoordinateConfig]]:
+        """See DeviceManager.activate_coordinate_version"""
+        return await self._run("activate_coordinate_version", profile_id, version)
@@ -0,0 +1,273 @@
+"""
+Device Readiness - Keep each phone staged on the Naver Blog main screen
+
+Every posting starts by tapping MAIN_PLUS_BUTTON, so it needs the blog app
+in the foreground on its main screen. Instead of a cold start around each
+run, the readiness manager:
+- checks the state cheaply (focused window, then an 8x8 screen hash
+  compared with the reference captured on the main screen)
+- re-stages warm first (BACK presses inside the app), cold only as a
+  fallback (force-stop + launch)
+- is run in the background by the job manager after every post, so the
+  next job finds the phone ready
+
+The reference hash is only taken from a settled main screen: the focused
+window must be the main activity (the app package when
+NAVER_BLOG_MAIN_ACTIVITY is unset) and two hashes taken
+READINESS_SETTLE_DELAY apart must agree, so a splash screen or dialog
+shown right after launch is never stored. Every cold start re-captures it.
+With NAVER_BLOG_MAIN_ACTIVITY set, a device without a reference (e.g.
+after an API restart) is still staged warm and captures the reference once
+the main activity has focus.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+import enum
+import threading
+import time
+
+from loguru import logger
+
+from app.core.config import settings
+from app.services.adb_controller import ADBController
+from app.services.cancellation import OperationCancelled
+from app.services.device_backend import hash_distance
+
+KEYCODE_BACK = 4
+
+
+class ReadinessState(str, enum.Enum):
+    """Staging state of a device"""
+
+    UNKNOWN = "unknown"
+    READY = "ready"  # on the app main screen, untouched since the check
+    BUSY = "busy"  # a posting is using the device
+    STAGING = "staging"
+    FAILED = "failed"
+
+
+@dataclass
+class DeviceReadiness:
+    """Readiness bookkeeping for one device"""
+
+    device_id: str
+    state: ReadinessState = ReadinessState.UNKNOWN
+    reference_hash: Optional[int] = None  # screen hash of the main screen
+    last_checked_at: Optional[datetime] = None
+    last_staged_at: Optional[datetime] = None
+    warm_restages: int = 0
+    cold_starts: int = 0
+    last_error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "device_id": self.device_id,
+            "state": self.state.value,
+            "has_reference": self.reference_hash is not None,
+            "last_checked_at": self.last_checked_at.isoformat() if self.last_checked_at else None,
+            "last_staged_at": self.last_staged_at.isoformat() if self.last_staged_at else None,
+            "warm_restages": self.warm_restages,
+            "cold_starts": self.cold_starts,
+            "last_error": self.last_error,
+        }
+
+
+class DeviceReadinessManager:
+    """
+    Stages devices on the blog app main screen and tracks their readiness
+
+    Staging talks to the device synchronously; callers run it off the
+    event loop (the job manager uses a thread executor).
+    """
+
+    def __init__(
+        self,
+        package: str = settings.NAVER_BLOG_PACKAGE,
+        main_activity: Optional[str] = settings.NAVER_BLOG_MAIN_ACTIVITY,
+    ):
+        """
+        Initialize readiness manager
+
+        Args:
+            package: App package that must be in the foreground
+            main_activity: Activity of the main screen (None = package only)
+        """
+        self.package = package
+        self.main_activity = main_activity
+        self._devices: Dict[str, DeviceReadiness] = {}
+        self._lock = threading.Lock()
+
+    def get(self, device_id: str) -> DeviceReadiness:
+        """Get (or create) the readiness record of a device"""
+        with self._lock:
+            if device_id not in self._devices:
+                self._devices[device_id] = DeviceReadiness(device_id=device_id)
+            return self._devices[device_id]
+
+    def snapshot(self) -> List[dict]:
+        """Readiness of all known devices"""
+        with self._lock:
+            return [record.to_dict() for record in self._devices.values()]
+
+    def mark_busy(self, device_id: str):
+        """A posting started touching the device"""
+        self.get(device_id).state = ReadinessState.BUSY
+
+    # Checks
+
+    def in_foreground(self, adb: ADBController) -> bool:
+        """Cheap check: blog app (main activity if configured) has focus"""
+        focus = adb.get_current_activity()
+        if self.package not in focus:
+            return False
+        return self.main_activity is None or self.main_activity in focus
+
+    def on_main_screen(self, adb: ADBController, record: DeviceReadiness) -> bool:
+        """
+        Foreground check plus screen hash against the main screen reference
+
+        Without a reference the main activity having focus identifies the
+        main screen, and its settled hash becomes the reference; without a
+        main activity either, the screen is unknown.
+        """
+        if not self.in_foreground(adb):
+            return False
+        if settings.READINESS_SCREEN_TOLERANCE < 0:
+            return True
+        if record.reference_hash is None:
+            return self.main_activity is not None and self._capture_reference(adb, record)
+        current = adb.screen_hash()
+        return hash_distance(current, record.reference_hash) <= settings.READINESS_SCREEN_TOLERANCE
+
+    def _settled_hash(self, adb: ADBController) -> Optional[int]:
+        """Screen hash if two samples READINESS_SETTLE_DELAY apart agree"""
+        first = adb.screen_hash()
+        adb.sleep(settings.READINESS_SETTLE_DELAY)
+        second = adb.screen_hash()
+        if hash_distance(first, second) > settings.READINESS_SCREEN_TOLERANCE:
+            return None
+        return second
+
+    def _capture_reference(self, adb: ADBController, record: DeviceReadiness) -> bool:
+        """Store the settled main screen hash (caller checked the foreground)"""
+        current = self._settled_hash(adb)
+        if current is None:
+            return False
+        if record.reference_hash is not None and (
+            hash_distance(current, record.reference_hash) > settings.READINESS_SCREEN_TOLERANCE
+        ):
+            logger.info(f"Main screen of {adb.device_id} changed, replacing its reference")
+        record.reference_hash = current
+        return True
+
+    def _wait_for_main_screen(self, adb: ADBController, record: DeviceReadiness) -> bool:
+        """After a launch, wait up to READINESS_LAUNCH_WAIT for a settled main screen"""
+        deadline = time.monotonic() + settings.READINESS_LAUNCH_WAIT
+        while True:
+            adb.sleep(settings.READINESS_SETTLE_DELAY)
+            if self.in_foreground(adb) and (
+                settings.READINESS_SCREEN_TOLERANCE < 0 or self._capture_reference(adb, record)
+            ):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+
+    def ensure_ready(self, adb: ADBController) -> bool:
+        """
+        Make sure a job can start from the main screen (called at job start)
+
+        A device staged after its previous post only needs the foreground
+        check; anything else is staged now.
+
+        Args:
+            adb: Connected controller of the device
+
+        Returns:
+            True if the device is on the main screen
+        """
+        record = self.get(adb.device_id)
+        if record.state == ReadinessState.READY and self.in_foreground(adb):
+            record.last_checked_at = datetime.utcnow()
+            return True
+        return self.stage(adb)
+
+    # Staging
+
+    def stage(self, adb: ADBController) -> bool:
+        """
+        Bring the device to the blog app main screen
+
+        Args:
+            adb: Controller of the device
+
+        Returns:
+            True if the device is ready
+        """
+        record = self.get(adb.device_id)
+        record.state = ReadinessState.STAGING
+        try:
+            if self.on_main_screen(adb, record):
+                return self._ready(record)
+
+            # Warm: back out of editor/share screens inside the app
+            warm_presses = settings.READINESS_MAX_BACK_PRESSES
+            if (
+                record.reference_hash is None
+                and self.main_activity is None
+                and settings.READINESS_SCREEN_TOLERANCE >= 0
+            ):
+                warm_presses = 0
+            for _ in range(warm_presses):
+                if self.package not in adb.get_current_activity():
+                    break
+                adb.key_event(KEYCODE_BACK)
+                adb.sleep(settings.READINESS_BACK_DELAY)
+                if self.on_main_screen(adb, record):
+                    record.warm_restages += 1
+                    return self._ready(record)
+
+            # Cold: restart the app on its main screen
+            logger.info(f"Cold-starting {self.package} on {adb.device_id}")
+            adb.stop_app(self.package)
+            adb.launch_app(self.package)
+            record.cold_starts += 1
+
+            if not self._wait_for_main_screen(adb, record):
+                raise RuntimeError(f"{self.package} main screen did not settle after launch")
+            return self._ready(record)
+
+        except OperationCancelled:
+            record.state = ReadinessState.UNKNOWN
+            raise
+        except Exception as e:
+            logger.error(f"Failed to stage {adb.device_id}: {e}")
+            record.state = ReadinessState.FAILED
+            record.last_error = str(e)
+            return False
+
+    def stage_device(self, device_id: str) -> bool:
+        """Stage a device by serial (background use)"""
+        adb = ADBController(device_id)
+        if not adb.connect():
+            record = self.get(device_id)
+            record.state = ReadinessState.FAILED
+            record.last_error = "Failed to connect to device"
+            return False
+        return self.stage(adb)
+
+    def _ready(self, record: DeviceReadiness) -> bool:
+        record.state = ReadinessState.READY
+        record.last_error = None
+        record.last_checked_at = record.last_staged_at = datetime.utcnow()
+        logger.debug(f"Device {record.device_id} staged on the main screen")
+        return True
+
+
+# Global readiness manager
+_readiness_manager = DeviceReadinessManager()
+
+
+def get_readiness_manager() -> DeviceReadinessManager:
+    """Get the global device readiness manager"""
+    return _readiness_manager
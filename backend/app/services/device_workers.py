@@ -0,0 +1,392 @@
+"""
+Device Workers - Supervised worker processes that own the ADB connections
+
+With DEVICE_WORKER_MODE=process every device (or group of
+DEVICE_WORKER_GROUP_SIZE devices) is served by its own worker process:
+- the worker opens the device locally and runs its calls on a thread per
+  device, so screencap decoding, PNG encoding and screen hashing use the
+  worker's core instead of competing for the API process's GIL
+- the API process talks to it over a local pipe through RemoteDeviceBackend
+- a crashed worker fails its in-flight calls (AdbError, so the posting
+  retry path applies) and is respawned after DEVICE_WORKER_RESTART_DELAY
+- replies that cannot be pickled or unpickled fail only their own call, and
+  a call whose reply does not arrive within its command timeout (ADB_TIMEOUT
+  when the method has none, plus the file's transfer time at
+  DEVICE_PUSH_MIN_BYTES_PER_SECOND for pushes) plus
+  DEVICE_CALL_GRACE_SECONDS fails too, so a caller never waits on the pipe
+  forever
+
+Everything above DeviceBackend (ADBController, automator, job manager) is
+unchanged; only open_device() returns a proxy.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Dict, List, Optional
+import itertools
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+
+from adbutils import AdbError
+from loguru import logger
+from PIL import Image
+
+from app.core.config import settings
+from app.services.device_backend import DeviceBackend
+
+# Set in worker processes, where open_device() must open devices locally
+_in_worker = False
+
+
+def in_worker_process() -> bool:
+    """True inside a device worker process"""
+    return _in_worker
+
+
+def _worker_main(conn, worker_index: int):
+    """
+    Worker process loop
+
+    Requests are (request_id, serial, method, args, kwargs); a None request
+    shuts the worker down. Replies are (request_id, ok, pickled
+    result_or_error), the payload pickled separately so the API process can
+    fail just that call if it cannot be unpickled.
+    """
+    global _in_worker
+    _in_worker = True
+
+    from app.services.device_backend import open_local_device
+
+    devices: Dict[str, DeviceBackend] = {}
+    threads: Dict[str, ThreadPoolExecutor] = {}
+    send_lock = threading.Lock()
+
+    def reply(request_id: int, ok: bool, payload: Any):
+        try:
+            data = pickle.dumps(payload)
+        except Exception as e:
+            # Unpicklable result or exception (lambda, local class, open handle...)
+            ok = False
+            data = pickle.dumps(
+                AdbError(f"Unpicklable {type(payload).__name__} ({e}): {repr(payload)[:200]}")
+            )
+        with send_lock:
+            conn.send((request_id, ok, data))
+
+    def handle(request_id: int, serial: str, method: str, args: tuple, kwargs: dict):
+        try:
+            device = devices.get(serial)
+            if device is None:
+                device = devices[serial] = open_local_device(serial)
+            reply(request_id, True, getattr(device, method)(*args, **kwargs))
+        except Exception as e:
+            reply(request_id, False, e)
+
+    try:
+        while True:
+            request = conn.recv()
+            if request is None:
+                break
+            serial = request[1]
+            if serial not in threads:
+                threads[serial] = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix=f"worker{worker_index}-{serial}"
+                )
+            threads[serial].submit(handle, *request)
+    except (EOFError, OSError, KeyboardInterrupt):
+        pass  # API process went away
+    finally:
+        for executor in threads.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class WorkerHandle:
+    """
+    API-side handle of one worker process
+    """
+
+    def __init__(self, index: int, on_exit):
+        """
+        Start a worker process
+
+        Args:
+            index: Worker slot
+            on_exit: Called with this handle when the worker's pipe closes
+        """
+        # spawn: forking a process that runs threads and an event loop is unsafe
+        context = multiprocessing.get_context("spawn")
+        self.index = index
+        self._conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, index),
+            name=f"device-worker-{index}",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+        self.started_at = time.time()
+        self.calls = 0
+        self.alive = True
+        self._on_exit = on_exit
+        self._ids = itertools.count()
+        self._pending: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(
+            target=self._read, name=f"device-worker-{index}-reader", daemon=True
+        )
+        self._reader.start()
+        logger.info(f"Started device worker {index} (pid {self.process.pid})")
+
+    def call(
+        self,
+        serial: str,
+        method: str,
+        *args,
+        reply_timeout: Optional[float] = None,
+        **kwargs,
+    ) -> Any:
+        """
+        Run a backend method of a device in the worker (blocking)
+
+        Args:
+            serial: Device serial
+            method: DeviceBackend method name
+            *args: Positional arguments for the method
+            reply_timeout: Seconds to wait for the reply (None = forever)
+            **kwargs: Keyword arguments for the method
+
+        Raises:
+            AdbError: The worker is down, crashed during the call or did not
+                reply in time
+            Exception: Whatever the backend method raised
+        """
+        future: Future = Future()
+        with self._lock:
+            if not self.alive:
+                raise AdbError(f"Device worker {self.index} is not running")
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+            self.calls += 1
+            try:
+                self._conn.send((request_id, serial, method, args, kwargs))
+            except (OSError, ValueError) as e:
+                del self._pending[request_id]
+                raise AdbError(f"Device worker {self.index} unreachable: {e}")
+        try:
+            return future.result(reply_timeout)
+        except FutureTimeout:
+            # A late reply finds no pending future and is dropped
+            with self._lock:
+                self._pending.pop(request_id, None)
+            raise AdbError(
+                f"Device worker {self.index} did not answer {method} on {serial} "
+                f"within {reply_timeout:.1f}s"
+            )
+
+    def stop(self, timeout: float = 2.0):
+        """Ask the worker to exit, terminating it if it does not"""
+        with self._lock:
+            self.alive = False
+            try:
+                self._conn.send(None)
+            except (OSError, ValueError):
+                pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+        self._conn.close()
+
+    def to_dict(self) -> dict:
+        return {
+            "worker": self.index,
+            "pid": self.process.pid,
+            "alive": self.alive and self.process.is_alive(),
+            "started_at": self.started_at,
+            "calls": self.calls,
+            "pending": len(self._pending),
+        }
+
+    def _read(self):
+        try:
+            while True:
+                request_id, ok, data = self._conn.recv()
+                with self._lock:
+                    future = self._pending.pop(request_id, None)
+                if future is None:
+                    continue
+                try:
+                    payload = pickle.loads(data)
+                except Exception as e:
+                    logger.error(f"Undecodable reply from device worker {self.index}: {e}")
+                    ok, payload = False, AdbError(f"Undecodable device worker reply: {e}")
+                if ok:
+                    future.set_result(payload)
+                else:
+                    future.set_exception(payload)
+        except (EOFError, OSError):
+            pass
+
+        with self._lock:
+            crashed = self.alive
+            self.alive = False
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for future in pending:
+            future.set_exception(AdbError(f"Device worker {self.index} crashed"))
+        if crashed:
+            self._on_exit(self)
+
+
+class RemoteDeviceBackend(DeviceBackend):
+    """
+    DeviceBackend proxy forwarding every call to the device's worker process
+    """
+
+    def __init__(self, serial: str, supervisor: "DeviceWorkerSupervisor"):
+        self.serial = serial
+        self._supervisor = supervisor
+
+    def _call(
+        self,
+        method: str,
+        *args,
+        timeout: Optional[float] = None,
+        reply_timeout: Optional[float] = None,
+        **kwargs,
+    ) -> Any:
+        # The command timeout was already clamped to the step/job budget by
+        # ADBController; methods without one get ADB_TIMEOUT unless the
+        # caller sized the reply timeout itself
+        if reply_timeout is None:
+            reply_timeout = (
+                timeout if timeout is not None else settings.ADB_TIMEOUT
+            ) + settings.DEVICE_CALL_GRACE_SECONDS
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        # Resolved per call, so a respawned worker is picked up transparently
+        return self._supervisor.worker_for(self.serial).call(
+            self.serial, method, *args, reply_timeout=reply_timeout, **kwargs
+        )
+
+    def shell(self, command: str, timeout: Optional[float] = None) -> str:
+        return self._call("shell", command, timeout=timeout)
+
+    def screenshot(self) -> Image.Image:
+        return self._call("screenshot")
+
+    def push(self, local_path: str, remote_path: str):
+        # Transfer time grows with the file: allow it at the slowest expected link
+        try:
+            transfer = os.path.getsize(local_path) / settings.DEVICE_PUSH_MIN_BYTES_PER_SECOND
+        except OSError:
+            transfer = 0.0  # the worker reports the missing file
+        return self._call(
+            "push",
+            local_path,
+            remote_path,
+            reply_timeout=settings.ADB_TIMEOUT + transfer + settings.DEVICE_CALL_GRACE_SECONDS,
+        )
+
+    def screenshot_png(self) -> bytes:
+        return self._call("screenshot_png")
+
+    def screen_hash(self) -> int:
+        return self._call("screen_hash")
+
+
+class DeviceWorkerSupervisor:
+    """
+    Assigns devices to worker processes and keeps the workers running
+    """
+
+    def __init__(
+        self,
+        group_size: int = settings.DEVICE_WORKER_GROUP_SIZE,
+        restart_delay: float = settings.DEVICE_WORKER_RESTART_DELAY,
+    ):
+        """
+        Initialize supervisor
+
+        Args:
+            group_size: Devices served by one worker process
+            restart_delay: Seconds before respawning a crashed worker
+        """
+        self.group_size = max(1, group_size)
+        self.restart_delay = restart_delay
+        self._assignments: Dict[str, int] = {}  # serial -> worker slot
+        self._workers: Dict[int, WorkerHandle] = {}
+        self._restarts: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._stopping = False
+
+    def open(self, serial: str) -> RemoteDeviceBackend:
+        """Get a proxy backend for a device (assigning it a worker)"""
+        with self._lock:
+            if serial not in self._assignments:
+                # Groups fill in first-seen order
+                self._assignments[serial] = len(self._assignments) // self.group_size
+        return RemoteDeviceBackend(serial, self)
+
+    def worker_for(self, serial: str) -> WorkerHandle:
+        """Get the running worker of a device, starting it if needed"""
+        with self._lock:
+            if self._stopping:
+                raise AdbError("Device workers are shutting down")
+            index = self._assignments.setdefault(
+                serial, len(self._assignments) // self.group_size
+            )
+            worker = self._workers.get(index)
+            if worker is None or not worker.alive:
+                worker = self._workers[index] = WorkerHandle(index, self._worker_exited)
+            return worker
+
+    def snapshot(self) -> List[dict]:
+        """State of all worker processes and their devices"""
+        with self._lock:
+            workers = []
+            for index, worker in sorted(self._workers.items()):
+                data = worker.to_dict()
+                data["devices"] = [s for s, i in self._assignments.items() if i == index]
+                data["restarts"] = self._restarts.get(index, 0)
+                workers.append(data)
+            return workers
+
+    def shutdown(self):
+        """Stop all workers (application shutdown)"""
+        with self._lock:
+            self._stopping = True
+            workers = list(self._workers.values())
+            self._workers.clear()
+        for worker in workers:
+            worker.stop()
+
+    def _worker_exited(self, worker: WorkerHandle):
+        worker.process.join(1.0)
+        with self._lock:
+            self._restarts[worker.index] = self._restarts.get(worker.index, 0) + 1
+        logger.error(
+            f"Device worker {worker.index} (pid {worker.process.pid}) exited "
+            f"with code {worker.process.exitcode}; restarting in {self.restart_delay:g}s"
+        )
+        timer = threading.Timer(self.restart_delay, self._restart, args=(worker,))
+        timer.daemon = True
+        timer.start()
+
+    def _restart(self, crashed: WorkerHandle):
+        with self._lock:
+            if self._stopping or self._workers.get(crashed.index) is not crashed:
+                return  # shutting down, or a call already started a new worker
+            self._workers[crashed.index] = WorkerHandle(crashed.index, self._worker_exited)
+
+
+# Global worker supervisor
+_worker_supervisor = DeviceWorkerSupervisor()
+
+
+def get_worker_supervisor() -> DeviceWorkerSupervisor:
+    """Get the global device worker supervisor"""
+    return _worker_supervisor
@@ -0,0 +1,160 @@
+"""
+Idempotency Store - Replay of posting results for retried requests
+
+Clients send an `Idempotency-Key` header with a posting request. The first
+request with a key creates the job; repeats attach to the running job or,
+once it succeeded, get the stored result (including blog_url) without
+touching a device. Failed postings were never published, so their key is
+released and a retry runs again.
+
+Entries are bounded by IDEMPOTENCY_MAX_KEYS and expire after
+IDEMPOTENCY_TTL_HOURS, so memory stays flat.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, Set
+import asyncio
+import hashlib
+import time
+
+from loguru import logger
+
+from app.core.config import settings
+from app.schemas.automation import PostingRequest
+from app.services.automation_executor import PostingResult
+from app.services.job_manager import AutomationJob
+
+
+def request_fingerprint(request: PostingRequest) -> str:
+    """Hash of the full request payload, to detect key reuse"""
+    return hashlib.sha256(request.model_dump_json().encode("utf-8")).hexdigest()
+
+
+class IdempotencyConflict(Exception):
+    """Key was already used for a different request"""
+
+
+@dataclass
+class IdempotencyEntry:
+    """A key's job while running, then only its compact final result"""
+
+    key: str
+    fingerprint: str
+    job_id: str
+    created: float = field(default_factory=time.monotonic)
+    job: Optional[AutomationJob] = field(default=None, repr=False)
+    status: Optional[dict] = None  # final AutomationStatus dict
+    result: Optional[PostingResult] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status is not None
+
+
+class IdempotencyStore:
+    """
+    Bounded, TTL-evicted map of Idempotency-Key -> job/result
+
+    Used from the event loop only; lookup-then-record happens without
+    awaiting, so two concurrent requests with one key cannot both start a job.
+    """
+
+    def __init__(
+        self,
+        max_keys: int = settings.IDEMPOTENCY_MAX_KEYS,
+        ttl_hours: float = settings.IDEMPOTENCY_TTL_HOURS,
+    ):
+        """
+        Initialize store
+
+        Args:
+            max_keys: Maximum retained keys (oldest evicted first)
+            ttl_hours: Time after which a key may be reused
+        """
+        self.max_keys = max_keys
+        self.ttl = ttl_hours * 3600
+        self._entries: "OrderedDict[str, IdempotencyEntry]" = OrderedDict()
+        self._watchers: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, key: str, fingerprint: str) -> Optional[IdempotencyEntry]:
+        """
+        Find the entry for a key
+
+        Args:
+            key: Idempotency-Key header value
+            fingerprint: Hash of the request payload
+
+        Returns:
+            Existing entry, or None if the key is new
+
+        Raises:
+            IdempotencyConflict: The key was used with a different payload
+        """
+        self._expire()
+        entry = self._entries.get(key)
+        if entry and entry.fingerprint != fingerprint:
+            raise IdempotencyConflict(
+                f"Idempotency-Key {key!r} was already used for a different request"
+            )
+        return entry
+
+    def record(self, key: str, fingerprint: str, job: AutomationJob) -> IdempotencyEntry:
+        """
+        Remember the job started for a key and capture its result when done
+
+        Args:
+            key: Idempotency-Key header value
+            fingerprint: Hash of the request payload
+            job: Job created for the request
+
+        Returns:
+            New entry
+        """
+        entry = IdempotencyEntry(key=key, fingerprint=fingerprint, job_id=job.job_id, job=job)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self._evict()
+
+        watcher = asyncio.create_task(self._capture(entry))
+        self._watchers.add(watcher)
+        watcher.add_done_callback(self._watchers.discard)
+        return entry
+
+    async def _capture(self, entry: IdempotencyEntry):
+        job = entry.job
+        await job.done.wait()
+
+        if not job.result.success:
+            # Nothing was published: let a retry with the same key run again
+            if self._entries.get(entry.key) is entry:
+                del self._entries[entry.key]
+            logger.debug(f"Released idempotency key {entry.key} after failed job {job.job_id}")
+            return
+
+        entry.status = job.to_status()
+        entry.result = job.result
+        entry.job = None
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl
+        while self._entries:
+            entry = next(iter(self._entries.values()))
+            if entry.created >= cutoff:
+                break
+            del self._entries[entry.key]
+
+    def _evict(self):
+        while len(self._entries) > self.max_keys:
+            self._entries.popitem(last=False)
+
+
+# Global idempotency store
+_idempotency_store = IdempotencyStore()
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    """Get the global idempotency store"""
+    return _idempotency_store
@@ -0,0 +1,221 @@
+"""
+Image Pipeline Service - Host-side image preparation and device upload
+
+Images are resized to the device resolution, recompressed and stripped of
+EXIF in a process pool, then pushed to the device media store in parallel
+while the text steps of a posting are running.
+"""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import List, Optional
+import hashlib
+import multiprocessing
+import threading
+
+from PIL import Image, ImageOps
+from loguru import logger
+
+from app.core.config import settings
+from app.services.adb_controller import ADBController
+from app.services.cancellation import CancellationToken, OperationCancelled
+
+
+@dataclass(frozen=True)
+class PreparedImage:
+    """Image recompressed for a specific device resolution"""
+
+    source_path: str
+    local_path: str
+    content_hash: str
+    width: int
+    height: int
+    size_bytes: int
+
+    @property
+    def remote_name(self) -> str:
+        """Content-addressed file name used on the device"""
+        return f"careon_{self.content_hash[:16]}.jpg"
+
+
+def prepare_image(
+    source_path: str,
+    max_width: int,
+    max_height: int,
+    quality: int = settings.IMAGE_JPEG_QUALITY,
+    output_dir: str = str(settings.IMAGES_DIR),
+) -> PreparedImage:
+    """
+    Resize, recompress and strip metadata from an image
+
+    Runs inside a worker process, so it only takes and returns picklable data.
+
+    Args:
+        source_path: Image file on the host
+        max_width: Maximum output width (device screen width)
+        max_height: Maximum output height (device screen height)
+        quality: JPEG quality (1-100)
+        output_dir: Directory for prepared images
+
+    Returns:
+        PreparedImage describing the recompressed file
+    """
+    with Image.open(source_path) as img:
+        # Apply EXIF orientation before the metadata is dropped
+        img = ImageOps.exif_transpose(img)
+        img = img.convert("RGB")
+        img.thumbnail((max_width, max_height), Image.LANCZOS)
+
+        # Saving without exif= writes a clean JPEG (no GPS/camera metadata)
+        buffer = BytesIO()
+        img.save(buffer, "JPEG", quality=quality, optimize=True)
+        width, height = img.size
+
+    data = buffer.getvalue()
+    content_hash = hashlib.sha256(data).hexdigest()
+
+    local_path = Path(output_dir) / f"{content_hash[:16]}.jpg"
+    if not local_path.exists():
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        local_path.write_bytes(data)
+
+    return PreparedImage(
+        source_path=source_path,
+        local_path=str(local_path),
+        content_hash=content_hash,
+        width=width,
+        height=height,
+        size_bytes=len(data),
+    )
+
+
+# Shared process pool for CPU-bound image work
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def get_image_process_pool() -> ProcessPoolExecutor:
+    """Get (or lazily create) the shared image preparation process pool"""
+    global _process_pool
+
+    with _process_pool_lock:
+        if _process_pool is None:
+            # spawn: forking a process that runs threads and an event loop is unsafe
+            _process_pool = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _process_pool
+
+
+def shutdown_image_process_pool():
+    """Shut down the image process pool (application shutdown)"""
+    global _process_pool
+
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+
+
+class ImageUploadStage:
+    """
+    Prepare images on the host and upload them to the device media store
+
+    Designed to run in a background thread next to the text steps:
+    1. Prepare all images in the process pool
+    2. Skip files already on the device (content-addressed names)
+    3. Push the remaining files concurrently
+    4. Trigger a single media scan for the pushed files
+
+    The stage checks its cancellation token and stop() flag before every
+    device operation, so a cancelled job or an abandoned attempt stops
+    pushing at the next file.
+    """
+
+    def __init__(
+        self,
+        adb: ADBController,
+        images: List[str],
+        max_width: int,
+        max_height: int,
+        remote_dir: str = settings.DEVICE_MEDIA_DIR,
+        cancel_token: Optional[CancellationToken] = None,
+    ):
+        """
+        Initialize image upload stage
+
+        Args:
+            adb: Controller for the target device
+            images: Image file paths on the host
+            max_width: Device screen width
+            max_height: Device screen height
+            remote_dir: Media directory on the device
+            cancel_token: Optional token of the posting run
+        """
+        self.adb = adb
+        self.images = images
+        self.max_width = max_width
+        self.max_height = max_height
+        self.remote_dir = remote_dir.rstrip("/")
+        self.cancel_token = cancel_token
+        self._stopped = threading.Event()
+
+    def stop(self):
+        """Stop the stage before its next device operation (any thread)"""
+        self._stopped.set()
+
+    def _check(self):
+        if self._stopped.is_set():
+            raise OperationCancelled("Image upload stopped")
+        if self.cancel_token is not None:
+            self.cancel_token.check()
+
+    def _push(self, image: PreparedImage):
+        self._check()
+        self.adb.push_file(Path(image.local_path), self._remote_path(image))
+
+    def run(self) -> List[str]:
+        """
+        Execute the stage
+
+        Returns:
+            Device paths of the images, in request order
+        """
+        pool = get_image_process_pool()
+        prepared = list(
+            pool.map(
+                prepare_image,
+                self.images,
+                [self.max_width] * len(self.images),
+                [self.max_height] * len(self.images),
+            )
+        )
+
+        self._check()
+        existing = set(self.adb.list_dir(self.remote_dir))
+        to_push = {
+            image.remote_name: image
+            for image in prepared
+            if image.remote_name not in existing
+        }
+
+        if to_push:
+            self.adb.shell(f"mkdir -p {self.remote_dir}")
+
+            workers = max(1, min(settings.IMAGE_PUSH_CONCURRENCY, len(to_push)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(self._push, to_push.values()))
+
+            self._check()
+            self.adb.media_scan([self._remote_path(image) for image in to_push.values()])
+
+        logger.info(
+            f"Image stage: {len(prepared)} prepared, {len(to_push)} pushed, "
+            f"{len(prepared) - len(to_push)} already on device"
+        )
+        return [self._remote_path(image) for image in prepared]
+
+    def _remote_path(self, image: PreparedImage) -> str:
+        return f"{self.remote_dir}/{image.remote_name}"
@@ -0,0 +1,553 @@
+"""
+Job Manager - Queued execution of posting jobs with progress reporting
+
+Each device gets its own FIFO queue and worker task, so a phone only ever
+runs one posting at a time while different phones run concurrently.
+Executor step events are turned into AutomationEvent messages on the
+ProgressHub and mirrored into the job's status. Before a job starts, the
+worker holds it until the rate limiter has capacity for its device,
+profile and account (synchronous submits are rejected with RateLimited
+instead of held). Every job owns a CancellationToken: cancel() stops a
+queued job immediately and a running one at its next step, and the token
+enforces the job deadline and per-step budgets. After each job the device
+is re-staged on the blog app main screen in the background, so the next
+job starts from a known-good state, and the result is persisted to the
+posting history along with the device's health counters.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import enum
+import hashlib
+import time
+import uuid
+
+from loguru import logger
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.schemas.automation import AutomationEvent, PostingRequest
+from app.services.automation_executor import PostingResult, create_automator
+from app.services.cancellation import CancellationToken
+from app.services.device_executor import run_on_device
+from app.services.device_manager import DeviceManager
+from app.services.device_readiness import get_readiness_manager
+from app.services.posting_history import PostingHistoryManager
+from app.services.progress import ProgressHub, get_progress_hub
+from app.services.rate_limiter import RateLimited, RateLimiter, get_rate_limiter
+
+
+def posting_content_hash(request: PostingRequest) -> str:
+    """
+    Hash of the publishable content of a request (title, body, images)
+
+    Device and profile are excluded on purpose: the same article posted
+    through two accounts is still a duplicate.
+    """
+    digest = hashlib.sha256()
+    for part in (request.title.strip(), request.content.strip(), *(request.images or [])):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class JobStatus(str, enum.Enum):
+    """Lifecycle of a posting job"""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+@dataclass
+class AutomationJob:
+    """A posting request and its live execution state"""
+
+    request: PostingRequest
+    job_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    content_hash: str = ""
+    status: JobStatus = JobStatus.QUEUED
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    held_until: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    current_step: Optional[int] = None
+    current_step_name: Optional[str] = None
+    steps_completed: int = 0
+    total_steps: int = 9
+    attempt: int = 0
+    result: Optional[PostingResult] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+    cancel_token: CancellationToken = field(default_factory=CancellationToken, repr=False)
+    tokens_acquired: bool = field(default=False, repr=False)
+    _hold: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+    @property
+    def progress_percentage(self) -> float:
+        if self.status == JobStatus.SUCCEEDED:
+            return 100.0
+        return round(self.steps_completed / self.total_steps * 100, 1)
+
+    def to_status(self) -> dict:
+        """Convert to AutomationStatus dictionary"""
+        return {
+            "job_id": self.job_id,
+            "status": self.status.value,
+            "device_id": self.request.device_id,
+            "profile_id": self.request.profile_id,
+            "title": self.request.title,
+            "content_hash": self.content_hash,
+            "running": self.status == JobStatus.RUNNING,
+            "current_step": self.current_step,
+            "current_step_name": self.current_step_name,
+            "total_steps": self.total_steps,
+            "progress_percentage": self.progress_percentage,
+            "attempt": self.attempt,
+            "created_at": self.created_at.isoformat(),
+            "held_until": self.held_until.isoformat() if self.held_until else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "blog_url": self.result.blog_url if self.result else None,
+            "error_message": self.result.error_message if self.result else None,
+            "failed_step": self.result.failed_step if self.result else None,
+        }
+
+
+class JobManager:
+    """
+    Per-device job queues with progress events
+
+    - submit() enqueues without blocking and returns the job immediately
+    - submit_many() deduplicates and enqueues a batch atomically
+    - wait() awaits completion (used by the synchronous /execute endpoint)
+    - jobs are held (still queued) while their rate-limit buckets are empty,
+      unless submitted with hold=False
+    - cancel() stops a job before it starts or within one step
+    - finished jobs are retained up to JOB_HISTORY_LIMIT for status queries
+    """
+
+    def __init__(
+        self,
+        hub: Optional[ProgressHub] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        """
+        Initialize job manager
+
+        Args:
+            hub: Progress hub for events (default: global hub)
+            rate_limiter: Posting pace limiter (default: global limiter)
+        """
+        self.hub = hub or get_progress_hub()
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self._jobs: "OrderedDict[str, AutomationJob]" = OrderedDict()
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._staging: Dict[str, asyncio.Future] = {}
+        # content hash -> (job_id, submitted monotonic time) of recent postings
+        self._recent_hashes: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    # Public API
+
+    def submit(self, request: PostingRequest, hold: bool = True) -> AutomationJob:
+        """
+        Enqueue a posting job (call from the event loop)
+
+        Args:
+            request: Posting request
+            hold: Hold the queued job until its rate-limit buckets have
+                tokens; with False the tokens are taken now or the job is
+                rejected (for callers that cannot wait, like /execute)
+
+        Returns:
+            Queued AutomationJob
+
+        Raises:
+            RateLimited: hold is False and a bucket is empty
+        """
+        job = AutomationJob(request=request, content_hash=posting_content_hash(request))
+        if not hold:
+            wait = self.rate_limiter.try_acquire(self._rate_limit_keys(request))
+            if wait > 0:
+                raise RateLimited(wait)
+            job.tokens_acquired = True
+
+        self._jobs[job.job_id] = job
+        self._evict_finished()
+        self._remember_hash(job)
+
+        self._queue_for(request.device_id).put_nowait(job)
+        self._publish(job, "job_queued")
+
+        logger.info(f"Queued job {job.job_id} on {request.device_id}: {request.title[:30]}")
+        return job
+
+    def submit_many(
+        self,
+        requests: List[PostingRequest],
+        posted: Optional[Dict[str, str]] = None,
+    ) -> Tuple[List[AutomationJob], List[dict]]:
+        """
+        Deduplicate and enqueue a batch of requests atomically
+
+        Runs without awaiting, so no other coroutine can observe a partially
+        enqueued batch. Requests whose content was posted (or is queued)
+        within DEDUP_WINDOW_HOURS, or repeats an earlier item of the same
+        batch, are skipped.
+
+        Queued and running jobs are only known to this process. Finished
+        postings are also checked against `posted`, looked up by the caller
+        in the persisted posting history, so content posted before a restart
+        or through another API worker is caught as well. Two workers
+        accepting the same content at the same moment are not.
+
+        Args:
+            requests: Validated posting requests
+            posted: content hash -> job ID of successful postings within
+                the window (see PostingHistoryManager.find_recent_successes)
+
+        Returns:
+            Tuple of (queued jobs, skipped items with index/reason)
+        """
+        jobs: List[AutomationJob] = []
+        skipped: List[dict] = []
+        batch_hashes: Dict[str, int] = {}
+
+        for index, request in enumerate(requests):
+            content_hash = posting_content_hash(request)
+
+            if content_hash in batch_hashes:
+                skipped.append({
+                    "index": index,
+                    "reason": f"duplicate of batch item {batch_hashes[content_hash]}",
+                    "content_hash": content_hash,
+                })
+                continue
+
+            existing_job_id = self.find_recent_duplicate(content_hash) or (posted or {}).get(
+                content_hash
+            )
+            if existing_job_id:
+                skipped.append({
+                    "index": index,
+                    "reason": "duplicate of recent job",
+                    "content_hash": content_hash,
+                    "duplicate_of": existing_job_id,
+                })
+                continue
+
+            batch_hashes[content_hash] = index
+            jobs.append(self.submit(request))
+
+        logger.info(f"Bulk submit: {len(jobs)} queued, {len(skipped)} skipped")
+        return jobs, skipped
+
+    def cancel(self, job_id: str) -> Optional[AutomationJob]:
+        """
+        Cancel a job
+
+        Queued jobs finish as cancelled immediately; running jobs stop at
+        their next step (or device call) and free the device.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            The job (unchanged if it had already finished), or None if unknown
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return job
+
+        job.cancel_token.cancel("Cancelled by user")
+        if job.status == JobStatus.QUEUED:
+            if job._hold is not None:
+                job._hold.cancel()
+            self._finish(
+                job,
+                PostingResult(
+                    success=False, error_message="Cancelled before start", cancelled=True
+                ),
+            )
+
+        logger.info(f"Cancel requested for job {job_id} ({job.status.value})")
+        return job
+
+    def find_recent_duplicate(self, content_hash: str) -> Optional[str]:
+        """
+        Find a recent job (queued, running or succeeded) with the same content
+
+        Args:
+            content_hash: posting_content_hash() of a request
+
+        Returns:
+            Job ID of the duplicate, or None
+        """
+        self._expire_hashes()
+        entry = self._recent_hashes.get(content_hash)
+        return entry[0] if entry else None
+
+    def get(self, job_id: str) -> Optional[AutomationJob]:
+        """Get job by ID"""
+        return self._jobs.get(job_id)
+
+    def list(
+        self,
+        status: Optional[JobStatus] = None,
+        device_id: Optional[str] = None,
+    ) -> List[AutomationJob]:
+        """List known jobs (oldest first), optionally filtered"""
+        return [
+            job
+            for job in self._jobs.values()
+            if (status is None or job.status == status)
+            and (device_id is None or job.request.device_id == device_id)
+        ]
+
+    async def wait(self, job: AutomationJob) -> PostingResult:
+        """Wait for a job to finish and return its result"""
+        await job.done.wait()
+        return job.result
+
+    async def stop(self):
+        """Cancel all device workers (application shutdown)"""
+        workers = list(self._workers.values())
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._workers.clear()
+        self._queues.clear()
+
+    # Workers
+
+    def _queue_for(self, device_id: str) -> asyncio.Queue:
+        if device_id not in self._queues:
+            self._queues[device_id] = asyncio.Queue()
+
+        worker = self._workers.get(device_id)
+        if worker is None or worker.done():
+            self._workers[device_id] = asyncio.create_task(
+                self._device_worker(device_id), name=f"device-worker-{device_id}"
+            )
+        return self._queues[device_id]
+
+    async def _device_worker(self, device_id: str):
+        queue = self._queues[device_id]
+        while True:
+            job = await queue.get()
+            try:
+                if job.finished:  # cancelled while queued
+                    continue
+
+                if not job.tokens_acquired:
+                    job._hold = asyncio.create_task(self._hold_for_capacity(job))
+                    await asyncio.wait({job._hold})
+                    if job._hold.cancelled() or job.finished:
+                        continue
+                    job._hold.result()
+
+                await self._wait_for_staging(device_id)
+                await self._run_job(job)
+                self._restage(device_id)
+            except Exception as e:
+                logger.error(f"Device worker {device_id} failed on job {job.job_id}: {e}")
+                if not job.finished:
+                    self._finish(job, PostingResult(success=False, error_message=str(e)))
+            finally:
+                job._hold = None
+                queue.task_done()
+
+    def _restage(self, device_id: str):
+        """Stage the device on the app main screen in the background"""
+        if not settings.READINESS_ENABLED:
+            return
+        self._staging[device_id] = asyncio.ensure_future(
+            run_on_device(device_id, get_readiness_manager().stage_device, device_id)
+        )
+
+    async def _wait_for_staging(self, device_id: str):
+        """Let a background re-stage finish before the device is used again"""
+        staging = self._staging.pop(device_id, None)
+        if staging is not None:
+            await asyncio.wait({staging})
+
+    def _rate_limit_keys(self, request: PostingRequest):
+        return self.rate_limiter.keys_for(
+            request.device_id, request.profile_id, request.account_id
+        )
+
+    async def _hold_for_capacity(self, job: AutomationJob):
+        """Keep the job queued until every rate-limit bucket has a token"""
+        keys = self._rate_limit_keys(job.request)
+
+        def on_wait(wait: float):
+            job.held_until = datetime.utcnow() + timedelta(seconds=wait)
+            self._publish(job, "job_held", duration=wait)
+
+        await self.rate_limiter.acquire(keys, on_wait=on_wait)
+        job.held_until = None
+
+    async def _run_job(self, job: AutomationJob):
+        job.status = JobStatus.RUNNING
+        job.started_at = datetime.utcnow()
+        job.attempt = 1
+        self._publish(job, "job_started")
+
+        request = job.request
+        token = job.cancel_token
+        token.add_callback(lambda reason: self._on_abort(job, reason))
+        token.start(settings.JOB_DEADLINE_SECONDS)
+
+        db = SessionLocal()
+        try:
+            automator = create_automator(
+                device_id=request.device_id,
+                profile_id=request.profile_id,
+                db=db,
+                on_event=lambda event: self._on_executor_event(job, event),
+                cancel_token=token,
+            )
+            result = await automator.execute_posting_with_retry(
+                title=request.title,
+                content=request.content,
+                images=request.images,
+            )
+
+        except Exception as e:
+            logger.error(f"Job {job.job_id} failed: {e}")
+            result = PostingResult(success=False, error_message=str(e))
+
+        finally:
+            token.finish()
+            db.close()
+
+        self._finish(job, result)
+        await asyncio.to_thread(self._record_result, job, result)
+
+    def _record_result(self, job: AutomationJob, result: PostingResult):
+        """Persist a finished job and update the device's health (worker thread)"""
+        request = job.request
+        db = SessionLocal()
+        try:
+            PostingHistoryManager(db).record_posting(
+                job_id=job.job_id,
+                device_id=request.device_id,
+                profile_id=request.profile_id,
+                status=job.status.value,
+                result=result,
+                attempts=job.attempt,
+                content_hash=job.content_hash,
+                started_at=job.started_at,
+                finished_at=job.finished_at,
+            )
+            if not result.cancelled:
+                DeviceManager(db).record_device_result(
+                    request.device_id,
+                    result.success,
+                    error=result.error_message or result.failed_step,
+                )
+        finally:
+            db.close()
+
+    def _finish(self, job: AutomationJob, result: PostingResult):
+        job.result = result
+        if result.success:
+            job.status = JobStatus.SUCCEEDED
+        elif result.cancelled:
+            job.status = JobStatus.CANCELLED
+        else:
+            job.status = JobStatus.FAILED
+        job.finished_at = datetime.utcnow()
+        job.total_steps = result.total_steps
+        job.steps_completed = result.steps_completed
+        job.done.set()
+
+        # Failed postings were not published, so their content may be resubmitted
+        if not result.success:
+            entry = self._recent_hashes.get(job.content_hash)
+            if entry and entry[0] == job.job_id:
+                del self._recent_hashes[job.content_hash]
+
+        self._publish(
+            job,
+            "job_finished",
+            success=result.success,
+            blog_url=result.blog_url,
+            error=result.error_message or result.failed_step,
+            duration=result.execution_time,
+        )
+
+    # Events
+
+    def _on_executor_event(self, job: AutomationJob, event: dict):
+        event = dict(event)
+        event_type = event.pop("type")
+
+        if event_type == "step_started":
+            job.current_step = event.get("step")
+            job.current_step_name = event.get("step_name")
+        elif event_type == "step_completed":
+            job.steps_completed = max(job.steps_completed, event.get("step") or 0)
+        elif event_type == "attempt_failed":
+            job.attempt += 1
+            job.steps_completed = 0
+            event = {"error": event.get("error") or event.get("failed_step")}
+
+        self._publish(job, event_type, **event)
+
+    def _on_abort(self, job: AutomationJob, reason: str):
+        """Token callback: cancel request or budget exceeded (any thread)"""
+        if job.status == JobStatus.RUNNING:
+            self._publish(job, "job_aborting", error=reason)
+
+    def _publish(self, job: AutomationJob, event_type: str, **data):
+        data.setdefault("step", job.current_step)
+        data.setdefault("step_name", job.current_step_name)
+        event = AutomationEvent(
+            job_id=job.job_id,
+            type=event_type,
+            timestamp=datetime.utcnow().isoformat(),
+            total_steps=job.total_steps,
+            progress_percentage=job.progress_percentage,
+            **data,
+        )
+        self.hub.publish(event.model_dump())
+
+    def _remember_hash(self, job: AutomationJob):
+        self._recent_hashes[job.content_hash] = (job.job_id, time.monotonic())
+        self._recent_hashes.move_to_end(job.content_hash)
+        self._expire_hashes()
+
+    def _expire_hashes(self):
+        """Drop content hashes older than the dedup window (oldest first)"""
+        cutoff = time.monotonic() - settings.DEDUP_WINDOW_HOURS * 3600
+        while self._recent_hashes:
+            content_hash, (_, submitted) = next(iter(self._recent_hashes.items()))
+            if submitted >= cutoff:
+                break
+            del self._recent_hashes[content_hash]
+
+    def _evict_finished(self):
+        """Drop the oldest finished jobs beyond the retention limit"""
+        excess = len(self._jobs) - settings.JOB_HISTORY_LIMIT
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished][:excess]:
+            del self._jobs[job_id]
+
+
+# Global job manager
+_job_manager = JobManager()
+
+
+def get_job_manager() -> JobManager:
+    """Get the global job manager"""
+    return _job_manager
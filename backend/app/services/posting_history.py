@@ -0,0 +1,480 @@
+"""
+Posting History - Persisted posting results and hourly analytics
+
+Every finished job is appended to posting_history and counted into
+posting_rollups_hourly (one row per hour, device, profile and failed
+step) in the same transaction. Listings read the history, newest first
+with keyset cursors; analytics only read the rollups, so a query over
+months aggregates a few rows per device-hour instead of every posting.
+
+Rollup windows are whole hours: since rounds down and until rounds up to
+the hour.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import case, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.device import DeviceProfile
+from app.models.posting import PostingRecord, PostingRollup
+from app.schemas.automation import PostingAnalyticsFilter, PostingHistoryFilter
+from app.services.automation_executor import PostingResult
+
+# Grouping keys of get_throughput()
+THROUGHPUT_GROUPS = ("device", "profile", "model")
+
+
+def rollup_hour(moment: datetime) -> datetime:
+    """Rollup bucket of a timestamp"""
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _ceil_hour(moment: datetime) -> datetime:
+    hour = rollup_hour(moment)
+    return hour if hour == moment else hour + timedelta(hours=1)
+
+
+class PostingHistoryManager:
+    """
+    Posting history and analytics operations
+    """
+
+    def __init__(self, db: Session):
+        """
+        Initialize posting history manager
+
+        Args:
+            db: SQLAlchemy database session
+        """
+        self.db = db
+
+    def record_posting(
+        self,
+        job_id: str,
+        device_id: str,
+        profile_id: str,
+        status: str,
+        result: PostingResult,
+        attempts: int = 1,
+        content_hash: Optional[str] = None,
+        started_at: Optional[datetime] = None,
+        finished_at: Optional[datetime] = None,
+    ) -> Optional[PostingRecord]:
+        """
+        Append a finished posting and count it into its hourly rollup
+
+        Args:
+            job_id: Job ID
+            device_id: ADB serial number
+            profile_id: Device profile ID
+            status: Final job status (succeeded, failed, cancelled)
+            result: Posting result
+            attempts: Attempts the job made
+            content_hash: Hash of the posted content
+            started_at: When the job started
+            finished_at: When the job finished (default: now)
+
+        Returns:
+            PostingRecord or None on error
+        """
+        record = PostingRecord(
+            job_id=job_id,
+            device_id=device_id,
+            profile_id=profile_id,
+            content_hash=content_hash,
+            status=status,
+            success=result.success,
+            steps_completed=result.steps_completed,
+            total_steps=result.total_steps,
+            failed_step=result.failed_step,
+            error_message=(result.error_message or "")[:500] or None,
+            blog_url=result.blog_url,
+            attempts=attempts,
+            execution_time=result.execution_time,
+            started_at=started_at,
+            finished_at=finished_at or datetime.utcnow(),
+        )
+        try:
+            self.db.add(record)
+            self.db.flush()
+            self._count_into_rollup(record, cancelled=status == "cancelled")
+            self.db.commit()
+            return record
+
+        except Exception as e:
+            logger.error(f"Failed to record posting {job_id}: {e}")
+            self.db.rollback()
+            return None
+
+    def _count_into_rollup(self, record: PostingRecord, cancelled: bool):
+        """
+        Add a posting to its rollup row (UPDATE, INSERT for a new row)
+
+        Two workers may insert the same new row at once; the loser's
+        INSERT hits the unique key and it falls back to the UPDATE.
+        """
+        table = PostingRollup.__table__
+        key = {
+            "hour": rollup_hour(record.finished_at),
+            "device_id": record.device_id,
+            "profile_id": record.profile_id,
+            "failed_step": record.failed_step or "",
+        }
+        where = [table.c[name] == value for name, value in key.items()]
+        counts = {
+            "postings": 1,
+            "succeeded": int(record.success),
+            "cancelled": int(cancelled),
+            "steps_completed": record.steps_completed,
+            "execution_time_total": record.execution_time,
+        }
+
+        def bump() -> bool:
+            values = {name: table.c[name] + value for name, value in counts.items()}
+            values["execution_time_max"] = case(
+                (table.c.execution_time_max < record.execution_time, record.execution_time),
+                else_=table.c.execution_time_max,
+            )
+            return self.db.execute(update(table).where(*where).values(values)).rowcount > 0
+
+        if bump():
+            return
+        try:
+            with self.db.begin_nested():
+                self.db.execute(
+                    table.insert().values(
+                        **key, **counts, execution_time_max=record.execution_time
+                    )
+                )
+        except IntegrityError:
+            bump()
+
+    def get_posting(self, record_id: int) -> Optional[PostingRecord]:
+        """Get a posting record by ID"""
+        return self.db.get(PostingRecord, record_id)
+
+    def find_recent_successes(self, content_hashes: List[str], since: datetime) -> Dict[str, str]:
+        """
+        Successful postings of some contents since a moment
+
+        Args:
+            content_hashes: posting_content_hash() values
+            since: Earliest finished_at to consider
+
+        Returns:
+            content hash -> job ID of its latest successful posting
+        """
+        if not content_hashes:
+            return {}
+        rows = self.db.execute(
+            select(PostingRecord.content_hash, PostingRecord.job_id)
+            .where(
+                PostingRecord.content_hash.in_(set(content_hashes)),
+                PostingRecord.finished_at >= since,
+                PostingRecord.success.is_(True),
+            )
+            .order_by(PostingRecord.finished_at)
+        )
+        return {content_hash: job_id for content_hash, job_id in rows}
+
+    def list_postings(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        filters: Optional[PostingHistoryFilter] = None,
+    ) -> tuple[List[PostingRecord], Optional[str]]:
+        """
+        List posting records, newest first
+
+        Args:
+            limit: Maximum records to return
+            cursor: next_cursor of the previous page (None = first page)
+            filters: Optional history filters
+
+        Returns:
+            Tuple of (records, next cursor or None on the last page)
+
+        Raises:
+            ValueError: The cursor is malformed
+        """
+        query = self.db.query(PostingRecord)
+        if filters is not None:
+            if filters.device_id is not None:
+                query = query.filter(PostingRecord.device_id == filters.device_id)
+            if filters.profile_id is not None:
+                query = query.filter(PostingRecord.profile_id == filters.profile_id)
+            if filters.status is not None:
+                query = query.filter(PostingRecord.status == filters.status)
+            if filters.failed_step is not None:
+                query = query.filter(PostingRecord.failed_step == filters.failed_step)
+            if filters.since is not None:
+                query = query.filter(PostingRecord.finished_at >= filters.since)
+            if filters.until is not None:
+                query = query.filter(PostingRecord.finished_at < filters.until)
+
+        before = decode_cursor(cursor)
+        if before is not None:
+            if not isinstance(before, int) or isinstance(before, bool):
+                raise ValueError(f"Invalid cursor: {cursor}")
+            query = query.filter(PostingRecord.id < before)
+
+        # One extra row tells whether there is a next page
+        records = query.order_by(PostingRecord.id.desc()).limit(limit + 1).all()
+        if len(records) <= limit:
+            return records, None
+        records = records[:limit]
+        return records, encode_cursor(records[-1].id)
+
+    # Analytics (rollups only)
+
+    def _rollup_conditions(self, filters: Optional[PostingAnalyticsFilter]) -> list:
+        if filters is None:
+            return []
+        conditions = []
+        if filters.device_id is not None:
+            conditions.append(PostingRollup.device_id == filters.device_id)
+        if filters.profile_id is not None:
+            conditions.append(PostingRollup.profile_id == filters.profile_id)
+        if filters.model is not None:
+            conditions.append(
+                PostingRollup.profile_id.in_(
+                    select(DeviceProfile.profile_id).where(DeviceProfile.model == filters.model)
+                )
+            )
+        if filters.since is not None:
+            conditions.append(PostingRollup.hour >= rollup_hour(filters.since))
+        if filters.until is not None:
+            conditions.append(PostingRollup.hour < _ceil_hour(filters.until))
+        return conditions
+
+    @staticmethod
+    def _totals():
+        return (
+            func.coalesce(func.sum(PostingRollup.postings), 0).label("postings"),
+            func.coalesce(func.sum(PostingRollup.succeeded), 0).label("succeeded"),
+            func.coalesce(func.sum(PostingRollup.cancelled), 0).label("cancelled"),
+            func.coalesce(func.sum(PostingRollup.steps_completed), 0).label("steps_completed"),
+            func.coalesce(func.sum(PostingRollup.execution_time_total), 0.0).label(
+                "execution_time_total"
+            ),
+            func.coalesce(func.max(PostingRollup.execution_time_max), 0.0).label(
+                "execution_time_max"
+            ),
+        )
+
+    @staticmethod
+    def _stats_from_row(row) -> dict:
+        postings = int(row.postings)
+        succeeded = int(row.succeeded)
+        cancelled = int(row.cancelled)
+        return {
+            "postings": postings,
+            "succeeded": succeeded,
+            "failed": postings - succeeded - cancelled,
+            "cancelled": cancelled,
+            "success_rate": round(succeeded / postings, 4) if postings else 0.0,
+            "avg_steps_completed": (
+                round(int(row.steps_completed) / postings, 2) if postings else 0.0
+            ),
+            "avg_execution_time": (
+                round(float(row.execution_time_total) / postings, 3) if postings else 0.0
+            ),
+            "max_execution_time": round(float(row.execution_time_max), 3),
+        }
+
+    def _window_hours(self, conditions: list, filters: Optional[PostingAnalyticsFilter]) -> int:
+        """Hours covered by a query: the filter window (default: first posting until now)"""
+        since = filters.since if filters else None
+        until = (filters.until if filters else None) or datetime.utcnow()
+        if since is None:
+            since = self.db.execute(select(func.min(PostingRollup.hour)).where(*conditions)).scalar()
+            if since is None:
+                return 0
+        return max(1, int((_ceil_hour(until) - rollup_hour(since)).total_seconds() // 3600))
+
+    def get_summary(self, filters: Optional[PostingAnalyticsFilter] = None) -> dict:
+        """
+        Posting totals over a window
+
+        Args:
+            filters: Optional device/profile/model/time filters
+
+        Returns:
+            Counts, success rate, execution times and postings per hour
+        """
+        conditions = self._rollup_conditions(filters)
+        row = self.db.execute(select(*self._totals()).where(*conditions)).one()
+        stats = self._stats_from_row(row)
+        hours = self._window_hours(conditions, filters)
+        stats["hours"] = hours
+        stats["postings_per_hour"] = round(stats["postings"] / hours, 3) if hours else 0.0
+        return stats
+
+    def get_failed_steps(
+        self, filters: Optional[PostingAnalyticsFilter] = None, limit: int = 20
+    ) -> List[dict]:
+        """
+        Failures per failed step, most frequent first
+
+        Args:
+            filters: Optional device/profile/model/time filters
+            limit: Maximum steps to return
+
+        Returns:
+            List of {failed_step, failures, share} (failed_step None when the
+            posting failed outside a step); share is of all failures
+        """
+        failures = func.sum(
+            PostingRollup.postings - PostingRollup.succeeded - PostingRollup.cancelled
+        )
+        rows = self.db.execute(
+            select(PostingRollup.failed_step, failures.label("failures"))
+            .where(*self._rollup_conditions(filters))
+            .group_by(PostingRollup.failed_step)
+            .having(failures > 0)
+            .order_by(failures.desc(), PostingRollup.failed_step)
+        ).all()
+        total = sum(int(row.failures) for row in rows)
+        return [
+            {
+                "failed_step": row.failed_step or None,
+                "failures": int(row.failures),
+                "share": round(int(row.failures) / total, 4),
+            }
+            for row in rows[:limit]
+        ]
+
+    def get_throughput(
+        self, group_by: str = "device", filters: Optional[PostingAnalyticsFilter] = None
+    ) -> List[dict]:
+        """
+        Posting stats per device, profile or device model
+
+        Args:
+            group_by: device | profile | model
+            filters: Optional device/profile/model/time filters
+
+        Returns:
+            List of stats dicts with "key", "active_hours" and
+            "postings_per_hour" over the window, busiest first
+
+        Raises:
+            ValueError: Unknown group_by
+        """
+        if group_by not in THROUGHPUT_GROUPS:
+            raise ValueError(f"group_by must be one of: {', '.join(THROUGHPUT_GROUPS)}")
+
+        conditions = self._rollup_conditions(filters)
+        if group_by == "device":
+            key = PostingRollup.device_id
+        elif group_by == "profile":
+            key = PostingRollup.profile_id
+        else:
+            key = DeviceProfile.model
+
+        query = select(
+            key.label("key"),
+            func.count(func.distinct(PostingRollup.hour)).label("active_hours"),
+            *self._totals(),
+        )
+        if group_by == "model":
+            query = query.select_from(PostingRollup).outerjoin(
+                DeviceProfile, DeviceProfile.profile_id == PostingRollup.profile_id
+            )
+        rows = self.db.execute(
+            query.where(*conditions).group_by(key).order_by(func.sum(PostingRollup.postings).desc())
+        ).all()
+
+        hours = self._window_hours(conditions, filters)
+        return [
+            {
+                "key": row.key,
+                "active_hours": int(row.active_hours),
+                **self._stats_from_row(row),
+                "postings_per_hour": round(int(row.postings) / hours, 3) if hours else 0.0,
+            }
+            for row in rows
+        ]
+
+    def get_hourly(self, filters: Optional[PostingAnalyticsFilter] = None) -> List[dict]:
+        """
+        Posting stats per hour (hours without postings are omitted)
+
+        Args:
+            filters: Optional device/profile/model/time filters
+
+        Returns:
+            List of stats dicts with "hour", oldest first
+        """
+        rows = self.db.execute(
+            select(PostingRollup.hour, *self._totals())
+            .where(*self._rollup_conditions(filters))
+            .group_by(PostingRollup.hour)
+            .order_by(PostingRollup.hour)
+        ).all()
+        return [{"hour": row.hour, **self._stats_from_row(row)} for row in rows]
+
+
+class AsyncPostingHistoryManager:
+    """
+    Async variant of PostingHistoryManager for FastAPI endpoints (run_sync)
+    """
+
+    def __init__(self, db: AsyncSession):
+        """
+        Initialize async posting history manager
+
+        Args:
+            db: SQLAlchemy async database session
+        """
+        self.db = db
+
+    async def _run(self, method: str, *args, **kwargs):
+        def call(session: Session):
+            return getattr(PostingHistoryManager(session), method)(*args, **kwargs)
+
+        return await self.db.run_sync(call)
+
+    async def get_posting(self, record_id: int) -> Optional[PostingRecord]:
+        """See PostingHistoryManager.get_posting"""
+        return await self._run("get_posting", record_id)
+
+    async def find_recent_successes(
+        self, content_hashes: List[str], since: datetime
+    ) -> Dict[str, str]:
+        """See PostingHistoryManager.find_recent_successes"""
+        return await self._run("find_recent_successes", content_hashes, since)
+
+    async def list_postings(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        filters: Optional[PostingHistoryFilter] = None,
+    ) -> tuple[List[PostingRecord], Optional[str]]:
+        """See PostingHistoryManager.list_postings"""
+        return await self._run("list_postings", limit=limit, cursor=cursor, filters=filters)
+
+    async def get_summary(self, filters: Optional[PostingAnalyticsFilter] = None) -> dict:
+        """See PostingHistoryManager.get_summary"""
+        return await self._run("get_summary", filters)
+
+    async def get_failed_steps(
+        self, filters: Optional[PostingAnalyticsFilter] = None, limit: int = 20
+    ) -> List[dict]:
+        """See PostingHistoryManager.get_failed_steps"""
+        return await self._run("get_failed_steps", filters, limit=limit)
+
+    async def get_throughput(
+        self, group_by: str = "device", filters: Optional[PostingAnalyticsFilter] = None
+    ) -> List[dict]:
+        """See PostingHistoryManager.get_throughput"""
+        return await self._run("get_throughput", group_by, filters)
+
+    async def get_hourly(self, filters: Optional[PostingAnalyticsFilter] = None) -> List[dict]:
+        """See PostingHistoryManager.get_hourly"""
+        return await self._run("get_hourly", filters)
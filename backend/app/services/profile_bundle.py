@@ -0,0 +1,591 @@
+"""
+Profile Bundles - Export/import of calibrated profiles between instances
+
+A bundle is a stream of msgpack objects, optionally inside one zstd frame:
+1. header: {"format", "version", "created_at", "app_version", "columns"}
+2. one record per profile: {"profile": [...], "coordinates": [[...], ...],
+   "history": [[...], ...]}
+
+Rows are positional arrays whose column names are listed once in the
+header, enum columns travel as their values and datetimes as msgpack
+timestamps. Bundles are highly repetitive (element names, history
+keyframes), so zstd shrinks them by roughly 20x.
+Per-instance data is not exported: coordinate usage statistics and the
+serials of physical devices.
+
+Export reads profiles in keyset batches and yields bytes as it goes.
+Import is incremental too (feed() takes chunks) and writes each batch with
+executemany statements, all in one transaction:
+- new profiles are inserted with their coordinates and history
+- existing profiles (same profile_id) are merged: profile fields and the
+  bundle's coordinates are updated/added, other local coordinates are
+  kept, and the result is appended to the local coordinate history
+- a profile_id repeated in the bundle is handled like an existing profile
+  (merged into the first occurrence, or skipped)
+
+The write transaction is held from the first batch to the commit, so the
+input must be local: the API spools the request body to a temporary file
+first and runs import_bundle() on it, instead of holding the database
+write lock while a client uploads slowly.
+"""
+from datetime import datetime, timezone
+from typing import BinaryIO, Dict, Iterator, List, Optional
+from types import SimpleNamespace
+
+import msgpack
+from loguru import logger
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.coordinate import (
+    CalibrationMethod,
+    CoordinateConfig,
+    CoordinateVersion,
+    UIElementType,
+)
+from app.models.device import DeviceProfile
+from app.services.coordinate_cache import get_coordinate_cache
+from app.services.coordinate_history import encode_state
+from app.services.device_manager import DeviceManager
+
+BUNDLE_FORMAT = "careon-profile-bundle"
+BUNDLE_VERSION = 1
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+PROFILE_COLUMNS = [
+    "profile_id",
+    "model",
+    "manufacturer",
+    "android_version",
+    "width",
+    "height",
+    "dpi",
+    "calibrated",
+    "calibration_confidence",
+    "created_at",
+    "updated_at",
+    "last_used_at",
+    "notes",
+]
+COORDINATE_COLUMNS = [
+    "element_type",
+    "element_name",
+    "element_description",
+    "x",
+    "y",
+    "confidence",
+    "validated",
+    "calibration_method",
+    "calibrated_by",
+    "calibrated_at",
+    "touch_radius",
+    "created_at",
+    "updated_at",
+    "notes",
+]
+HISTORY_COLUMNS = [
+    "version",
+    "keyframe",
+    "data",
+    "element_count",
+    "source",
+    "note",
+    "created_at",
+]
+
+_COLUMNS = {
+    "profile": PROFILE_COLUMNS,
+    "coordinate": COORDINATE_COLUMNS,
+    "history": HISTORY_COLUMNS,
+}
+_ENUMS = {"element_type": UIElementType, "calibration_method": CalibrationMethod}
+# Columns the importer cannot do without (history may be omitted entirely)
+_REQUIRED_COLUMNS = {"profile": ["profile_id"], "coordinate": ["element_type"], "history": []}
+
+
+class BundleError(ValueError):
+    """The bundle is malformed or of an unsupported format"""
+
+
+def _pack_default(value):
+    if isinstance(value, datetime):
+        return msgpack.Timestamp.from_datetime(value.replace(tzinfo=timezone.utc))
+    if isinstance(value, (UIElementType, CalibrationMethod)):
+        return value.value
+    raise TypeError(f"Cannot pack {type(value).__name__}")
+
+
+def _unpack_value(value):
+    if isinstance(value, msgpack.Timestamp):
+        return value.to_datetime().replace(tzinfo=None)
+    return value
+
+
+def export_bundle(
+    profile_ids: Optional[List[str]] = None,
+    compress: bool = False,
+    include_history: bool = True,
+    batch_size: int = settings.PROFILE_BUNDLE_BATCH_SIZE,
+) -> Iterator[bytes]:
+    """
+    Stream a bundle of profiles
+
+    Args:
+        profile_ids: Profiles to export (None = all)
+        compress: Wrap the stream in a zstd frame
+        include_history: Include the coordinate history
+        batch_size: Profiles read per database round trip
+
+    Yields:
+        Bundle bytes
+    """
+    packer = msgpack.Packer(default=_pack_default)
+    compressor = None
+    if compress:
+        import zstandard
+
+        compressor = zstandard.ZstdCompressor(
+            level=settings.PROFILE_BUNDLE_ZSTD_LEVEL
+        ).compressobj()
+
+    def emit(data: bytes) -> bytes:
+        return compressor.compress(data) if compressor else data
+
+    yield emit(
+        packer.pack(
+            {
+                "format": BUNDLE_FORMAT,
+                "version": BUNDLE_VERSION,
+                "created_at": datetime.utcnow(),
+                "app_version": settings.VERSION,
+                "columns": {
+                    "profile": PROFILE_COLUMNS,
+                    "coordinate": COORDINATE_COLUMNS,
+                    "history": HISTORY_COLUMNS if include_history else [],
+                },
+            }
+        )
+    )
+
+    profiles_table = DeviceProfile.__table__
+    coords_table = CoordinateConfig.__table__
+    history_table = CoordinateVersion.__table__
+    wanted = sorted(set(profile_ids)) if profile_ids is not None else None
+    exported = 0
+
+    db = SessionLocal()
+    try:
+        after = None
+        while True:
+            query = select(*[profiles_table.c[name] for name in PROFILE_COLUMNS])
+            if wanted is not None:
+                query = query.where(profiles_table.c.profile_id.in_(wanted))
+            if after is not None:
+                query = query.where(profiles_table.c.profile_id > after)
+            profiles = db.execute(
+                query.order_by(profiles_table.c.profile_id).limit(batch_size)
+            ).all()
+            if not profiles:
+                break
+            batch_ids = [row.profile_id for row in profiles]
+            after = batch_ids[-1]
+
+            coordinates: Dict[str, list] = {pid: [] for pid in batch_ids}
+            for row in db.execute(
+                select(coords_table.c.profile_id, *[coords_table.c[n] for n in COORDINATE_COLUMNS])
+                .where(coords_table.c.profile_id.in_(batch_ids))
+                .order_by(coords_table.c.profile_id, coords_table.c.id)
+            ):
+                coordinates[row[0]].append(list(row[1:]))
+
+            history: Dict[str, list] = {pid: [] for pid in batch_ids}
+            if include_history:
+                for row in db.execute(
+                    select(history_table.c.profile_id, *[history_table.c[n] for n in HISTORY_COLUMNS])
+                    .where(history_table.c.profile_id.in_(batch_ids))
+                    .order_by(history_table.c.profile_id, history_table.c.version)
+                ):
+                    history[row[0]].append(list(row[1:]))
+
+            chunk = b"".join(
+                packer.pack(
+                    {
+                        "profile": list(row),
+                        "coordinates": coordinates[row.profile_id],
+                        "history": history[row.profile_id],
+                    }
+                )
+                for row in profiles
+            )
+            exported += len(profiles)
+            yield emit(chunk)
+    finally:
+        db.close()
+
+    if compressor:
+        yield compressor.flush()
+    logger.info(f"Exported {exported} profiles")
+
+
+class BundleImporter:
+    """
+    Incremental bundle import
+
+    Usage:
+        importer = BundleImporter()
+        for chunk in body:
+            importer.feed(chunk)
+        summary = importer.finish()
+
+    Nothing is committed before finish(); abort() (or an error in feed or
+    finish) rolls the whole import back.
+    """
+
+    def __init__(
+        self,
+        merge: bool = True,
+        batch_size: int = settings.PROFILE_BUNDLE_BATCH_SIZE,
+    ):
+        """
+        Initialize importer
+
+        Args:
+            merge: Merge into existing profiles (False = skip them)
+            batch_size: Profiles written per round of bulk statements
+        """
+        self.merge = merge
+        self.batch_size = batch_size
+        self.db = SessionLocal()
+        self._unpacker = msgpack.Unpacker(raw=False, timestamp=0)
+        self._decompressor = None
+        self._prefix = b""  # bytes held back until compression is detected
+        self._columns: Optional[dict] = None
+        self._pending: List[dict] = []
+        self._pending_ids: set = set()
+        self._touched: List[str] = []
+        self.summary = dict.fromkeys(
+            ("profiles", "created", "updated", "skipped", "coordinates", "versions"), 0
+        )
+
+    # Stream handling
+
+    def feed(self, chunk: bytes):
+        """Consume the next chunk of the bundle"""
+        try:
+            if self._decompressor is None and self._prefix is not None:
+                self._prefix += chunk
+                if len(self._prefix) < len(ZSTD_MAGIC):
+                    return
+                chunk, self._prefix = self._prefix, None
+                if chunk.startswith(ZSTD_MAGIC):
+                    import zstandard
+
+                    self._decompressor = zstandard.ZstdDecompressor().decompressobj()
+            if self._decompressor is not None:
+                chunk = self._decompressor.decompress(chunk)
+
+            self._unpacker.feed(chunk)
+            for obj in self._unpacker:
+                self._handle(obj)
+        except Exception:
+            self.abort()
+            raise
+
+    def finish(self) -> dict:
+        """
+        Write the remaining profiles and commit
+
+        Returns:
+            Summary: profiles, created, updated, skipped, coordinates, versions
+        """
+        try:
+            if self._prefix:
+                # A bundle shorter than the zstd magic
+                self._unpacker.feed(self._prefix)
+                for obj in self._unpacker:
+                    self._handle(obj)
+            if self._unparsed_bytes() or (
+                self._decompressor is not None and not self._decompressor.eof
+            ):
+                raise BundleError("Truncated bundle")
+            if self._columns is None:
+                raise BundleError("Empty bundle")
+            self._flush()
+            self.db.commit()
+        except Exception:
+            self.abort()
+            raise
+        finally:
+            self.db.close()
+
+        cache = get_coordinate_cache()
+        for profile_id in self._touched:
+            cache.invalidate(profile_id)
+        logger.info(f"Imported profile bundle: {self.summary}")
+        return self.summary
+
+    def abort(self):
+        """Roll back everything written so far"""
+        self.db.rollback()
+        self.db.close()
+
+    def _unparsed_bytes(self) -> bool:
+        """True if the unpacker holds the start of an incomplete object"""
+        try:
+            return bool(self._unpacker.read_bytes(1))
+        except ValueError:  # "Cannot switch unpacking methods" mid-object
+            return True
+
+    def _handle(self, obj):
+        if self._columns is None:
+            if not isinstance(obj, dict) or obj.get("format") != BUNDLE_FORMAT:
+                raise BundleError("Not a profile bundle")
+            if not isinstance(obj.get("version"), int) or obj["version"] > BUNDLE_VERSION:
+                raise BundleError(f"Unsupported bundle version: {obj.get('version')}")
+            self._columns = self._header_columns(obj.get("columns"))
+            return
+
+        if not isinstance(obj, dict) or not isinstance(obj.get("profile"), list):
+            raise BundleError("Malformed profile record")
+        for key in ("coordinates", "history"):
+            if not isinstance(obj.get(key) or [], list):
+                raise BundleError(f"Malformed {key} of a profile record")
+        profile_id = dict(zip(self._columns["profile"], obj["profile"])).get("profile_id")
+        if not isinstance(profile_id, str) or not profile_id:
+            raise BundleError("Profile record without profile_id")
+
+        if profile_id in self._pending_ids:
+            # Write the first occurrence, so the repeat is merged (or skipped)
+            self._flush()
+        self._pending.append(obj)
+        self._pending_ids.add(profile_id)
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+
+    @staticmethod
+    def _header_columns(columns) -> dict:
+        """Validate the header's column lists"""
+        if not isinstance(columns, dict):
+            raise BundleError("Bundle header has no columns")
+        for kind, required in _REQUIRED_COLUMNS.items():
+            names = columns.get(kind)
+            if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+                raise BundleError(f"Bundle header has no valid {kind} columns")
+            missing = [name for name in required if name not in names]
+            if missing:
+                raise BundleError(f"Bundle {kind} columns lack {', '.join(missing)}")
+        return columns
+
+    # Writing
+
+    def _rows(self, kind: str, rows: list) -> List[dict]:
+        columns = self._columns[kind]
+        known = set(_COLUMNS[kind])  # columns of newer bundles are ignored
+        result = []
+        for row in rows:
+            if not isinstance(row, list):
+                raise BundleError(f"Malformed {kind} row")
+            values = {
+                name: _unpack_value(value)
+                for name, value in zip(columns, row)
+                if name in known
+            }
+            missing = [name for name in _REQUIRED_COLUMNS[kind] if values.get(name) is None]
+            if missing:
+                raise BundleError(f"{kind.capitalize()} row without {', '.join(missing)}")
+            for name, enum_type in _ENUMS.items():
+                if values.get(name) is not None:
+                    values[name] = enum_type(values[name])
+            result.append(values)
+        return result
+
+    def _flush(self):
+        """Write the pending profiles with bulk statements"""
+        records, self._pending = self._pending, []
+        self._pending_ids = set()
+        if not records:
+            return
+        try:
+            self._write(records)
+        except IntegrityError as e:
+            raise BundleError(f"Bundle rows violate database constraints: {e.orig}")
+
+    def _write(self, records: List[dict]):
+        """Insert or merge one batch of profile records"""
+        profiles = []
+        for record in records:
+            (profile,) = self._rows("profile", [record["profile"]])
+            profiles.append(
+                (
+                    profile,
+                    self._rows("coordinate", record.get("coordinates") or []),
+                    self._rows("history", record.get("history") or []),
+                )
+            )
+
+        profiles_table = DeviceProfile.__table__
+        coords_table = CoordinateConfig.__table__
+        batch_ids = [profile["profile_id"] for profile, _, _ in profiles]
+        existing = {
+            row.profile_id
+            for row in self.db.execute(
+                select(profiles_table.c.profile_id).where(profiles_table.c.profile_id.in_(batch_ids))
+            )
+        }
+
+        now = datetime.utcnow()
+        new_profiles, new_coords, new_versions = [], [], []
+        merged = []
+        for profile, coords, history in profiles:
+            profile_id = profile["profile_id"]
+            self.summary["profiles"] += 1
+            if profile_id in existing:
+                if self.merge:
+                    merged.append((profile, coords))
+                else:
+                    self.summary["skipped"] += 1
+                continue
+
+            new_profiles.append(profile)
+            for coord in coords:
+                new_coords.append(self._coordinate_values(profile_id, coord, now))
+            if history:
+                new_versions.extend({**version, "profile_id": profile_id} for version in history)
+            else:
+                state = encode_state(SimpleNamespace(**coord) for coord in coords)
+                new_versions.append(
+                    {
+                        "profile_id": profile_id,
+                        "version": 1,
+                        "keyframe": True,
+                        "data": state,
+                        "element_count": len(state),
+                        "source": "import",
+                        "note": None,
+                        "created_at": now,
+                    }
+                )
+
+        if new_profiles:
+            self.db.execute(insert(profiles_table), new_profiles)
+        if new_coords:
+            self.db.execute(insert(coords_table), new_coords)
+        if new_versions:
+            self.db.execute(insert(CoordinateVersion.__table__), new_versions)
+        self.summary["created"] += len(new_profiles)
+        self.summary["coordinates"] += len(new_coords)
+        self.summary["versions"] += len(new_versions)
+
+        if merged:
+            self._merge(merged, now, DeviceManager(self.db))
+
+        self._touched.extend(profile["profile_id"] for profile, _ in merged)
+        self._touched.extend(profile["profile_id"] for profile in new_profiles)
+
+    def _coordinate_values(self, profile_id: str, coord: dict, now: datetime) -> dict:
+        return {
+            **coord,
+            "profile_id": profile_id,
+            "created_at": coord.get("created_at") or now,
+            "updated_at": coord.get("updated_at") or now,
+            "usage_count": 0,
+            "success_count": 0,
+            "fail_count": 0,
+        }
+
+    def _carried_columns(self, kind: str, exclude: tuple) -> List[str]:
+        """Known columns of a kind that the bundle header lists"""
+        carried = set(self._columns[kind])
+        return [name for name in _COLUMNS[kind] if name in carried and name not in exclude]
+
+    def _merge(self, merged: List[tuple], now: datetime, manager: DeviceManager):
+        """Merge profiles that already exist (bulk UPDATE/INSERT, then history)"""
+        profiles_table = DeviceProfile.__table__
+        coords_table = CoordinateConfig.__table__
+        merged_ids = [profile["profile_id"] for profile, _ in merged]
+
+        # Local history must hold the state before the merge
+        for profile_id in merged_ids:
+            manager._ensure_coordinate_history(profile_id)
+
+        # Only overwrite what the bundle carries (older bundles may lack columns)
+        fields = self._carried_columns("profile", ("profile_id", "created_at"))
+        if fields:
+            self.db.connection().execute(
+                update(profiles_table)
+                .where(profiles_table.c.profile_id == bindparam("b_profile_id"))
+                .values({name: bindparam(f"b_{name}") for name in fields}),
+                [
+                    {f"b_{name}": profile.get(name) for name in ["profile_id", *fields]}
+                    for profile, _ in merged
+                ],
+            )
+
+        existing: Dict[tuple, int] = {}
+        for row in self.db.execute(
+            select(coords_table.c.id, coords_table.c.profile_id, coords_table.c.element_type)
+            .where(coords_table.c.profile_id.in_(merged_ids))
+            .order_by(coords_table.c.id)
+        ):
+            existing.setdefault((row.profile_id, row.element_type), row.id)
+
+        coord_fields = self._carried_columns("coordinate", ("element_type", "created_at", "updated_at"))
+        coord_fields.append("updated_at")
+        updates, inserts = [], []
+        for profile, coords in merged:
+            for coord in coords:
+                key = (profile["profile_id"], coord["element_type"])
+                if key in existing:
+                    params = {f"b_{name}": coord.get(name) for name in coord_fields}
+                    params["b_id"] = existing[key]
+                    params["b_updated_at"] = now
+                    updates.append(params)
+                else:
+                    inserts.append(self._coordinate_values(profile["profile_id"], coord, now))
+
+        if updates:
+            self.db.connection().execute(
+                update(coords_table)
+                .where(coords_table.c.id == bindparam("b_id"))
+                .values({name: bindparam(f"b_{name}") for name in coord_fields}),
+                updates,
+            )
+        if inserts:
+            self.db.execute(insert(coords_table), inserts)
+
+        for profile_id in merged_ids:
+            manager._record_coordinate_version(profile_id, "import")
+
+        self.summary["updated"] += len(merged)
+        self.summary["coordinates"] += len(updates) + len(inserts)
+
+
+def import_bundle(
+    stream: BinaryIO,
+    merge: bool = True,
+    chunk_size: int = 64 * 1024,
+) -> dict:
+    """
+    Import a bundle from a local file object (all or nothing)
+
+    Args:
+        stream: Binary file object positioned at the start of the bundle
+        merge: Merge into existing profiles (False = skip them)
+        chunk_size: Bytes read per feed() call
+
+    Returns:
+        Summary: profiles, created, updated, skipped, coordinates, versions
+
+    Raises:
+        BundleError: The bundle is malformed or conflicts with the database
+    """
+    importer = BundleImporter(merge=merge)
+    try:
+        while chunk := stream.read(chunk_size):
+            importer.feed(chunk)
+    except Exception:
+        importer.abort()
+        raise
+    return importer.finish()
@@ -0,0 +1,131 @@
+"""
+Progress Hub - Fan-out of automation progress events to subscribers
+
+Executors publish step-level events (from any thread); WebSocket handlers
+subscribe with bounded queues. Slow subscribers lose their oldest events
+instead of blocking publishers or growing memory.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+import asyncio
+import itertools
+import threading
+
+from loguru import logger
+
+from app.core.config import settings
+
+
+@dataclass
+class Subscription:
+    """A subscriber's event queue, optionally filtered to one job"""
+
+    subscription_id: int
+    queue: asyncio.Queue
+    loop: asyncio.AbstractEventLoop
+    job_id: Optional[str] = None
+    dropped: int = 0
+    _closed: bool = field(default=False, repr=False)
+
+    async def get(self) -> dict:
+        """Wait for the next event"""
+        return await self.queue.get()
+
+
+class ProgressHub:
+    """
+    Thread-safe publish/subscribe hub for job progress events
+    """
+
+    def __init__(self, queue_size: int = settings.PROGRESS_QUEUE_SIZE):
+        """
+        Initialize hub
+
+        Args:
+            queue_size: Maximum buffered events per subscriber
+        """
+        self.queue_size = queue_size
+        self._subscriptions: Dict[int, Subscription] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def subscribe(self, job_id: Optional[str] = None) -> Subscription:
+        """
+        Subscribe to progress events (call from the event loop)
+
+        Args:
+            job_id: Only receive events for this job (None = all jobs)
+
+        Returns:
+            Subscription to read events from
+        """
+        subscription = Subscription(
+            subscription_id=next(self._ids),
+            queue=asyncio.Queue(maxsize=self.queue_size),
+            loop=asyncio.get_running_loop(),
+            job_id=job_id,
+        )
+        with self._lock:
+            self._subscriptions[subscription.subscription_id] = subscription
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Remove a subscription"""
+        subscription._closed = True
+        with self._lock:
+            self._subscriptions.pop(subscription.subscription_id, None)
+
+        if subscription.dropped:
+            logger.warning(
+                f"Progress subscriber {subscription.subscription_id} "
+                f"dropped {subscription.dropped} events"
+            )
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscriptions)
+
+    def publish(self, event: dict):
+        """
+        Publish an event to all matching subscribers (safe from any thread)
+
+        Args:
+            event: Event dictionary (must contain "job_id")
+        """
+        with self._lock:
+            targets = [
+                subscription
+                for subscription in self._subscriptions.values()
+                if subscription.job_id is None or subscription.job_id == event.get("job_id")
+            ]
+
+        for subscription in targets:
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+
+            if running is subscription.loop:
+                self._deliver(subscription, event)
+            elif not subscription.loop.is_closed():
+                subscription.loop.call_soon_threadsafe(self._deliver, subscription, event)
+
+    @staticmethod
+    def _deliver(subscription: Subscription, event: dict):
+        if subscription._closed:
+            return
+        if subscription.queue.full():
+            # Drop the oldest event so the newest state always gets through
+            subscription.queue.get_nowait()
+            subscription.dropped += 1
+        subscription.queue.put_nowait(event)
+
+
+# Global hub shared by the job manager and API endpoints
+_progress_hub = ProgressHub()
+
+
+def get_progress_hub() -> ProgressHub:
+    """Get the global progress hub"""
+    return _progress_hub
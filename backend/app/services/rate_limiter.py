@@ -0,0 +1,182 @@
+"""
+Rate Limiter - Token buckets pacing postings per device, profile and account
+
+Naver throttles accounts that publish too fast, so every job must take one
+token from each bucket that applies to it (device serial, device profile
+and, when known, the logged-in blog account) before it starts. Queued jobs
+that find a bucket empty are held by the scheduler until a token refills.
+Synchronous postings cannot wait that long inside an HTTP request, so they
+take their tokens up front with try_acquire() and are rejected with
+RateLimited (429 Retry-After) instead.
+"""
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+import asyncio
+import time
+
+from loguru import logger
+
+from app.core.config import settings
+
+
+@dataclass
+class TokenBucket:
+    """
+    Classic token bucket
+
+    Holds up to `capacity` tokens and refills `rate_per_hour` tokens per hour.
+    A zero rate disables the bucket (always available).
+    """
+
+    rate_per_hour: float
+    capacity: float
+    tokens: float = field(init=False)
+    updated: float = field(init=False)
+
+    def __post_init__(self):
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate_per_hour > 0
+
+    def _refill(self, now: float):
+        elapsed = max(0.0, now - self.updated)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate_per_hour / 3600)
+        self.updated = now
+
+    def wait_time(self, now: Optional[float] = None) -> float:
+        """Seconds until one token is available (0 = available now)"""
+        if not self.enabled:
+            return 0.0
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) * 3600 / self.rate_per_hour
+
+    def consume(self, now: Optional[float] = None):
+        """Take one token (caller checked wait_time() == 0)"""
+        if not self.enabled:
+            return
+        self._refill(time.monotonic() if now is None else now)
+        self.tokens -= 1
+
+
+class RateLimited(Exception):
+    """A posting would have to wait for a rate-limit token"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limited, retry after {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+BucketKey = Tuple[str, str]  # (scope, id), scope: device | profile | account
+
+
+class RateLimiter:
+    """
+    Token buckets per device serial, profile and blog account
+
+    Buckets are created lazily from RATE_LIMIT_* settings. acquire() runs on
+    the event loop; checking and consuming every bucket happens without
+    awaiting, so a job takes all its tokens at once or none of them.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None):
+        """
+        Initialize rate limiter
+
+        Args:
+            limits: scope -> (rate per hour, burst) (default: from settings)
+        """
+        self.limits = limits or {
+            "device": (settings.RATE_LIMIT_DEVICE_PER_HOUR, settings.RATE_LIMIT_DEVICE_BURST),
+            "profile": (settings.RATE_LIMIT_PROFILE_PER_HOUR, settings.RATE_LIMIT_PROFILE_BURST),
+            "account": (settings.RATE_LIMIT_ACCOUNT_PER_HOUR, settings.RATE_LIMIT_ACCOUNT_BURST),
+        }
+        self._buckets: Dict[BucketKey, TokenBucket] = {}
+
+    @staticmethod
+    def keys_for(
+        device_id: str, profile_id: Optional[str] = None, account_id: Optional[str] = None
+    ) -> List[BucketKey]:
+        """Bucket keys that apply to a posting"""
+        keys = [("device", device_id)]
+        if profile_id:
+            keys.append(("profile", profile_id))
+        if account_id:
+            keys.append(("account", account_id))
+        return keys
+
+    def bucket(self, key: BucketKey) -> TokenBucket:
+        """Get or create the bucket for a key"""
+        if key not in self._buckets:
+            rate, burst = self.limits.get(key[0], (0.0, 1.0))
+            self._buckets[key] = TokenBucket(rate_per_hour=rate, capacity=max(1.0, burst))
+        return self._buckets[key]
+
+    def try_acquire(self, keys: List[BucketKey]) -> float:
+        """
+        Take one token from every bucket, or none if any is empty
+
+        Args:
+            keys: Bucket keys (see keys_for)
+
+        Returns:
+            0.0 if acquired, otherwise seconds until all buckets have a token
+        """
+        now = time.monotonic()
+        buckets = [self.bucket(key) for key in keys]
+        wait = max((bucket.wait_time(now) for bucket in buckets), default=0.0)
+        if wait > 0:
+            return wait
+        for bucket in buckets:
+            bucket.consume(now)
+        return 0.0
+
+    async def acquire(
+        self,
+        keys: List[BucketKey],
+        on_wait: Optional[Callable[[float], None]] = None,
+    ):
+        """
+        Wait until every bucket has a token, then take them
+
+        Args:
+            keys: Bucket keys (see keys_for)
+            on_wait: Called with the expected wait before each hold
+        """
+        while True:
+            wait = self.try_acquire(keys)
+            if wait <= 0:
+                return
+            if on_wait:
+                on_wait(wait)
+            logger.debug(f"Rate limited {keys}: holding for {wait:.1f}s")
+            await asyncio.sleep(wait)
+
+    def snapshot(self) -> List[dict]:
+        """Current state of all buckets (for the API)"""
+        now = time.monotonic()
+        return [
+            {
+                "scope": scope,
+                "key": key,
+                "rate_per_hour": bucket.rate_per_hour,
+                "capacity": bucket.capacity,
+                "tokens": round(bucket.tokens, 3),
+                "wait_seconds": round(bucket.wait_time(now), 1),
+            }
+            for (scope, key), bucket in self._buckets.items()
+            if bucket.enabled
+        ]
+
+
+# Global rate limiter
+_rate_limiter = RateLimiter()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the global rate limiter"""
+    return _rate_limiter
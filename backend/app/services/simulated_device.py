@@ -0,0 +1,375 @@
+"""
+Simulated Device - In-process fake Android device for load testing
+
+Implements the DeviceBackend interface with:
+- Configurable resolution and device properties
+- Latency distributions for shell, tap and screencap
+- A synthetic framebuffer that changes on every tap (app launch and
+  BACK return to the app's start screen)
+- Clipboard, foreground app and file storage state
+- Share and copy-URL buttons: tapping share, then copy URL puts a
+  fake mobile blog post URL on the clipboard like the real app
+- Random and deterministic failure injection
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+import math
+import random
+import re
+import shlex
+import threading
+import time
+
+from adbutils import AdbError
+from PIL import Image, ImageDraw
+
+from app.core.config import settings
+from app.core.ui_elements import get_element_by_type
+from app.models.coordinate import UIElementType
+from app.services.device_backend import DeviceBackend
+
+
+@dataclass(frozen=True)
+class LatencyDistribution:
+    """
+    Log-normal latency with a given mean and standard deviation
+
+    Log-normal keeps samples positive and gives the long right tail that
+    real ADB round trips have.
+    """
+
+    mean_ms: float
+    stddev_ms: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one latency sample in seconds"""
+        if self.mean_ms <= 0:
+            return 0.0
+        if self.stddev_ms <= 0:
+            return self.mean_ms / 1000.0
+
+        variance = (self.stddev_ms / self.mean_ms) ** 2
+        sigma = math.sqrt(math.log1p(variance))
+        mu = math.log(self.mean_ms) - sigma**2 / 2
+        return rng.lognormvariate(mu, sigma) / 1000.0
+
+    @classmethod
+    def from_setting(cls, value: tuple[float, float]) -> "LatencyDistribution":
+        """Build from a (mean_ms, stddev_ms) settings tuple"""
+        mean_ms, stddev_ms = value
+        return cls(mean_ms=mean_ms, stddev_ms=stddev_ms)
+
+
+# Called after every tap: (device, x, y)
+TapHook = Callable[["SimulatedDevice", int, int], None]
+
+
+class SimulatedDevice(DeviceBackend):
+    """
+    Thread-safe fake device that understands the shell commands ADBController sends
+    """
+
+    def __init__(
+        self,
+        serial: str,
+        width: int = settings.SIM_WIDTH,
+        height: int = settings.SIM_HEIGHT,
+        dpi: int = settings.SIM_DPI,
+        model: str = "CareOn Simulator",
+        manufacturer: str = "CareOn",
+        android_version: str = "13",
+        shell_latency: Optional[LatencyDistribution] = None,
+        tap_latency: Optional[LatencyDistribution] = None,
+        screencap_latency: Optional[LatencyDistribution] = None,
+        failure_rate: float = settings.SIM_FAILURE_RATE,
+        seed: Optional[int] = None,
+    ):
+        """
+        Initialize simulated device
+
+        Args:
+            serial: Device serial
+            width: Screen width in pixels
+            height: Screen height in pixels
+            dpi: Screen density
+            model: ro.product.model
+            manufacturer: ro.product.manufacturer
+            android_version: ro.build.version.release
+            shell_latency: Latency of generic shell commands
+            tap_latency: Latency of input tap/swipe/keyevent
+            screencap_latency: Latency of screenshot capture
+            failure_rate: Probability (0.0 ~ 1.0) that any operation fails
+            seed: Random seed for reproducible runs
+        """
+        self.serial = serial
+        self.width = width
+        self.height = height
+        self.dpi = dpi
+        self.model = model
+        self.manufacturer = manufacturer
+        self.android_version = android_version
+
+        self.shell_latency = shell_latency or LatencyDistribution.from_setting(
+            settings.SIM_SHELL_LATENCY_MS
+        )
+        self.tap_latency = tap_latency or LatencyDistribution.from_setting(
+            settings.SIM_TAP_LATENCY_MS
+        )
+        self.screencap_latency = screencap_latency or LatencyDistribution.from_setting(
+            settings.SIM_SCREENCAP_LATENCY_MS
+        )
+        self.failure_rate = failure_rate
+
+        self.clipboard = ""
+        self.foreground_package: Optional[str] = None
+        self.files: Dict[str, bytes] = {}
+        self.tap_count = 0
+        self.tap_hooks: List[TapHook] = []
+        self.disconnected = False
+
+        # Share flow buttons start at their default positions (see place_element)
+        self.button_radius = max(20, width // 20)
+        self.buttons: Dict[UIElementType, tuple[int, int]] = {
+            element_type: get_element_by_type(element_type).default_position(width, height)
+            for element_type in (UIElementType.SHARE_BUTTON, UIElementType.COPY_URL_BUTTON)
+        }
+        self.share_menu_open = False
+        self.post_count = 0
+
+        self._forced_failures = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        self._framebuffer = Image.new("RGB", (width, height), self._screen_color(0))
+
+    def place_element(self, element_type: UIElementType, x: int, y: int):
+        """Move a share flow button (e.g. to a profile's calibrated coordinate)"""
+        with self._lock:
+            self.buttons[element_type] = (x, y)
+
+    # Failure injection
+
+    def fail_next(self, count: int = 1):
+        """Make the next `count` operations fail deterministically"""
+        with self._lock:
+            self._forced_failures += count
+
+    def _maybe_fail(self, operation: str):
+        with self._lock:
+            if self.disconnected:
+                raise AdbError(f"device '{self.serial}' not found")
+            if self._forced_failures > 0:
+                self._forced_failures -= 1
+                raise AdbError(f"Injected failure: {operation}")
+            if self.failure_rate and self._rng.random() < self.failure_rate:
+                raise AdbError(f"Injected random failure: {operation}")
+
+    def _delay(self, latency: LatencyDistribution, timeout: Optional[float]):
+        with self._lock:
+            seconds = latency.sample(self._rng)
+        if timeout is not None and seconds > timeout:
+            time.sleep(timeout)
+            raise AdbError(f"Command timed out after {timeout}s")
+        time.sleep(seconds)
+
+    # DeviceBackend interface
+
+    def shell(self, command: str, timeout: Optional[float] = None) -> str:
+        is_input = command.startswith("input ")
+        self._delay(self.tap_latency if is_input else self.shell_latency, timeout)
+        self._maybe_fail(command)
+
+        outputs = [self._execute(args) for args in self._split_commands(command)]
+        return "\n".join(output for output in outputs if output)
+
+    def screenshot(self) -> Image.Image:
+        self._delay(self.screencap_latency, None)
+        self._maybe_fail("screencap")
+        with self._lock:
+            return self._framebuffer.copy()
+
+    def push(self, local_path: str, remote_path: str):
+        self._delay(self.shell_latency, None)
+        self._maybe_fail(f"push {remote_path}")
+        with open(local_path, "rb") as f:
+            data = f.read()
+        with self._lock:
+            self.files[remote_path] = data
+
+    # Shell emulation
+
+    @staticmethod
+    def _split_commands(command: str) -> List[List[str]]:
+        """Tokenize a shell line into ';'-separated commands (quotes respected)"""
+        lexer = shlex.shlex(command, posix=True, punctuation_chars=";")
+        lexer.whitespace_split = True
+
+        commands: List[List[str]] = [[]]
+        for token in lexer:
+            if token == ";":
+                commands.append([])
+            elif token != "2>/dev/null":
+                commands[-1].append(token)
+        return [args for args in commands if args]
+
+    def _execute(self, args: List[str]) -> str:
+        if args[0] == "echo":
+            return " ".join(args[1:])
+        if args[0] == "getprop":
+            return self._getprop(args[1] if len(args) > 1 else "")
+        if args[:2] == ["wm", "size"]:
+            return f"Physical size: {self.width}x{self.height}"
+        if args[:2] == ["wm", "density"]:
+            return f"Physical density: {self.dpi}"
+        if args[0] == "input":
+            return self._input(args[1:])
+        if args[:3] == ["cmd", "clipboard", "set"]:
+            with self._lock:
+                self.clipboard = " ".join(args[3:])
+            return ""
+        if args[:3] == ["cmd", "clipboard", "get"]:
+            with self._lock:
+                return self.clipboard
+        if args[0] == "monkey" and "-p" in args:
+            return self._launch(args[args.index("-p") + 1])
+        if args[:2] == ["am", "start"] and "-n" in args:
+            return self._launch(args[args.index("-n") + 1].split("/")[0])
+        if args[:2] == ["am", "force-stop"]:
+            with self._lock:
+                if self.foreground_package == args[2]:
+                    self.foreground_package = None
+            return ""
+        if args[:2] == ["dumpsys", "window"]:
+            with self._lock:
+                package = self.foreground_package or "com.android.launcher3"
+            return f"mCurrentFocus=Window{{0 u0 {package}/.MainActivity}}"
+        if args[0] == "ls":
+            return self._ls(args[-1])
+        if args[0] in ("mkdir", "touch", "am"):
+            return ""
+
+        return ""
+
+    def _getprop(self, name: str) -> str:
+        return {
+            "ro.product.model": self.model,
+            "ro.product.manufacturer": self.manufacturer,
+            "ro.build.version.release": self.android_version,
+            "ro.build.version.sdk": "33",
+        }.get(name, "")
+
+    def _input(self, args: List[str]) -> str:
+        if args and args[0] == "tap" and len(args) >= 3:
+            self._on_tap(int(float(args[1])), int(float(args[2])))
+        elif args and args[0] == "keyevent":
+            with self._lock:
+                if args[1:] and args[1] == "3":  # HOME
+                    self.foreground_package = None
+                elif args[1:] and args[1] == "4" and self.foreground_package:  # BACK
+                    self._show_start_screen()
+        return ""
+
+    def _launch(self, package: str) -> str:
+        with self._lock:
+            self.foreground_package = package
+            self._show_start_screen()
+        return ""
+
+    def _ls(self, remote_dir: str) -> str:
+        prefix = remote_dir.rstrip("/") + "/"
+        with self._lock:
+            names = [
+                path[len(prefix):]
+                for path in self.files
+                if path.startswith(prefix) and "/" not in path[len(prefix):]
+            ]
+        return "\n".join(sorted(names))
+
+    # Share flow
+
+    def _hits(self, element_type: UIElementType, x: int, y: int) -> bool:
+        bx, by = self.buttons[element_type]
+        return abs(x - bx) <= self.button_radius and abs(y - by) <= self.button_radius
+
+    def _press_buttons(self, x: int, y: int):
+        """Copy URL in the open share menu puts the post URL on the clipboard"""
+        if self.share_menu_open and self._hits(UIElementType.COPY_URL_BUTTON, x, y):
+            self.post_count += 1
+            blog_id = self.serial.replace("-", "")
+            self.clipboard = f"https://m.blog.naver.com/{blog_id}/{223000000000 + self.post_count}"
+        self.share_menu_open = self._hits(UIElementType.SHARE_BUTTON, x, y)
+
+    # Synthetic framebuffer
+
+    @staticmethod
+    def _screen_color(index: int) -> tuple[int, int, int]:
+        return ((index * 53) % 256, (index * 97) % 256, (index * 151) % 256)
+
+    def _show_start_screen(self):
+        """Paint the app main screen: white with a green header"""
+        self._framebuffer.paste((255, 255, 255), (0, 0, self.width, self.height))
+        self._framebuffer.paste((3, 199, 90), (0, 0, self.width, self.height // 4))
+
+    def _on_tap(self, x: int, y: int):
+        with self._lock:
+            self.tap_count += 1
+            # Every tap "navigates" to a new screen with a visible tap marker
+            self._framebuffer.paste(
+                self._screen_color(self.tap_count), (0, 0, self.width, self.height)
+            )
+            draw = ImageDraw.Draw(self._framebuffer)
+            radius = max(8, self.width // 40)
+            draw.ellipse(
+                (x - radius, y - radius, x + radius, y + radius), fill=(255, 255, 255)
+            )
+            self._press_buttons(x, y)
+            hooks = list(self.tap_hooks)
+
+        for hook in hooks:
+            hook(self, x, y)
+
+
+# Registry of simulated devices (state survives across ADBController instances)
+_simulated_devices: Dict[str, SimulatedDevice] = {}
+_registry_lock = threading.Lock()
+
+
+def list_simulated_serials() -> List[str]:
+    """List serials of the configured simulated device fleet"""
+    with _registry_lock:
+        configured = [f"sim-{i:04d}" for i in range(1, settings.SIM_DEVICE_COUNT + 1)]
+        extra = [serial for serial in _simulated_devices if serial not in configured]
+    return configured + sorted(extra)
+
+
+def get_simulated_device(serial: str) -> SimulatedDevice:
+    """
+    Get (or create) the simulated device for a serial
+
+    Args:
+        serial: Device serial
+
+    Returns:
+        SimulatedDevice instance
+
+    Raises:
+        AdbError: If the serial is not part of the simulated fleet
+    """
+    with _registry_lock:
+        device = _simulated_devices.get(serial)
+        if device is None:
+            if not re.fullmatch(r"sim-\d{4}", serial):
+                raise AdbError(f"device '{serial}' not found")
+            device = _simulated_devices[serial] = SimulatedDevice(serial)
+        return device
+
+
+def register_simulated_device(device: SimulatedDevice):
+    """Register a custom-configured simulated device (replaces existing serial)"""
+    with _registry_lock:
+        _simulated_devices[device.serial] = device
+
+
+def reset_simulated_devices():
+    """Drop all simulated device state"""
+    with _registry_lock:
+        _simulated_devices.clear()
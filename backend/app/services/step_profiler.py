@@ -0,0 +1,111 @@
+"""
+Step Profiler - Per-step time breakdown for automation runs
+
+Splits the wall time of each posting step into:
+- sleep: deliberate waits (tap delays, paste settles)
+- io: time blocked on the device backend (shell, screencap, push)
+- cpu: host CPU time of the executing thread
+- other: remainder (scheduling, GIL contention, waiting on other threads)
+"""
+from dataclasses import dataclass, asdict
+from typing import Callable, List, Optional
+import threading
+import time
+
+
+@dataclass
+class StepTiming:
+    """Time breakdown of a single step (seconds)"""
+
+    name: str
+    wall: float = 0.0
+    sleep: float = 0.0
+    io: float = 0.0
+    cpu: float = 0.0
+
+    @property
+    def other(self) -> float:
+        return max(0.0, self.wall - self.sleep - self.io - self.cpu)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["other"] = self.other
+        return data
+
+
+class StepProfiler:
+    """
+    Lightweight step profiler shared by BlogPostingAutomator and ADBController
+
+    Only the thread that started the current step is accounted, so
+    background work (e.g. image uploads) does not skew step timings.
+    """
+
+    def __init__(self, sleep_scale: float = 1.0):
+        """
+        Initialize profiler
+
+        Args:
+            sleep_scale: Multiplier applied to deliberate sleeps
+                (benchmark/load-test knob, 1.0 = real timing)
+        """
+        self.sleep_scale = sleep_scale
+        self.steps: List[StepTiming] = []
+        self._current: Optional[StepTiming] = None
+        self._owner: Optional[int] = None
+        self._wall_start = 0.0
+        self._cpu_start = 0.0
+
+    def reset(self):
+        """Drop all recorded steps (start of a new run)"""
+        self.steps = []
+        self._current = None
+        self._owner = None
+
+    def begin(self, name: str):
+        """Finish the current step (if any) and start a new one"""
+        self.finish()
+        self._current = StepTiming(name=name)
+        self._owner = threading.get_ident()
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.thread_time()
+
+    def finish(self):
+        """Finish the current step"""
+        if self._current is None:
+            return
+        self._current.wall = time.perf_counter() - self._wall_start
+        self._current.cpu = time.thread_time() - self._cpu_start
+        self.steps.append(self._current)
+        self._current = None
+        self._owner = None
+
+    def _accounted(self) -> Optional[StepTiming]:
+        if self._current is not None and threading.get_ident() == self._owner:
+            return self._current
+        return None
+
+    def add_io(self, wall: float, cpu: float = 0.0):
+        """
+        Account time spent inside a device backend call
+
+        Args:
+            wall: Wall time of the call
+            cpu: Host CPU time used during the call (kept in the cpu bucket)
+        """
+        step = self._accounted()
+        if step is not None:
+            step.io += max(0.0, wall - cpu)
+
+    def sleep(self, seconds: float, sleeper: Callable[[float], None] = time.sleep):
+        """Sleep (scaled) and account it to the current step"""
+        start = time.perf_counter()
+        try:
+            sleeper(seconds * self.sleep_scale)
+        finally:
+            step = self._accounted()
+            if step is not None:
+                step.sleep += time.perf_counter() - start
+
+    def to_list(self) -> List[dict]:
+        return [step.to_dict() for step in self.steps]
@@ -0,0 +1,184 @@
+"""
+Coordinate Usage Statistics Service - Batched write-back of tap outcomes
+
+Tap outcomes are accumulated in memory on the automation hot path and
+flushed to the database as aggregated deltas by a background task, so
+postings never wait on a SQLite commit per tap.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional
+import asyncio
+import threading
+
+from sqlalchemy import bindparam, func, update
+from loguru import logger
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.coordinate import CoordinateConfig
+
+
+@dataclass
+class UsageDelta:
+    """Pending usage counters for a single coordinate"""
+
+    success: int = 0
+    fail: int = 0
+    last_used_at: Optional[datetime] = None
+
+
+class CoordinateUsageRecorder:
+    """
+    In-memory accumulator for coordinate usage statistics
+
+    - record() is O(1), lock-protected and never touches the database
+    - flush() writes all pending deltas in one executemany UPDATE
+    - start()/stop() manage the periodic background flush task
+    """
+
+    def __init__(self, flush_interval: float = settings.USAGE_STATS_FLUSH_INTERVAL):
+        """
+        Initialize usage recorder
+
+        Args:
+            flush_interval: Seconds between background flushes
+        """
+        self.flush_interval = flush_interval
+        self._pending: Dict[int, UsageDelta] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, coord_id: int, success: bool = True):
+        """
+        Record a single tap outcome
+
+        Args:
+            coord_id: CoordinateConfig ID
+            success: Whether the tap succeeded
+        """
+        with self._lock:
+            delta = self._pending.get(coord_id)
+            if delta is None:
+                delta = self._pending[coord_id] = UsageDelta()
+            if success:
+                delta.success += 1
+            else:
+                delta.fail += 1
+            delta.last_used_at = datetime.utcnow()
+
+    @property
+    def pending_count(self) -> int:
+        """Number of coordinates with unflushed deltas"""
+        with self._lock:
+            return len(self._pending)
+
+    def _swap_pending(self) -> Dict[int, UsageDelta]:
+        """Atomically take ownership of all pending deltas"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def _restore_pending(self, pending: Dict[int, UsageDelta]):
+        """Merge deltas back after a failed flush so no outcome is lost"""
+        with self._lock:
+            for coord_id, delta in pending.items():
+                current = self._pending.setdefault(coord_id, UsageDelta())
+                current.success += delta.success
+                current.fail += delta.fail
+                if current.last_used_at is None or (
+                    delta.last_used_at and delta.last_used_at > current.last_used_at
+                ):
+                    current.last_used_at = delta.last_used_at
+
+    def flush(self) -> int:
+        """
+        Write all pending deltas to the database in a single transaction
+
+        Returns:
+            Number of coordinates updated
+        """
+        with self._flush_lock:
+            pending = self._swap_pending()
+            if not pending:
+                return 0
+
+            params = [
+                {
+                    "b_id": coord_id,
+                    "b_usage": delta.success + delta.fail,
+                    "b_success": delta.success,
+                    "b_fail": delta.fail,
+                    "b_last_used_at": delta.last_used_at,
+                }
+                for coord_id, delta in pending.items()
+            ]
+
+            table = CoordinateConfig.__table__
+            stmt = (
+                update(table)
+                .where(table.c.id == bindparam("b_id"))
+                .values(
+                    usage_count=func.coalesce(table.c.usage_count, 0)
+                    + bindparam("b_usage"),
+                    success_count=func.coalesce(table.c.success_count, 0)
+                    + bindparam("b_success"),
+                    fail_count=func.coalesce(table.c.fail_count, 0)
+                    + bindparam("b_fail"),
+                    last_used_at=bindparam("b_last_used_at"),
+                )
+            )
+
+            db = SessionLocal()
+            try:
+                db.connection().execute(stmt, params)
+                db.commit()
+                logger.debug(f"Flushed usage stats for {len(params)} coordinates")
+                return len(params)
+
+            except Exception as e:
+                logger.error(f"Failed to flush usage stats: {e}")
+                db.rollback()
+                self._restore_pending(pending)
+                return 0
+
+            finally:
+                db.close()
+
+    async def _flush_loop(self):
+        """Periodically flush pending deltas off the event loop"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self.pending_count:
+                await asyncio.to_thread(self.flush)
+
+    def start(self):
+        """Start the background flush task (call from a running event loop)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop())
+            logger.info(
+                f"Coordinate usage recorder started (flush every {self.flush_interval}s)"
+            )
+
+    async def stop(self):
+        """Stop the background task and flush everything that is still pending"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        flushed = await asyncio.to_thread(self.flush)
+        logger.info(f"Coordinate usage recorder stopped ({flushed} coordinates flushed)")
+
+
+# Global recorder shared by all automation runs
+_usage_recorder = CoordinateUsageRecorder()
+
+
+def get_usage_recorder() -> CoordinateUsageRecorder:
+    """Get the global coordinate usage recorder"""
+    return _usage_recorder
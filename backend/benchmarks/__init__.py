@@ -0,0 +1 @@
+"""Benchmark harnesses (run from the backend directory: python -m benchmarks.<name>)"""
@@ -0,0 +1,267 @@
+"""
+Concurrent SQLite read/write benchmark for the engine tuning profile
+
+Runs the same mixed workload against a default engine (rollback journal,
+synchronous=FULL, no mmap) and a tuned engine (create_db_engine defaults),
+optionally also against a server database (--server-url, e.g. an empty
+scratch PostgreSQL database whose tables are dropped afterwards), and
+writes a machine-readable JSON report:
+- reader threads list profiles with coordinate stats (API hot path)
+- writer threads flush coordinate usage deltas (usage_stats write-back)
+- ops/s, p50/p95/p99 latency and lock errors per side
+
+Usage (from backend/):
+    python -m benchmarks.db_benchmark --readers 8 --writers 2 --seconds 10
+    python -m benchmarks.db_benchmark --profiles 200 -o db-bench.json
+    python -m benchmarks.db_benchmark --server-url postgresql://careon@localhost/careon_bench
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from benchmarks.posting_benchmark import distribution, git_commit
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="CareOn database engine benchmark")
+    parser.add_argument("--readers", type=int, default=8, help="Reader threads")
+    parser.add_argument("--writers", type=int, default=2, help="Writer threads")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Duration per engine")
+    parser.add_argument("--profiles", type=int, default=100, help="Seeded device profiles")
+    parser.add_argument("--page", type=int, default=100, help="Profiles per list query")
+    parser.add_argument("--batch", type=int, default=20, help="Coordinates per write")
+    parser.add_argument(
+        "--server-url",
+        default=None,
+        help="Also run against this empty scratch database (tables are dropped afterwards)",
+    )
+    parser.add_argument("-o", "--output", default=None, help="Write JSON report to file")
+    return parser.parse_args(argv)
+
+
+def seed(engine, profiles: int) -> List[int]:
+    """Create profiles with default coordinates, returns coordinate ids"""
+    from sqlalchemy.orm import sessionmaker
+
+    from app.core.database import Base
+    from app.core.ui_elements import get_default_coordinates
+    from app.models.coordinate import CalibrationMethod, CoordinateConfig
+    from app.models.device import Device, DeviceProfile
+
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        for index in range(profiles):
+            width, height = 1080, 2000 + index
+            profile = DeviceProfile(
+                profile_id=DeviceProfile.generate_profile_id("Bench", width, height),
+                model="Bench",
+                manufacturer="CareOn",
+                android_version="13",
+                width=width,
+                height=height,
+                dpi=420,
+                devices=[Device(serial=f"bench-{index:04d}")],
+            )
+            db.add(profile)
+            for coord in get_default_coordinates(width, height):
+                db.add(
+                    CoordinateConfig(
+                        profile_id=profile.profile_id,
+                        element_type=coord["element_type"],
+                        element_name=coord["element_name"],
+                        x=coord["x"],
+                        y=coord["y"],
+                        calibration_method=CalibrationMethod.DEFAULT,
+                    )
+                )
+        db.commit()
+        return [row.id for row in db.query(CoordinateConfig.id).all()]
+    finally:
+        db.close()
+
+
+def run_workload(engine, coord_ids: List[int], args: argparse.Namespace) -> dict:
+    """Run readers and writers concurrently for args.seconds"""
+    from sqlalchemy import bindparam, func, update
+    from sqlalchemy.orm import sessionmaker
+
+    from app.models.coordinate import CoordinateConfig
+    from app.services.device_manager import DeviceManager
+
+    Session = sessionmaker(bind=engine)
+    table = CoordinateConfig.__table__
+    write_stmt = (
+        update(table)
+        .where(table.c.id == bindparam("b_id"))
+        .values(
+            usage_count=func.coalesce(table.c.usage_count, 0) + 1,
+            success_count=func.coalesce(table.c.success_count, 0) + 1,
+            last_used_at=bindparam("b_last_used_at"),
+        )
+    )
+
+    latencies = {"read": [], "write": []}
+    errors = {"read": 0, "write": 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            db = Session()
+            started = time.perf_counter()
+            try:
+                offset = random.randrange(max(1, args.profiles - args.page + 1))
+                DeviceManager(db).list_profiles_with_stats(skip=offset, limit=args.page)
+                ok = True
+            except Exception:
+                ok = False
+            finally:
+                db.close()
+            record("read", ok, time.perf_counter() - started)
+
+    def writer():
+        while not stop.is_set():
+            db = Session()
+            started = time.perf_counter()
+            try:
+                now = datetime.utcnow()
+                params = [
+                    {"b_id": coord_id, "b_last_used_at": now}
+                    for coord_id in random.sample(coord_ids, args.batch)
+                ]
+                db.connection().execute(write_stmt, params)
+                db.commit()
+                ok = True
+            except Exception:
+                db.rollback()
+                ok = False
+            finally:
+                db.close()
+            record("write", ok, time.perf_counter() - started)
+
+    def record(kind: str, ok: bool, elapsed: float):
+        with lock:
+            if ok:
+                latencies[kind].append(elapsed * 1000)
+            else:
+                errors[kind] += 1
+
+    threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+    threads += [threading.Thread(target=writer) for _ in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    return {
+        kind: {
+            "ops_per_second": len(latencies[kind]) / args.seconds,
+            "errors": errors[kind],
+            "latency_ms": distribution(latencies[kind]),
+        }
+        for kind in ("read", "write")
+    }
+
+
+def run_engine(
+    label: str,
+    args: argparse.Namespace,
+    database_url: Optional[str] = None,
+    **engine_options,
+) -> dict:
+    from app.core.database import Base, create_db_engine, sqlite_pragmas
+
+    if database_url is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix=f"careon-db-{label}-"), "bench.db")
+        database_url = f"sqlite:///{db_path}"
+        scratch_server = False
+    else:
+        scratch_server = True
+    engine = create_db_engine(
+        database_url,
+        echo=False,
+        pool_size=args.readers + args.writers,
+        **engine_options,
+    )
+    try:
+        coord_ids = seed(engine, args.profiles)
+        result = run_workload(engine, coord_ids, args)
+        result["dialect"] = engine.dialect.name
+        result["pragmas"] = sqlite_pragmas(engine)
+        return result
+    finally:
+        if scratch_server:
+            Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    os.environ.setdefault("DEBUG", "False")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("LOG_FILE", "")
+
+    from loguru import logger
+
+    logger.remove()
+    logger.add(sys.stderr, level=os.environ["LOG_LEVEL"])
+
+    baseline = run_engine("default", args, wal=False, synchronous="FULL", mmap_size=0)
+    tuned = run_engine("tuned", args)
+    server = run_engine("server", args, database_url=args.server_url) if args.server_url else None
+
+    def gain(kind: str) -> float:
+        old = baseline[kind]["ops_per_second"]
+        return tuned[kind]["ops_per_second"] / old if old else 0.0
+
+    report = {
+        "meta": {
+            "git_commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "readers": args.readers,
+            "writers": args.writers,
+            "seconds": args.seconds,
+            "profiles": args.profiles,
+        },
+        "default": baseline,
+        "tuned": tuned,
+        "gain": {"read": gain("read"), "write": gain("write")},
+    }
+    if server is not None:
+        report["server"] = server
+    output = json.dumps(report, indent=2)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    print(
+        f"reads {baseline['read']['ops_per_second']:.0f} -> {tuned['read']['ops_per_second']:.0f}/s"
+        f" (x{report['gain']['read']:.2f}), "
+        f"writes {baseline['write']['ops_per_second']:.0f} -> {tuned['write']['ops_per_second']:.0f}/s"
+        f" (x{report['gain']['write']:.2f})",
+        file=sys.stderr,
+    )
+    if server is not None:
+        print(
+            f"{server['dialect']}: reads {server['read']['ops_per_second']:.0f}/s, "
+            f"writes {server['write']['ops_per_second']:.0f}/s",
+            file=sys.stderr,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,330 @@
+"""
+End-to-end posting benchmark
+
+Runs N postings against real or simulated devices and writes a
+machine-readable JSON report:
+- throughput and success rate
+- p50/p95/p99 end-to-end latency
+- per-step time split into sleep, ADB I/O, host CPU and other
+- memory high-water mark
+
+Usage (from backend/):
+    python -m benchmarks.posting_benchmark --simulated 4 --postings 40 --sleep-scale 0.05
+    python -m benchmarks.posting_benchmark --devices R3CN10ABCDE --postings 5 -o bench.json
+    python -m benchmarks.posting_benchmark --simulated 4 --compare bench.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="CareOn end-to-end posting benchmark")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--simulated", type=int, metavar="N", help="Use N simulated devices")
+    target.add_argument("--devices", nargs="+", metavar="SERIAL", help="Real device serials")
+
+    parser.add_argument("--postings", type=int, default=20, help="Total postings to run")
+    parser.add_argument("--content-chars", type=int, default=1500, help="Content length")
+    parser.add_argument("--images", nargs="*", default=None, help="Image paths per post")
+    parser.add_argument(
+        "--sleep-scale",
+        type=float,
+        default=1.0,
+        help="Multiplier for deliberate sleeps (simulated load tests only)",
+    )
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Simulator failure rate")
+    parser.add_argument("--database-url", default=None, help="Database (default: temp SQLite)")
+    parser.add_argument("--tracemalloc", action="store_true", help="Track Python heap peak")
+    parser.add_argument("-o", "--output", default=None, help="Write JSON report to file")
+    parser.add_argument("--compare", default=None, help="Baseline JSON report to compare")
+    return parser.parse_args(argv)
+
+
+def configure_environment(args: argparse.Namespace):
+    """Settings are read at import time, so configure env before importing app"""
+    if args.simulated:
+        os.environ["DEVICE_BACKEND"] = "simulated"
+        os.environ["SIM_DEVICE_COUNT"] = str(args.simulated)
+        os.environ["SIM_FAILURE_RATE"] = str(args.failure_rate)
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    elif "DATABASE_URL" not in os.environ:
+        db_path = os.path.join(tempfile.mkdtemp(prefix="careon-bench-"), "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    os.environ.setdefault("DEBUG", "False")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("LOG_FILE", "")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile: the smallest value with pct% of values at or below it"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct * len(ordered) / 100) - 1))
+    return ordered[rank]
+
+
+def distribution(values: List[float]) -> dict:
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values) if values else 0.0,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else 0.0,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def prepare_profiles(serials: List[str]) -> Dict[str, str]:
+    """Create/resolve a profile per device, returns serial -> profile_id"""
+    from app.core.database import SessionLocal, init_db
+    from app.services.adb_controller import ADBController
+    from app.services.device_manager import DeviceManager
+
+    init_db()
+    db = SessionLocal()
+    try:
+        manager = DeviceManager(db)
+        profiles = {}
+        for serial in serials:
+            controller = ADBController(serial)
+            if not controller.connect():
+                raise SystemExit(f"Cannot connect to device {serial}")
+            profile = manager.get_or_create_profile(controller.get_device_info())
+            profiles[serial] = profile.profile_id
+        return profiles
+    finally:
+        db.close()
+
+
+def install_simulator_hooks(serials: List[str], profiles: Dict[str, str]):
+    """Move simulated share/copy URL buttons to the profiles' coordinates"""
+    from app.core.database import SessionLocal
+    from app.models.coordinate import UIElementType
+    from app.services.device_manager import DeviceManager
+    from app.services.simulated_device import get_simulated_device
+
+    db = SessionLocal()
+    try:
+        manager = DeviceManager(db)
+        for serial in serials:
+            device = get_simulated_device(serial)
+            for element_type in (UIElementType.SHARE_BUTTON, UIElementType.COPY_URL_BUTTON):
+                coords = manager.get_coordinates(profiles[serial], element_type=element_type)
+                if coords:
+                    device.place_element(element_type, coords[0].x, coords[0].y)
+    finally:
+        db.close()
+
+
+def run_device(
+    serial: str,
+    profile_id: str,
+    count: int,
+    args: argparse.Namespace,
+    content: str,
+    runs: List[dict],
+    lock: threading.Lock,
+):
+    """Run `count` sequential postings on one device (devices run in parallel)"""
+    from app.core.database import SessionLocal
+    from app.services.automation_executor import BlogPostingAutomator
+    from app.services.step_profiler import StepProfiler
+
+    for index in range(count):
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            automator = BlogPostingAutomator(
+                serial,
+                profile_id,
+                db,
+                profiler=StepProfiler(sleep_scale=args.sleep_scale),
+            )
+            result = asyncio.run(
+                automator.execute_posting(
+                    title=f"Benchmark post {serial} #{index + 1}",
+                    content=content,
+                    images=args.images,
+                )
+            )
+            elapsed = time.perf_counter() - started
+        finally:
+            db.close()
+
+        with lock:
+            runs.append(
+                {
+                    "device_id": serial,
+                    "success": result.success,
+                    "failed_step": result.failed_step,
+                    "latency": elapsed,
+                    "steps": result.step_timings,
+                }
+            )
+
+
+def build_report(args, serials, runs: List[dict], wall: float) -> dict:
+    latencies = [run["latency"] for run in runs]
+    successes = sum(1 for run in runs if run["success"])
+
+    steps: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+    step_order: List[str] = []
+    for run in runs:
+        for step in run["steps"]:
+            if step["name"] not in step_order:
+                step_order.append(step["name"])
+            for key in ("wall", "sleep", "io", "cpu", "other"):
+                steps[step["name"]][key].append(step[key])
+
+    step_report = {}
+    for name in step_order:
+        buckets = steps[name]
+        step_report[name] = {
+            "count": len(buckets["wall"]),
+            "wall": distribution(buckets["wall"]),
+            **{
+                f"{key}_mean": sum(buckets[key]) / len(buckets[key])
+                for key in ("sleep", "io", "cpu", "other")
+            },
+        }
+
+    failed_steps: Dict[str, int] = defaultdict(int)
+    for run in runs:
+        if not run["success"]:
+            failed_steps[run["failed_step"] or "exception"] += 1
+
+    memory = {"max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+    if tracemalloc.is_tracing():
+        memory["tracemalloc_peak_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+
+    return {
+        "meta": {
+            "git_commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "backend": "simulated" if args.simulated else "adb",
+            "devices": len(serials),
+            "postings": len(runs),
+            "sleep_scale": args.sleep_scale,
+            "content_chars": args.content_chars,
+            "images_per_post": len(args.images or []),
+        },
+        "summary": {
+            "wall_time": wall,
+            "throughput_per_min": len(runs) / wall * 60 if wall else 0.0,
+            "success_rate": successes / len(runs) if runs else 0.0,
+            "latency": distribution(latencies),
+            "failed_steps": dict(failed_steps),
+        },
+        "steps": step_report,
+        "memory": memory,
+    }
+
+
+def compare_reports(baseline: dict, current: dict):
+    """Print relative change of the headline metrics"""
+
+    def ratio(new: float, old: float) -> str:
+        if not old:
+            return "n/a"
+        return f"{(new - old) / old * 100:+.1f}%"
+
+    rows = [
+        ("throughput/min", baseline["summary"]["throughput_per_min"], current["summary"]["throughput_per_min"]),
+        ("latency p50", baseline["summary"]["latency"]["p50"], current["summary"]["latency"]["p50"]),
+        ("latency p95", baseline["summary"]["latency"]["p95"], current["summary"]["latency"]["p95"]),
+        ("latency p99", baseline["summary"]["latency"]["p99"], current["summary"]["latency"]["p99"]),
+        ("max rss MB", baseline["memory"]["max_rss_mb"], current["memory"]["max_rss_mb"]),
+    ]
+    print(f"Comparing against {baseline['meta'].get('git_commit')}:", file=sys.stderr)
+    for label, old, new in rows:
+        print(f"  {label:<16} {old:>10.3f} -> {new:>10.3f}  ({ratio(new, old)})", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    configure_environment(args)
+
+    from loguru import logger
+
+    logger.remove()
+    logger.add(sys.stderr, level=os.environ["LOG_LEVEL"])
+
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    serials = args.devices or [f"sim-{i:04d}" for i in range(1, args.simulated + 1)]
+    profiles = prepare_profiles(serials)
+    if args.simulated:
+        install_simulator_hooks(serials, profiles)
+
+    # Distribute postings round-robin; each device runs its share sequentially
+    per_device = {serial: args.postings // len(serials) for serial in serials}
+    for serial in serials[: args.postings % len(serials)]:
+        per_device[serial] += 1
+
+    content = ("벤치마크 본문 " * (args.content_chars // 8 + 1))[: args.content_chars]
+    runs: List[dict] = []
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(
+            target=run_device,
+            args=(serial, profiles[serial], count, args, content, runs, lock),
+            name=f"bench-{serial}",
+        )
+        for serial, count in per_device.items()
+        if count
+    ]
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    report = build_report(args, serials, runs, wall)
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare_reports(json.load(f), report)
+
+    return 0 if runs else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,8 +8,16 @@ from loguru import logger
 import sys
 
 from app.core.config import settings
-from app.core.database import Base, engine, init_db
+from app.core.database import Base, SessionLocal, engine, init_db
+from app.core.ui_elements import precompute_default_coordinates
 from app.api.v1 import devices, calibration, automation
+from app.services.calibration_sessions import get_session_store
+from app.services.device_executor import get_device_executors
+from app.services.device_manager import DeviceManager
+from app.services.device_workers import get_worker_supervisor
+from app.services.image_pipeline import shutdown_image_process_pool
+from app.services.job_manager import get_job_manager
+from app.services.usage_stats import get_usage_recorder
 
 # Configure logging
 logger.remove()
@@ -84,6 +92,26 @@ async def startup_event():
     init_db()
     logger.info("✅ Database initialized")
 
+    # Import legacy device lists, precompute default coordinates for known
+    # screen resolutions
+    db = SessionLocal()
+    try:
+        manager = DeviceManager(db)
+        imported = manager.import_legacy_device_ids()
+        if imported:
+            logger.info(f"📱 Imported {imported} devices from legacy profile device lists")
+        resolutions = settings.KNOWN_RESOLUTIONS + manager.get_known_resolutions()
+    finally:
+        db.close()
+    count = precompute_default_coordinates(resolutions)
+    logger.info(f"📐 Default coordinates precomputed for {count} resolutions")
+
+    # Start batched coordinate usage write-back
+    get_usage_recorder().start()
+
+    # Start expiring abandoned calibration sessions
+    get_session_store().start()
+
     # Log configuration
     logger.info(f"📍 API Prefix: {settings.API_V1_PREFIX}")
     logger.info(f"📁 Data Directory: {settings.DATA_DIR}")
@@ -95,6 +123,24 @@ async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("👋 Shutting down application")
 
+    # Stop device job workers
+    await get_job_manager().stop()
+
+    # Flush pending coordinate usage statistics
+    await get_usage_recorder().stop()
+
+    # Stop the calibration session reaper
+    await get_session_store().stop()
+
+    # Stop image preparation workers
+    shutdown_image_process_pool()
+
+    # Stop per-device executor threads
+    get_device_executors().shutdown()
+
+    # Stop device worker processes
+    get_worker_supervisor().shutdown()
+
 
 @app.get("/")
 async def root():
@@ -0,0 +1,22 @@
+"""
+Tests for the posting benchmark report helpers
+"""
+from benchmarks.posting_benchmark import percentile
+
+
+def test_percentile_exact_ranks():
+    values = list(range(1, 21))
+    assert percentile(values, 50) == 10
+    assert percentile(values, 95) == 19
+    assert percentile(values, 99) == 20
+    assert percentile(list(range(1, 7)), 50) == 3
+
+
+def test_percentile_rounds_fractional_ranks_up():
+    assert percentile([1, 2, 3, 4, 5], 50) == 3
+    assert percentile([1, 2, 3, 4, 5], 95) == 5
+    assert percentile([5, 1, 3], 0) == 1
+
+
+def test_percentile_empty():
+    assert percentile([], 95) == 0.0